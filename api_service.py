@@ -4,15 +4,37 @@ This service exposes the chatbot functionality via REST API endpoints.
 """
 import os
 import sys
-from fastapi import FastAPI, HTTPException
+import time
+import asyncio
+from contextlib import nullcontext
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response, FileResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
 import uvicorn
 import json
-from src.intent_parser import call_ollama_intent
-from src.query_executor import run_all_queries
-from src.formatter import format_bucketed_sentences, format_employee_summary
-from src.config import logger
+from src.intent_parser import call_ollama_intent_async
+from src.query_executor import run_all_queries_async, run_batch_queries_async, run_page_async, run_refined_async
+from src.result_store import CursorError, CursorExpired, results as result_store
+from src.export import (
+    EXPORT_MODES, COLUMNAR_MEDIA_TYPES, iter_export_rows, iter_csv, iter_columnar, log_progress, pa,
+)
+from src.pdf_report import report_jobs
+from src.formatter import format_bucketed_sentences, format_candidate
+from src.cancellation import CancelToken, SearchCancelled
+from src.streaming import (
+    NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, wants_sse, encode_ndjson, encode_sse,
+    intent_event, candidate_event, done_event, error_event,
+)
+from src.tracing import start_trace, span
+from src.profiling import SearchProfile, wants_profile
+from src.admission import admission, Rejected
+from src.circuit_breaker import CircuitOpen, circuit_states
+from src.deadline import Deadline
+from src.storage import get_backend
+from src.metrics import render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, STAGE_SECONDS
+from src.config import logger, BATCH_MAX_QUERIES, BATCH_PARSE_CONCURRENCY, DEBUG_PROFILE_ALLOWED
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -26,6 +48,23 @@ app = FastAPI(
 class SearchRequest(BaseModel):
     query: str
     session_id: Optional[str] = "api_user"
+    trace: Optional[bool] = False
+    refine: Optional[bool] = False
+
+class PageRequest(BaseModel):
+    cursor: str
+    session_id: Optional[str] = "api_user"
+
+class ExportRequest(BaseModel):
+    query: Optional[str] = None
+    search_id: Optional[str] = None
+    session_id: Optional[str] = "api_user"
+    mode: Optional[str] = "ranked"
+
+class ReportRequest(BaseModel):
+    query: Optional[str] = None
+    search_id: Optional[str] = None
+    session_id: Optional[str] = "api_user"
 
 class CandidateSummary(BaseModel):
     id: Optional[str] = None
@@ -48,6 +87,49 @@ class SearchResult(BaseModel):
     search_time_seconds: float
     message: str
     summary: str
+    degraded: bool = False
+    omitted: List[str] = []
+    stale: bool = False
+    stale_age_seconds: Optional[float] = None
+    timings: Dict[str, float] = {}
+    total_ranked: int = 0
+    search_id: Optional[str] = None
+    next_cursor: Optional[str] = None
+    refinement: Optional[str] = None
+    trace: Optional[Dict[str, Any]] = None
+    profile: Optional[Dict[str, Any]] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    session_id: Optional[str] = "api_batch"
+
+class BatchSearchResult(BaseModel):
+    results: List[SearchResult]
+    total_queries: int
+    unique_intents: int
+    statements_executed: int
+    statements_requested: int
+    total_time_seconds: float
+
+DEGRADED_MESSAGE = " (partial result: {} skipped because the search took too long)"
+STALE_MESSAGE = " (database unavailable: cached result from {:.0f}s ago)"
+
+async def run_until_disconnect(http_request: Request, make_search, session_id: str):
+    """
+    Jalankan search (async); kalau client disconnect,
+    statement yang sedang jalan di Postgres langsung di-cancel.
+    make_search(token) → coroutine search yang menerima CancelToken.
+    """
+    token = CancelToken()
+    task = asyncio.ensure_future(make_search(token))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=0.5)
+        if done:
+            return task.result()
+        if await http_request.is_disconnected():
+            logger.info(f"[{session_id}] client disconnected → cancelling search")
+            token.cancel()
+            return await task  # → SearchCancelled
 
 @app.get("/")
 async def root():
@@ -57,18 +139,194 @@ async def root():
         "version": "1.0.0",
         "description": "Search for talent using natural language queries",
         "endpoints": {
-            "POST /search": "Search for candidates using natural language queries",
-            "GET /health": "Health check endpoint"
+            "POST /search": "Search for candidates using natural language queries (X-Debug-Profile: 1 to profile)",
+            "POST /search/more": "Next page of a search (cursor from next_cursor)",
+            "POST /search/batch": "Run many search queries in one request",
+            "POST /search/stream": "Streaming search (NDJSON, or SSE with Accept: text/event-stream)",
+            "POST /export/csv": "Full result set as streamed CSV (mode: ranked | sections)",
+            "POST /export/arrow": "Ranked candidates with per-table details as an Arrow IPC stream",
+            "POST /export/parquet": "Same as /export/arrow, as Parquet",
+            "POST /reports/pdf": "Start a PDF report job (poll GET /reports/{job_id}, then /download)",
+            "GET /health": "Health check endpoint",
+            "GET /metrics": "Prometheus metrics (per-stage latency, pool)"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "Talent Search Chatbot API"}
+    """Health check endpoint (status "degraded" kalau ada circuit breaker yang tidak closed)"""
+    circuits = circuit_states()
+    return {
+        "status": "healthy" if all(c["state"] == "closed" for c in circuits.values()) else "degraded",
+        "service": "Talent Search Chatbot API",
+        "searches": {"in_flight": admission.in_flight, "queued": admission.queue_depth},
+        "storage": get_backend().name,
+        "circuits": circuits,
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition format"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+def rejected_http(e) -> HTTPException:
+    """Admission control / circuit breaker menolak → 429 (rate limit) / 503 (busy) + Retry-After"""
+    return HTTPException(status_code=e.status_code, detail=e.message, headers={"Retry-After": str(e.retry_after)})
+
+def format_summaries(primary, intent, deadline=None) -> str:
+    """Format candidates using the same formatter as UI (employee_summary_var=True); short form once the budget runs out"""
+    formatted_summaries = []
+    for emp in primary:
+        try:
+            summary = format_candidate(emp, intent, deadline)
+            formatted_summaries.append(summary)
+        except Exception as e:
+            logger.error(f"Error formatting employee summary: {str(e)}", exc_info=True)
+            formatted_summaries.append("Error formatting candidate summary")
+    
+    # Join all summaries with newlines (like UI does)
+    return "\n".join(formatted_summaries)
+
+def to_candidate_summary(employee) -> CandidateSummary:
+    """Convert one merged employee dict to a CandidateSummary for structured data"""
+    try:
+        # Extract skills
+        primary_skills = []
+        secondary_skills = []
+        
+        # Get skills from various fields
+        if "skills" in employee and employee["skills"]:
+            if isinstance(employee["skills"], str):
+                primary_skills.extend(employee["skills"].split())
+            elif isinstance(employee["skills"], list):
+                primary_skills.extend([str(s) for s in employee["skills"]])
+            else:
+                primary_skills.append(str(employee["skills"]))
+        
+        if "primary_skills" in employee and employee["primary_skills"]:
+            if isinstance(employee["primary_skills"], str):
+                primary_skills.extend(employee["primary_skills"].split())
+            elif isinstance(employee["primary_skills"], list):
+                primary_skills.extend([str(s) for s in employee["primary_skills"]])
+            else:
+                primary_skills.append(str(employee["primary_skills"]))
+                
+        if "secondary_skills" in employee and employee["secondary_skills"]:
+            if isinstance(employee["secondary_skills"], str):
+                secondary_skills.extend(employee["secondary_skills"].split())
+            elif isinstance(employee["secondary_skills"], list):
+                secondary_skills.extend([str(s) for s in employee["secondary_skills"]])
+            else:
+                secondary_skills.append(str(employee["secondary_skills"]))
+        
+        # Safely extract other fields
+        def safe_str(value):
+            if value is None:
+                return None
+            if isinstance(value, (list, dict)):
+                return str(value)
+            return str(value)
+        
+        def safe_float(value, default=0.0):
+            try:
+                return float(value)
+            except (ValueError, TypeError):
+                return default
+        
+        # Create candidate summary
+        candidate = CandidateSummary(
+            id=safe_str(employee.get("employee_id") or employee.get("id")),
+            name=safe_str(employee.get("name", employee.get("full_name", "Unknown Candidate"))),
+            experience_years=safe_float(employee.get("experience", 0.0)),
+            primary_skills=list(set([safe_str(s) for s in primary_skills if s])) if primary_skills else [],
+            secondary_skills=list(set([safe_str(s) for s in secondary_skills if s])) if secondary_skills else [],
+            score=safe_float(employee.get("score", 0.0)),
+            role=safe_str(employee.get("role") or employee.get("position")),
+            education=safe_str(employee.get("education") or employee.get("highest_education"))
+        )
+        return candidate
+    except Exception as e:
+        logger.error(f"Error processing candidate: {str(e)}", exc_info=True)
+        # Create a minimal candidate even if there are errors
+        candidate = CandidateSummary(
+            name="Error Processing Candidate",
+            experience_years=0.0,
+            primary_skills=[],
+            secondary_skills=[],
+            score=0.0
+        )
+        return candidate
+
+def degraded_note(omitted, raw) -> str:
+    note = DEGRADED_MESSAGE.format(", ".join(omitted)) if omitted else ""
+    if raw.get("stale"):
+        note += STALE_MESSAGE.format(raw.get("stale_age_s", 0))
+    return note
+
+def build_search_result(query: str, intent: dict, employees, raw, sql_time: float, timings=None,
+                        deadline=None) -> SearchResult:
+    """
+    Susun SearchResult dari hasil run_all_queries (dipakai /search dan /search/batch)
+    deadline → ringkasan yang tidak muat di budget jadi kalimat pendek, "summary" masuk omitted
+    """
+    omitted = raw.get("omitted", [])
+    stale = bool(raw.get("stale"))
+    timings = dict(timings or {})
+    
+    # Handle case when no candidates found
+    if not employees:
+        return SearchResult(
+            query=query,
+            candidates=[],
+            total_found=0,
+            search_time_seconds=sql_time,
+            message="No candidates found matching your criteria. Try adjusting your search terms." + degraded_note(omitted, raw),
+            summary="No candidates matched your search criteria.",
+            degraded=bool(omitted),
+            omitted=omitted,
+            stale=stale,
+            stale_age_seconds=raw.get("stale_age_s"),
+            timings=timings,
+            total_ranked=raw.get("total_ranked", 0),
+            search_id=raw.get("search_id"),
+            next_cursor=raw.get("next_cursor")
+        )
+        
+    # Get primary candidates based on limit in intent
+    lim = intent.get("limit", {}) or {}
+    n_primary = int(lim.get("primary", 3))
+    primary = employees[:n_primary]
+    
+    t0 = time.perf_counter()
+    summary = format_summaries(primary, intent, deadline)
+    with span("serialization"), STAGE_SECONDS.time(stage="serialization"):
+        candidates = [to_candidate_summary(employee) for employee in primary]
+    timings["format"] = round(time.perf_counter() - t0, 4)
+    if deadline is not None and "summary" in deadline.skipped:
+        omitted = omitted + ["summary"]
+    
+    # Create response message
+    message = f"Found {len(candidates)} candidates matching your criteria" + degraded_note(omitted, raw)
+    
+    return SearchResult(
+        query=query,
+        candidates=candidates,
+        total_found=len(candidates),
+        search_time_seconds=sql_time,
+        message=message,
+        summary=summary,
+        degraded=bool(omitted),
+        omitted=omitted,
+        stale=stale,
+        stale_age_seconds=raw.get("stale_age_s"),
+        timings=timings,
+        total_ranked=raw.get("total_ranked", 0),
+        search_id=raw.get("search_id"),
+        next_cursor=raw.get("next_cursor")
+    )
 
 @app.post("/search", response_model=SearchResult)
-async def search_candidates(request: SearchRequest):
+async def search_candidates(request: SearchRequest, http_request: Request, response: Response):
     """
     Search for candidates using natural language queries
     
@@ -77,136 +335,339 @@ async def search_candidates(request: SearchRequest):
     - "find Technical Leader with core banking experience"
     - "show me candidates with >5 years experience"
     - "15 sdm python" (15 software developers with Python as must-have skill)
+    
+    Set "refine": true to treat the query as a follow-up in this session
+    ("now with core banking"); narrowing follow-ups are answered from the
+    previous result set without hitting the database.
+    Set "trace": true to get the span tree of this request in the response.
+    Header `X-Debug-Profile: 1` (DEBUG_PROFILE_ALLOWED=1) runs the search under
+    cProfile + tracemalloc and returns the profile summary.
+    With SEARCH_BUDGET_S set, optional enrichments (education, timesheet,
+    full summaries) that do not fit the budget are listed in `omitted`.
     """
+    deadline = Deadline.start()
+    try:
+        ticket = await admission.acquire_async(f"api:{request.session_id}")
+    except Rejected as e:
+        raise rejected_http(e)
     try:
         logger.info(f"[{request.session_id}] API search query: {request.query}")
+        profile = None
+        if DEBUG_PROFILE_ALLOWED and wants_profile(http_request.headers.get("x-debug-profile")):
+            profile = SearchProfile(request.session_id, request.query)
         
-        # Parse the intent
-        intent, prompt = call_ollama_intent(request.query)
-        logger.info(f"[{request.session_id}] Parsed intent: {intent}")
+        with start_trace("POST /search", force=bool(request.trace), session_id=request.session_id) as root, \
+                (profile or nullcontext()):
+            # Parse the intent
+            t0 = time.perf_counter()
+            intent, prompt = await call_ollama_intent_async(request.query, deadline)
+            parse_time = time.perf_counter() - t0
+            logger.info(f"[{request.session_id}] Parsed intent: {intent}")
+            
+            # Run the queries
+            if request.refine:
+                intent, employees, raw, sql_time = await run_until_disconnect(
+                    http_request,
+                    lambda token: run_refined_async(request.query, intent, request.session_id, token, deadline=deadline),
+                    request.session_id
+                )
+            else:
+                employees, raw, sql_time = await run_until_disconnect(
+                    http_request,
+                    lambda token: run_all_queries_async(
+                        intent, request.session_id, token, query=request.query, deadline=deadline
+                    ),
+                    request.session_id
+                )
+            timings = {"parse": round(parse_time, 4), **raw.get("timings", {})}
+            result = build_search_result(request.query, intent, employees, raw, sql_time, timings, deadline)
+            result.refinement = raw.get("refinement")
         
-        # Run the queries
-        employees, raw, sql_time = run_all_queries(intent, request.session_id)
+        if request.trace:
+            result.trace = root.to_tree()
+        if profile is not None and profile.artifact:
+            result.profile = profile.report
+            response.headers["X-Profile-Artifact"] = profile.artifact
+        return result
         
-        # Handle case when no candidates found
-        if not employees:
-            return SearchResult(
-                query=request.query,
-                candidates=[],
-                total_found=0,
-                search_time_seconds=sql_time,
-                message="No candidates found matching your criteria. Try adjusting your search terms.",
-                summary="No candidates matched your search criteria."
+    except CircuitOpen as e:
+        # database circuit open dan belum ada hasil lama untuk intent ini
+        raise rejected_http(e)
+    except SearchCancelled:
+        # Client sudah pergi, response ini tidak akan dibaca
+        logger.info(f"[{request.session_id}] search cancelled")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        logger.error(f"[{request.session_id}] Error processing search: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing search: {str(e)}")
+    finally:
+        ticket.release()
+
+@app.post("/search/more", response_model=SearchResult)
+async def search_candidates_more(request: PageRequest, http_request: Request):
+    """
+    Next page of an earlier search
+    
+    Pass the `next_cursor` of a /search (or /search/more) response. The ranking
+    is not recomputed: only the candidates on this page are loaded from the
+    database. Cursors expire after RESULT_STORE_TTL_S (410 → run the search again).
+    """
+    try:
+        ticket = await admission.acquire_async(f"api:{request.session_id}")
+    except Rejected as e:
+        raise rejected_http(e)
+    try:
+        employees, page, sql_time = await run_until_disconnect(
+            http_request, lambda token: run_page_async(request.cursor, request.session_id, token), request.session_id
+        )
+        return build_search_result(page["query"], page["intent"], employees, page, sql_time, page["timings"])
+    except CursorError as e:
+        raise HTTPException(status_code=410 if isinstance(e, CursorExpired) else 400, detail=str(e))
+    except CircuitOpen as e:
+        raise rejected_http(e)
+    except SearchCancelled:
+        logger.info(f"[{request.session_id}] page request cancelled")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        logger.error(f"[{request.session_id}] Error loading page: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error loading page: {str(e)}")
+    finally:
+        ticket.release()
+
+@app.post("/search/stream")
+async def search_candidates_stream(request: SearchRequest, http_request: Request):
+    """
+    Streaming variant of /search
+    
+    Sends the parsed intent first, then each ranked candidate as soon as it
+    is formatted, then a timing trailer. NDJSON by default, Server-Sent
+    Events when the client sends `Accept: text/event-stream`.
+    """
+    sse = wants_sse(http_request.headers.get("accept", ""))
+    encode = encode_sse if sse else encode_ndjson
+    deadline = Deadline.start()
+    try:
+        ticket = await admission.acquire_async(f"api:{request.session_id}")
+    except Rejected as e:
+        raise rejected_http(e)
+    
+    async def events():
+        try:
+            logger.info(f"[{request.session_id}] API stream search query: {request.query}")
+            t0 = time.perf_counter()
+            intent, prompt = await call_ollama_intent_async(request.query, deadline)
+            parse_time = time.perf_counter() - t0
+            yield encode(intent_event(request.query, intent, parse_time))
+            
+            # Disconnect → Starlette meng-cancel generator ini → statement ikut di-cancel
+            employees, raw, sql_time = await run_all_queries_async(
+                intent, request.session_id, query=request.query, deadline=deadline
             )
+            lim = intent.get("limit", {}) or {}
+            primary = employees[:int(lim.get("primary", 3))]
             
-        # Get primary candidates based on limit in intent
-        lim = intent.get("limit", {}) or {}
-        n_primary = int(lim.get("primary", 3))
-        primary = employees[:n_primary]
+            t1 = time.perf_counter()
+            for rank, emp in enumerate(primary, 1):
+                yield encode(candidate_event(
+                    rank, to_candidate_summary(emp).model_dump(), format_summaries([emp], intent, deadline)
+                ))
+            
+            timings = {"parse": round(parse_time, 4), **raw.get("timings", {}), "format": round(time.perf_counter() - t1, 4)}
+            if deadline is not None and "summary" in deadline.skipped:
+                raw = {**raw, "omitted": raw.get("omitted", []) + ["summary"]}
+            yield encode(done_event(len(primary), sql_time, raw, timings))
+        except Exception as e:
+            logger.error(f"[{request.session_id}] Error processing stream search: {str(e)}", exc_info=True)
+            yield encode(error_event(f"Error processing search: {str(e)}"))
+        finally:
+            ticket.release()
+    
+    # background: slot tetap dilepas walau generator tidak pernah dimulai (client langsung pergi)
+    return StreamingResponse(
+        events(), media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE, background=BackgroundTask(ticket.release)
+    )
+
+@app.post("/search/batch", response_model=BatchSearchResult)
+async def search_candidates_batch(request: BatchSearchRequest, http_request: Request):
+    """
+    Search for many role requests at once (bulk staffing)
+    
+    Intents are parsed in parallel, identical SQL statements across the batch
+    run only once on a single connection, and every query gets its own
+    ranked result plus a timing breakdown.
+    """
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="queries must not be empty")
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_QUERIES} queries per batch")
+    
+    try:
+        ticket = await admission.acquire_async(f"api:{request.session_id}")
+    except Rejected as e:
+        raise rejected_http(e)
+    try:
+        logger.info(f"[{request.session_id}] API batch search: {len(request.queries)} queries")
+        t0 = time.perf_counter()
         
-        # Format candidates using the same formatter as UI
-        # Use individual summaries like the UI does with employee_summary_var=True
-        formatted_summaries = []
-        for emp in primary:
-            try:
-                summary = format_employee_summary(emp, intent)
-                formatted_summaries.append(summary)
-            except Exception as e:
-                logger.error(f"Error formatting employee summary: {str(e)}", exc_info=True)
-                formatted_summaries.append("Error formatting candidate summary")
+        # Parse intents in parallel, at most BATCH_PARSE_CONCURRENCY Ollama calls at once
+        limit = asyncio.Semaphore(BATCH_PARSE_CONCURRENCY)
         
-        # Join all summaries with newlines (like UI does)
-        formatted_response = "\n".join(formatted_summaries)
+        async def parse(query):
+            async with limit:
+                started = time.perf_counter()
+                intent, _ = await call_ollama_intent_async(query)
+                return intent, time.perf_counter() - started
         
-        # Convert employees to CandidateSummary objects for structured data
-        candidates = []
-        for employee in primary:
-            try:
-                # Extract skills
-                primary_skills = []
-                secondary_skills = []
-                
-                # Get skills from various fields
-                if "skills" in employee and employee["skills"]:
-                    if isinstance(employee["skills"], str):
-                        primary_skills.extend(employee["skills"].split())
-                    elif isinstance(employee["skills"], list):
-                        primary_skills.extend([str(s) for s in employee["skills"]])
-                    else:
-                        primary_skills.append(str(employee["skills"]))
-                
-                if "primary_skills" in employee and employee["primary_skills"]:
-                    if isinstance(employee["primary_skills"], str):
-                        primary_skills.extend(employee["primary_skills"].split())
-                    elif isinstance(employee["primary_skills"], list):
-                        primary_skills.extend([str(s) for s in employee["primary_skills"]])
-                    else:
-                        primary_skills.append(str(employee["primary_skills"]))
-                        
-                if "secondary_skills" in employee and employee["secondary_skills"]:
-                    if isinstance(employee["secondary_skills"], str):
-                        secondary_skills.extend(employee["secondary_skills"].split())
-                    elif isinstance(employee["secondary_skills"], list):
-                        secondary_skills.extend([str(s) for s in employee["secondary_skills"]])
-                    else:
-                        secondary_skills.append(str(employee["secondary_skills"]))
-                
-                # Safely extract other fields
-                def safe_str(value):
-                    if value is None:
-                        return None
-                    if isinstance(value, (list, dict)):
-                        return str(value)
-                    return str(value)
-                
-                def safe_float(value, default=0.0):
-                    try:
-                        return float(value)
-                    except (ValueError, TypeError):
-                        return default
-                
-                # Create candidate summary
-                candidate = CandidateSummary(
-                    id=safe_str(employee.get("employee_id") or employee.get("id")),
-                    name=safe_str(employee.get("name", employee.get("full_name", "Unknown Candidate"))),
-                    experience_years=safe_float(employee.get("experience", 0.0)),
-                    primary_skills=list(set([safe_str(s) for s in primary_skills if s])) if primary_skills else [],
-                    secondary_skills=list(set([safe_str(s) for s in secondary_skills if s])) if secondary_skills else [],
-                    score=safe_float(employee.get("score", 0.0)),
-                    role=safe_str(employee.get("role") or employee.get("position")),
-                    education=safe_str(employee.get("education") or employee.get("highest_education"))
-                )
-                candidates.append(candidate)
-            except Exception as e:
-                logger.error(f"Error processing candidate: {str(e)}", exc_info=True)
-                # Create a minimal candidate even if there are errors
-                candidate = CandidateSummary(
-                    name="Error Processing Candidate",
-                    experience_years=0.0,
-                    primary_skills=[],
-                    secondary_skills=[],
-                    score=0.0
-                )
-                candidates.append(candidate)
+        parsed = await asyncio.gather(*[parse(q) for q in request.queries])
+        intents = [intent for intent, _ in parsed]
         
-        # Create response message
-        message = f"Found {len(candidates)} candidates matching your criteria"
+        outcomes, stats = await run_until_disconnect(
+            http_request, lambda token: run_batch_queries_async(intents, request.session_id, token), request.session_id
+        )
         
-        # Use the formatted response as summary (same as UI)
-        summary = formatted_response
+        results = []
+        for query, (intent, parse_time), (employees, raw, sql_time) in zip(request.queries, parsed, outcomes):
+            timings = {"parse": round(parse_time, 4), **raw.get("timings", {})}
+            results.append(build_search_result(query, intent, employees, raw, sql_time, timings))
         
-        return SearchResult(
-            query=request.query,
-            candidates=candidates,
-            total_found=len(candidates),
-            search_time_seconds=sql_time,
-            message=message,
-            summary=summary
+        return BatchSearchResult(
+            results=results,
+            total_queries=len(request.queries),
+            unique_intents=stats["unique_intents"],
+            statements_executed=stats["statements_executed"],
+            statements_requested=stats["statements_requested"],
+            total_time_seconds=round(time.perf_counter() - t0, 4)
         )
-        
+    except CircuitOpen as e:
+        raise rejected_http(e)
+    except SearchCancelled:
+        logger.info(f"[{request.session_id}] batch search cancelled")
+        raise HTTPException(status_code=499, detail="Client closed request")
     except Exception as e:
-        logger.error(f"[{request.session_id}] Error processing search: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Error processing search: {str(e)}")
+        logger.error(f"[{request.session_id}] Error processing batch search: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing batch search: {str(e)}")
+    finally:
+        ticket.release()
+
+async def resolve_export_intent(request: ExportRequest):
+    """search_id (intent tersimpan di result_store) atau query (diparse ulang) → (query, intent)"""
+    if request.search_id:
+        stored = result_store.get(request.search_id)
+        if stored is None:
+            raise HTTPException(status_code=410, detail="Search expired, run it again")
+        return stored.query, stored.intent
+    if request.query:
+        intent, _ = await call_ollama_intent_async(request.query)
+        return request.query, intent
+    raise HTTPException(status_code=400, detail="query or search_id is required")
+
+@app.post("/export/csv")
+async def export_csv(request: ExportRequest):
+    """
+    Export the full result set of a search as CSV
+    
+    Pass either a `query` or the `search_id` of an earlier /search response.
+    The intent is re-run on server-side cursors and rows are streamed as they
+    arrive, so the export is not limited by the search result limit.
+    `mode`: "ranked" (one row per candidate, best first) or "sections"
+    (raw rows of the four tables).
+    """
+    if request.mode not in EXPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(EXPORT_MODES)}")
+    query, intent = await resolve_export_intent(request)
+    
+    try:
+        ticket = await admission.acquire_async(f"api:{request.session_id}")
+    except Rejected as e:
+        raise rejected_http(e)
+    logger.info(f"[{request.session_id}] API {request.mode} CSV export: {query}")
+    
+    # generator sync → dijalankan Starlette di threadpool (cursor streaming storage backend)
+    rows = iter_export_rows(intent, request.mode, request.session_id, progress=log_progress(request.session_id))
+    filename = f"talent_{request.mode}_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        iter_csv(rows), media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        background=BackgroundTask(ticket.release),
+    )
+
+async def export_columnar(request: ExportRequest, fmt: str):
+    if pa is None:
+        raise HTTPException(status_code=501, detail="pyarrow is not installed on the server")
+    query, intent = await resolve_export_intent(request)
+    try:
+        ticket = await admission.acquire_async(f"api:{request.session_id}")
+    except Rejected as e:
+        raise rejected_http(e)
+    logger.info(f"[{request.session_id}] API {fmt} export: {query}")
+    
+    chunks = iter_columnar(intent, fmt, request.session_id, progress=log_progress(request.session_id))
+    filename = f"talent_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        chunks, media_type=COLUMNAR_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        background=BackgroundTask(ticket.release),
+    )
+
+@app.post("/export/arrow")
+async def export_arrow(request: ExportRequest):
+    """
+    Ranked candidates as an Arrow IPC stream
+    
+    One row per candidate (rank, score, experience) with the matching roles,
+    projects, education and timesheet rows as list<struct> columns. Record
+    batches of EXPORT_BATCH_ROWS candidates are sent as they are built.
+    Takes a `query` or the `search_id` of an earlier /search.
+    """
+    return await export_columnar(request, "arrow")
+
+@app.post("/export/parquet")
+async def export_parquet(request: ExportRequest):
+    """Same as /export/arrow, as a Parquet file (one row group per record batch)"""
+    return await export_columnar(request, "parquet")
+
+@app.post("/reports/pdf", status_code=202)
+async def submit_pdf_report(request: ReportRequest):
+    """
+    Start a PDF report job for a query (or the `search_id` of an earlier /search)
+    
+    The search and the PDF are built in a worker process. Poll
+    GET /reports/{job_id} until `status` is "done", then download the file
+    from GET /reports/{job_id}/download.
+    """
+    if request.search_id:
+        stored = result_store.get(request.search_id)
+        if stored is None:
+            raise HTTPException(status_code=410, detail="Search expired, run it again")
+        query, intent = stored.query, stored.intent
+    elif request.query:
+        query, intent = request.query, None
+    else:
+        raise HTTPException(status_code=400, detail="query or search_id is required")
+    try:
+        admission.check_rate(f"api:{request.session_id}")
+        job = report_jobs.submit(request.session_id, query, intent)
+    except Rejected as e:
+        raise rejected_http(e)
+    return job.to_dict()
+
+@app.get("/reports/{job_id}")
+async def pdf_report_status(job_id: str):
+    """Status of a PDF report job: pending | done | failed, with generation time and size when done"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired report job")
+    return job.to_dict()
+
+@app.get("/reports/{job_id}/download")
+async def pdf_report_download(job_id: str):
+    """The finished PDF (409 while the job is still running or if it failed)"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired report job")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Report is {job.status}" + (f": {job.error}" if job.error else ""))
+    return FileResponse(job.path, media_type="application/pdf", filename=f"talent_report_{job_id[:8]}.pdf")
 
 # Example of how to run the service
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+"""
+Stage micro-benchmark for the search pipeline.
+
+Usage:
+- python manage_schema.py seed --employees 100000 --timesheet-days 40 --reset   # LOCAL DB ONLY
+- python benchmark.py                                  # default queries, 10 iterations each
+- python benchmark.py -q "5 sdm Java" -q "3 sdm python" --iterations 20
+- python benchmark.py --queries-file queries.txt --json logs/bench.json
+- python benchmark.py --compare logs/bench.json        # Δ median vs an earlier run
+
+Times call_ollama_intent, build_clauses, each SQL query, merge, score_candidate,
+ranking and the formatters separately (min / median / p95 / mean in ms).
+Set LLM_INTENT_ENABLED=1 to include the LLM call in the intent stage.
+"""
+import os
+import sys
+import argparse
+from src.config import LLM_INTENT_ENABLED
+from src.storage import get_backend
+from src.benchmark import DEFAULT_QUERIES, run_benchmark, dataset_sizes, format_table, save_result, load_result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage benchmark of the talent search pipeline")
+    parser.add_argument("-q", "--query", action="append", dest="queries", help="query to benchmark (repeatable)")
+    parser.add_argument("--queries-file", help="file with one query per line")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--per-query", action="store_true", help="also print a table per query")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare medians against")
+    args = parser.parse_args(argv)
+
+    queries = list(args.queries or [])
+    if args.queries_file:
+        with open(args.queries_file, encoding="utf-8") as f:
+            queries.extend(line.strip() for line in f if line.strip())
+    queries = queries or DEFAULT_QUERIES
+
+    backend = get_backend()
+    sizes = dataset_sizes(backend)
+    print(f"Dataset ({backend.name}, estimated rows):")
+    for table, n in sizes.items():
+        print(f"  {table}: {n:,}")
+    print(f"LLM intent: {'on' if LLM_INTENT_ENABLED else 'off (heuristic)'} | PROJECT_FULLTEXT: {backend.fulltext}")
+    print(f"\nRunning {len(queries)} queries × {args.iterations} iterations (+{args.warmup} warmup)...")
+
+    result = run_benchmark(queries, args.iterations, args.warmup)
+    result["dataset"] = sizes
+    result["settings"] = {
+        "iterations": args.iterations, "llm_intent": LLM_INTENT_ENABLED,
+        "fulltext": backend.fulltext, "backend": backend.name,
+    }
+
+    baseline = load_result(args.compare) if args.compare else None
+    if args.per_query:
+        for query, q in result["queries"].items():
+            old = (baseline or {}).get("queries", {}).get(query, {}).get("stages")
+            print(f"\n{query!r} ({q['candidates']} candidates)")
+            print(format_table(q["stages"], old))
+    print("\nAll queries")
+    print(format_table(result["overall"], (baseline or {}).get("overall")))
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        save_result(args.json, result)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""
+Shared pytest fixtures for the root-level test_*.py scripts.
+Circuit breakers, the LLM record/replay cache and the active storage backend are
+process-wide singletons; they are restored after every test so the files pass in any order.
+"""
+import pytest
+from src import storage
+from src.circuit_breaker import BREAKERS
+from src.llm_cache import llm_cache
+
+_BREAKER_FIELDS = ("_state", "_failures", "_opened_at", "_probe_started", "failure_threshold", "reset_s")
+
+
+@pytest.fixture(autouse=True)
+def restore_singletons():
+    breakers = [(b, {f: getattr(b, f) for f in _BREAKER_FIELDS}) for b in BREAKERS]
+    cache = (llm_cache.mode, llm_cache.directory)
+    backend = storage._backend
+    yield
+    for breaker, fields in breakers:
+        with breaker._lock:
+            for name, value in fields.items():
+                setattr(breaker, name, value)
+    llm_cache.mode, llm_cache.directory = cache
+    storage._backend = backend
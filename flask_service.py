@@ -5,10 +5,29 @@ This service exposes the chatbot functionality via REST API endpoints.
 import os
 import sys
 import json
-from flask import Flask, request, jsonify
+import time
+from contextlib import nullcontext
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 from src.intent_parser import call_ollama_intent
-from src.query_executor import run_all_queries
-from src.config import logger
+from src.query_executor import run_all_queries, run_page, run_refined
+from src.result_store import CursorError, CursorExpired, results as result_store
+from src.export import (
+    EXPORT_MODES, COLUMNAR_FORMATS, COLUMNAR_MEDIA_TYPES, iter_export_rows, iter_csv, iter_columnar, log_progress, pa,
+)
+from src.pdf_report import report_jobs
+from src.formatter import format_candidate
+from src.streaming import (
+    NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, wants_sse, encode_ndjson, encode_sse,
+    intent_event, candidate_event, done_event, error_event,
+)
+from src.tracing import start_trace
+from src.profiling import SearchProfile, wants_profile
+from src.admission import admission, Rejected
+from src.circuit_breaker import CircuitOpen, circuit_states
+from src.deadline import Deadline
+from src.storage import get_backend
+from src.metrics import render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, STAGE_SECONDS
+from src.config import logger, DEBUG_PROFILE_ALLOWED
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -23,14 +42,38 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /search": "Search for candidates using natural language queries",
-            "GET /health": "Health check endpoint"
+            "POST /search/more": "Next page of a search (cursor from next_cursor)",
+            "POST /search/stream": "Streaming search (NDJSON, or SSE with Accept: text/event-stream)",
+            "POST /export/csv": "Full result set as streamed CSV (mode: ranked | sections)",
+            "POST /export/<arrow|parquet>": "Ranked candidates with per-table details, columnar",
+            "POST /reports/pdf": "Start a PDF report job (poll GET /reports/<job_id>, then /download)",
+            "GET /health": "Health check endpoint",
+            "GET /metrics": "Prometheus metrics (per-stage latency, pool)"
         }
     })
 
+def rejected_response(e):
+    """Admission control / circuit breaker menolak → 429 (rate limit) / 503 (busy) + Retry-After"""
+    resp = jsonify({"error": e.message})
+    resp.status_code = e.status_code
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp
+
 @app.route("/health")
 def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "healthy"})
+    """Health check endpoint (status "degraded" kalau ada circuit breaker yang tidak closed)"""
+    circuits = circuit_states()
+    return jsonify({
+        "status": "healthy" if all(c["state"] == "closed" for c in circuits.values()) else "degraded",
+        "searches": {"in_flight": admission.in_flight, "queued": admission.queue_depth},
+        "storage": get_backend().name,
+        "circuits": circuits,
+    })
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition format"""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
 
 @app.route("/search", methods=["POST"])
 def search_candidates():
@@ -40,26 +83,61 @@ def search_candidates():
     Example request:
     {
         "query": "15 sdm python",
-        "session_id": "api_user"
+        "session_id": "api_user",
+        "trace": false
     }
+    "refine": true → follow-up in this session, narrowing answered from memory.
+    "trace": true → span tree of this request in the response.
+    Header X-Debug-Profile: 1 (DEBUG_PROFILE_ALLOWED=1) → cProfile + tracemalloc profile.
+    SEARCH_BUDGET_S → optional tables (education, timesheet) that do not fit the budget are listed in "omitted".
     """
+    ticket = None
+    deadline = Deadline.start()
     try:
         # Get JSON data from request
         data = request.get_json()
         query = data.get("query", "")
         session_id = data.get("session_id", "api_user")
+        want_trace = bool(data.get("trace"))
+        refine = bool(data.get("refine"))
         
         if not query:
             return jsonify({"error": "Query is required"}), 400
         
+        try:
+            ticket = admission.acquire(f"api:{session_id}")
+        except Rejected as e:
+            return rejected_response(e)
+        
         logger.info(f"[{session_id}] API search query: {query}")
         
-        # Parse the intent
-        intent, prompt = call_ollama_intent(query)
-        logger.info(f"[{session_id}] Parsed intent: {intent}")
+        profile = None
+        if DEBUG_PROFILE_ALLOWED and wants_profile(request.headers.get("X-Debug-Profile")):
+            profile = SearchProfile(session_id, query)
         
-        # Run the queries
-        employees, raw, sql_time = run_all_queries(intent, session_id)
+        with start_trace("POST /search", force=want_trace, session_id=session_id) as root, \
+                (profile or nullcontext()):
+            # Parse the intent
+            t0 = time.perf_counter()
+            intent, prompt = call_ollama_intent(query, deadline)
+            parse_time = time.perf_counter() - t0
+            logger.info(f"[{session_id}] Parsed intent: {intent}")
+            
+            # Run the queries
+            if refine:
+                intent, employees, raw, sql_time = run_refined(query, intent, session_id, deadline=deadline)
+            else:
+                employees, raw, sql_time = run_all_queries(intent, session_id, query=query, deadline=deadline)
+        trace = root.to_tree() if want_trace else None
+        timings = {"parse": round(parse_time, 4), **raw.get("timings", {})}
+        profile_report = profile.report if profile is not None and profile.artifact else None
+        omitted = raw.get("omitted", [])
+        degraded_note = (
+            f" (partial result: {', '.join(omitted)} skipped because the search took too long)" if omitted else ""
+        )
+        stale = bool(raw.get("stale"))
+        if stale:
+            degraded_note += f" (database unavailable: cached result from {raw['stale_age_s']:.0f}s ago)"
         
         # Format the response
         if not employees:
@@ -68,7 +146,18 @@ def search_candidates():
                 "candidates": [],
                 "total_found": 0,
                 "search_time": sql_time,
-                "message": "No candidates found matching your criteria. Try adjusting your search terms."
+                "message": "No candidates found matching your criteria. Try adjusting your search terms." + degraded_note,
+                "degraded": bool(omitted),
+                "omitted": omitted,
+                "stale": stale,
+                "stale_age_seconds": raw.get("stale_age_s"),
+                "timings": timings,
+                "total_ranked": raw.get("total_ranked", 0),
+                "search_id": raw.get("search_id"),
+                "next_cursor": raw.get("next_cursor"),
+                "refinement": raw.get("refinement"),
+                "trace": trace,
+                "profile": profile_report
             })
             
         # Get primary candidates
@@ -77,19 +166,238 @@ def search_candidates():
         primary = employees[:n_primary]
         
         # Create response message
-        message = f"Found {len(primary)} candidates matching your criteria"
+        message = f"Found {len(primary)} candidates matching your criteria" + degraded_note
         
-        return jsonify({
-            "query": query,
-            "candidates": primary,
-            "total_found": len(primary),
-            "search_time": sql_time,
-            "message": message
-        })
+        with STAGE_SECONDS.time(stage="serialization"):
+            return jsonify({
+                "query": query,
+                "candidates": primary,
+                "total_found": len(primary),
+                "search_time": sql_time,
+                "message": message,
+                "degraded": bool(omitted),
+                "omitted": omitted,
+                "stale": stale,
+                "stale_age_seconds": raw.get("stale_age_s"),
+                "timings": timings,
+                "total_ranked": raw.get("total_ranked", 0),
+                "search_id": raw.get("search_id"),
+                "next_cursor": raw.get("next_cursor"),
+                "refinement": raw.get("refinement"),
+                "trace": trace,
+                "profile": profile_report
+            })
         
+    except CircuitOpen as e:
+        # database circuit open dan belum ada hasil lama untuk intent ini
+        return rejected_response(e)
     except Exception as e:
         logger.error(f"[{session_id}] Error processing search: {str(e)}", exc_info=True)
         return jsonify({"error": f"Error processing search: {str(e)}"}), 500
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+@app.route("/search/more", methods=["POST"])
+def search_candidates_more():
+    """
+    Next page of an earlier search: {"cursor": "<next_cursor>", "session_id": "api_user"}
+    Only the candidates on this page are loaded; expired cursor → 410.
+    """
+    ticket = None
+    data = request.get_json() or {}
+    session_id = data.get("session_id", "api_user")
+    try:
+        try:
+            ticket = admission.acquire(f"api:{session_id}")
+        except Rejected as e:
+            return rejected_response(e)
+        
+        employees, page, sql_time = run_page(data.get("cursor", ""), session_id)
+        return jsonify({
+            "query": page["query"],
+            "candidates": employees,
+            "total_found": len(employees),
+            "search_time": sql_time,
+            "offset": page["offset"],
+            "total_ranked": page["total_ranked"],
+            "next_cursor": page["next_cursor"],
+            "degraded": bool(page["omitted"]),
+            "omitted": page["omitted"]
+        })
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 410 if isinstance(e, CursorExpired) else 400
+    except CircuitOpen as e:
+        return rejected_response(e)
+    except Exception as e:
+        logger.error(f"[{session_id}] Error loading page: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Error loading page: {str(e)}"}), 500
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+@app.route("/search/stream", methods=["POST"])
+def search_candidates_stream():
+    """
+    Streaming variant of /search: intent first, then each ranked candidate,
+    then a timing trailer (NDJSON, or SSE with Accept: text/event-stream).
+    """
+    data = request.get_json() or {}
+    query = data.get("query", "")
+    session_id = data.get("session_id", "api_user")
+    if not query:
+        return jsonify({"error": "Query is required"}), 400
+    
+    sse = wants_sse(request.headers.get("Accept", ""))
+    encode = encode_sse if sse else encode_ndjson
+    deadline = Deadline.start()
+    try:
+        ticket = admission.acquire(f"api:{session_id}")
+    except Rejected as e:
+        return rejected_response(e)
+    
+    def events():
+        try:
+            logger.info(f"[{session_id}] API stream search query: {query}")
+            t0 = time.perf_counter()
+            intent, prompt = call_ollama_intent(query, deadline)
+            parse_time = time.perf_counter() - t0
+            yield encode(intent_event(query, intent, parse_time))
+            
+            employees, raw, sql_time = run_all_queries(intent, session_id, query=query, deadline=deadline)
+            lim = intent.get("limit", {}) or {}
+            primary = employees[:int(lim.get("primary", 3))]
+            
+            t1 = time.perf_counter()
+            for rank, emp in enumerate(primary, 1):
+                yield encode(candidate_event(rank, emp, format_candidate(emp, intent, deadline)))
+            
+            timings = {"parse": round(parse_time, 4), **raw.get("timings", {}), "format": round(time.perf_counter() - t1, 4)}
+            if deadline is not None and "summary" in deadline.skipped:
+                raw = {**raw, "omitted": raw.get("omitted", []) + ["summary"]}
+            yield encode(done_event(len(primary), sql_time, raw, timings))
+        except Exception as e:
+            logger.error(f"[{session_id}] Error processing stream search: {str(e)}", exc_info=True)
+            yield encode(error_event(f"Error processing search: {str(e)}"))
+        finally:
+            ticket.release()
+    
+    response = Response(stream_with_context(events()), mimetype=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE)
+    # slot tetap dilepas walau generator tidak pernah dimulai
+    response.call_on_close(ticket.release)
+    return response
+
+@app.route("/export/csv", methods=["POST"])
+def export_csv():
+    """
+    Full result set as CSV: {"query": "..."} or {"search_id": "..."}, "mode": "ranked" | "sections".
+    The intent is re-run on server-side cursors and rows are streamed as they arrive.
+    """
+    data = request.get_json() or {}
+    session_id = data.get("session_id", "api_user")
+    mode = data.get("mode", "ranked")
+    if mode not in EXPORT_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(EXPORT_MODES)}"}), 400
+    if data.get("search_id"):
+        stored = result_store.get(data["search_id"])
+        if stored is None:
+            return jsonify({"error": "Search expired, run it again"}), 410
+        query, intent = stored.query, stored.intent
+    elif data.get("query"):
+        query = data["query"]
+        intent, _ = call_ollama_intent(query)
+    else:
+        return jsonify({"error": "query or search_id is required"}), 400
+    
+    try:
+        ticket = admission.acquire(f"api:{session_id}")
+    except Rejected as e:
+        return rejected_response(e)
+    logger.info(f"[{session_id}] API {mode} CSV export: {query}")
+    
+    rows = iter_export_rows(intent, mode, session_id, progress=log_progress(session_id))
+    response = Response(stream_with_context(iter_csv(rows)), mimetype="text/csv")
+    response.headers["Content-Disposition"] = f'attachment; filename="talent_{mode}_{time.strftime("%Y%m%d_%H%M%S")}.csv"'
+    response.call_on_close(ticket.release)
+    return response
+
+@app.route("/export/<fmt>", methods=["POST"])
+def export_columnar(fmt):
+    """
+    Ranked candidates with per-table details (list<struct> columns) as an Arrow IPC
+    stream (/export/arrow) or Parquet (/export/parquet), streamed per record batch.
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        return jsonify({"error": f"Unknown export format: {fmt}"}), 404
+    if pa is None:
+        return jsonify({"error": "pyarrow is not installed on the server"}), 501
+    data = request.get_json() or {}
+    session_id = data.get("session_id", "api_user")
+    if data.get("search_id"):
+        stored = result_store.get(data["search_id"])
+        if stored is None:
+            return jsonify({"error": "Search expired, run it again"}), 410
+        query, intent = stored.query, stored.intent
+    elif data.get("query"):
+        query = data["query"]
+        intent, _ = call_ollama_intent(query)
+    else:
+        return jsonify({"error": "query or search_id is required"}), 400
+    
+    try:
+        ticket = admission.acquire(f"api:{session_id}")
+    except Rejected as e:
+        return rejected_response(e)
+    logger.info(f"[{session_id}] API {fmt} export: {query}")
+    
+    chunks = iter_columnar(intent, fmt, session_id, progress=log_progress(session_id))
+    response = Response(stream_with_context(chunks), mimetype=COLUMNAR_MEDIA_TYPES[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="talent_{time.strftime("%Y%m%d_%H%M%S")}.{fmt}"'
+    response.call_on_close(ticket.release)
+    return response
+
+@app.route("/reports/pdf", methods=["POST"])
+def submit_pdf_report():
+    """
+    Start a PDF report job: {"query": "..."} or {"search_id": "..."} → 202 {"job_id", "status"}.
+    Search and PDF run in a worker process; poll /reports/<job_id>, then /reports/<job_id>/download.
+    """
+    data = request.get_json() or {}
+    session_id = data.get("session_id", "api_user")
+    if data.get("search_id"):
+        stored = result_store.get(data["search_id"])
+        if stored is None:
+            return jsonify({"error": "Search expired, run it again"}), 410
+        query, intent = stored.query, stored.intent
+    elif data.get("query"):
+        query, intent = data["query"], None
+    else:
+        return jsonify({"error": "query or search_id is required"}), 400
+    try:
+        admission.check_rate(f"api:{session_id}")
+        job = report_jobs.submit(session_id, query, intent)
+    except Rejected as e:
+        return rejected_response(e)
+    return jsonify(job.to_dict()), 202
+
+@app.route("/reports/<job_id>")
+def pdf_report_status(job_id):
+    """Status of a PDF report job (generation time and size when done)"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired report job"}), 404
+    return jsonify(job.to_dict())
+
+@app.route("/reports/<job_id>/download")
+def pdf_report_download(job_id):
+    """The finished PDF (409 while the job is still running or if it failed)"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired report job"}), 404
+    if job.status != "done":
+        return jsonify({"error": f"Report is {job.status}", "detail": job.error}), 409
+    return send_file(os.path.abspath(job.path), mimetype="application/pdf", as_attachment=True,
+                     download_name=f"talent_report_{job_id[:8]}.pdf")
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=7777, debug=True)
\ No newline at end of file
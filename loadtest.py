@@ -0,0 +1,118 @@
+"""
+Load test for the API services (api_service / flask_service).
+
+Usage:
+- python loadtest.py run --concurrency 8 --duration 30                 # closed loop, 8 clients
+- python loadtest.py run --rate 5 --duration 60                        # open loop, Poisson 5 req/s
+- python loadtest.py run --rates 1,2,4,8,16 --duration 30              # sweep → latency knee
+- python loadtest.py run --corpus logs/app.log --json logs/load.json   # replay logged queries
+- python loadtest.py ollama --port 11435 --latency-ms 300              # Ollama stand-in
+- python loadtest.py ollama --error-rate 0.2 --hang-rate 0.05          # ... with failure injection
+- python loadtest.py ollama --replay-dir data/llm_cache                # ... answering with recorded responses
+
+Local setup (synthetic data, no real LLM):
+    python manage_schema.py seed --employees 50000 --reset
+    python loadtest.py ollama &
+    LLM_INTENT_ENABLED=1 OLLAMA_HOST=http://127.0.0.1:11435 RATE_LIMIT_PER_MINUTE=0 \\
+        uvicorn api_service:app --port 7777
+    python loadtest.py run --rates 2,4,8,16
+
+The corpus is a .jsonl file with a "query" (or "text") field per line, an
+application log (lines like "... API search query: 5 sdm java"), or plain
+text with one query per line.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from src.loadtest import load_corpus, run_load, format_summary, format_sweep, find_knee
+from src.llm_standin import serve_ollama_standin
+from src.benchmark import DEFAULT_QUERIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the talent search API services")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="replay a query corpus against /search")
+    run.add_argument("--url", default="http://localhost:7777", help="service base URL")
+    run.add_argument("--corpus", help=".jsonl / .log / text file with queries (default: built-in queries)")
+    run.add_argument("--concurrency", type=int,
+                     help="clients (closed loop, default 8) or max in-flight requests (open loop, default 64)")
+    run.add_argument("--rate", type=float, help="open loop: Poisson arrivals per second")
+    run.add_argument("--rates", help="comma-separated rates to sweep, e.g. 1,2,4,8")
+    run.add_argument("--duration", type=float, default=30.0, help="seconds per run / sweep step")
+    run.add_argument("--sessions", type=int, default=50, help="distinct session ids (per-session rate limit)")
+    run.add_argument("--timeout", type=float, default=120.0)
+    run.add_argument("--endpoint", default="/search")
+    run.add_argument("--json", help="write the summaries to this JSON file")
+    ollama = sub.add_parser("ollama", help="run an Ollama stand-in that answers /api/chat with the heuristic intent")
+    ollama.add_argument("--port", type=int, default=11435)
+    ollama.add_argument("--latency-ms", type=float, default=300.0)
+    ollama.add_argument("--jitter-ms", type=float, default=100.0)
+    ollama.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    ollama.add_argument("--bad-json-rate", type=float, default=0.0, help="fraction answered with non-JSON content")
+    ollama.add_argument("--hang-rate", type=float, default=0.0, help="fraction held for --hang-s seconds")
+    ollama.add_argument("--hang-s", type=float, default=30.0)
+    ollama.add_argument("--replay-dir", help="answer with responses recorded by LLM_CACHE_MODE=record")
+    ollama.add_argument("--seed", type=int, help="random seed for latency and failures")
+    args = parser.parse_args(argv)
+
+    if args.command == "ollama":
+        server = serve_ollama_standin(
+            args.port, args.latency_ms, args.jitter_ms, replay_dir=args.replay_dir, seed=args.seed,
+            error_rate=args.error_rate, bad_json_rate=args.bad_json_rate, hang_rate=args.hang_rate, hang_s=args.hang_s,
+        )
+        print(f"Ollama stand-in on http://127.0.0.1:{args.port} ({args.latency_ms:.0f}±{args.jitter_ms:.0f} ms)")
+        print(f"Start the service with LLM_INTENT_ENABLED=1 OLLAMA_HOST=http://127.0.0.1:{args.port}")
+        try:
+            while True:
+                time.sleep(60)
+                if server.stats:
+                    print(f"answered: {dict(server.stats)}")
+        except KeyboardInterrupt:
+            return 0
+
+    try:
+        queries = load_corpus(args.corpus) if args.corpus else DEFAULT_QUERIES
+    except ValueError as e:
+        print(e)
+        return 1
+    if not queries:
+        print(f"No queries found in {args.corpus}")
+        return 1
+    print(f"{len(queries)} queries → {args.url}{args.endpoint}")
+
+    concurrency = args.concurrency or (64 if args.rate or args.rates else 8)
+    kwargs = dict(concurrency=concurrency, duration=args.duration, sessions=args.sessions,
+                  timeout=args.timeout, endpoint=args.endpoint, progress=print)
+    if args.rates:
+        steps = []
+        for rate in [float(r) for r in args.rates.split(",") if r.strip()]:
+            print(f"\n--- rate {rate}/s ---")
+            steps.append(run_load(args.url, queries, rate=rate, **kwargs))
+            print(format_summary(steps[-1]))
+        print("\nSweep")
+        print(format_sweep(steps))
+        knee = find_knee(steps)
+        if knee > 0:
+            print(f"\nSustainable: about {steps[knee - 1]['throughput']:.2f} searches/s "
+                  f"(p95 {steps[knee - 1]['latency_ms']['p95']:.0f} ms)")
+        elif knee == 0:
+            print("\nThe first step is already past the knee; sweep lower rates.")
+        result = {"steps": steps, "knee": knee}
+    else:
+        result = run_load(args.url, queries, rate=args.rate, **kwargs)
+        print()
+        print(format_summary(result))
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
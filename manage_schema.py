@@ -0,0 +1,124 @@
+"""
+Schema management for the talent search tables.
+
+Usage:
+- python manage_schema.py apply            # create pg_trgm + GIN indexes + project_tsv
+- python manage_schema.py verify           # check indexes/columns exist (exit 1 if not)
+- python manage_schema.py drop             # remove them again
+- python manage_schema.py seed --employees 50000 [--timesheet-days 20] [--reset [--yes-truncate]]
+                                           # load a synthetic dataset (LOCAL DB ONLY)
+                                           # --reset on Postgres asks for the database name
+                                           # (or needs --yes-truncate when not interactive)
+                                           # 1k – 1M employees; ≈ timesheet-days/2 timesheet rows each
+- python manage_schema.py seed --sqlite data/talent.db --employees 20000 --reset
+                                           # same dataset into a SQLite file (no Postgres needed)
+- python manage_schema.py copy-to-sqlite [--output data/talent.db]
+                                           # copy the Postgres tables into a SQLite file
+- python manage_schema.py report [--output logs/explain_report.md]
+                                           # before/after EXPLAIN ANALYZE report (read-only,
+                                           # needs `apply` first; "before" = index scans disabled)
+
+After `apply`, set PROJECT_FULLTEXT=1 in .env so sql_builder uses the
+full-text predicate for project descriptions.
+Set STORAGE_BACKEND=sqlite (and SQLITE_PATH) to search a SQLite file instead of Postgres.
+"""
+import os
+import sys
+import argparse
+from src.database import get_conn
+from src.schema import apply_indexes, drop_indexes, verify_indexes, build_report
+from src.synthetic_data import seed_dataset, truncate_tables, create_tables
+from src.storage import connect_sqlite, copy_to_sqlite
+from src.config import SQLITE_PATH, DB_HOST, DB_PORT, DB_NAME
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage search indexes for the talent search tables")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("apply", help="create pg_trgm GIN indexes and tsvector columns")
+    sub.add_parser("verify", help="verify indexes and tsvector columns")
+    sub.add_parser("drop", help="drop indexes and tsvector columns")
+    seed = sub.add_parser("seed", help="load a synthetic dataset into the configured database")
+    seed.add_argument("--employees", type=int, default=20000)
+    seed.add_argument("--seed", type=int, default=42)
+    seed.add_argument("--timesheet-days", type=int, default=20, help="max timesheet rows per employee (avg = half)")
+    seed.add_argument("--batch-size", type=int, default=5000, help="employees per COPY batch")
+    seed.add_argument("--reset", action="store_true", help="truncate the tables first")
+    seed.add_argument("--sqlite", metavar="PATH", help="seed this SQLite file instead of Postgres")
+    seed.add_argument("--yes-truncate", action="store_true", help="allow --reset on Postgres without a prompt")
+    copy = sub.add_parser("copy-to-sqlite", help="copy the four tables from Postgres into a SQLite file")
+    copy.add_argument("--output", default=SQLITE_PATH)
+    report = sub.add_parser("report", help="before/after EXPLAIN ANALYZE report")
+    report.add_argument("--output", default="logs/explain_report.md")
+    args = parser.parse_args(argv)
+
+    if args.command == "seed" and args.sqlite:
+        conn = connect_sqlite(args.sqlite)
+        try:
+            _seed(conn, args)
+        finally:
+            conn.close()
+        return 0
+
+    if args.command == "seed" and args.reset and not args.yes_truncate and not _confirm_truncate():
+        print("Aborted: nothing truncated. Use --sqlite, or --yes-truncate for a disposable Postgres database.")
+        return 2
+
+    with get_conn() as conn:
+        if args.command == "apply":
+            apply_indexes(conn)
+            print("Indexes applied. Set PROJECT_FULLTEXT=1 to enable full-text project search.")
+        elif args.command == "verify":
+            problems = verify_indexes(conn)
+            if problems:
+                for p in problems:
+                    print(f"MISSING: {p}")
+                return 1
+            print("All search indexes are present and valid.")
+        elif args.command == "drop":
+            drop_indexes(conn)
+            print("Indexes dropped.")
+        elif args.command == "seed":
+            _seed(conn, args)
+        elif args.command == "copy-to-sqlite":
+            counts = copy_to_sqlite(conn, args.output)
+            for table, n in counts.items():
+                print(f"{table}: {n} rows")
+            print(f"Copied to {args.output}. Set STORAGE_BACKEND=sqlite SQLITE_PATH={args.output} to use it.")
+        elif args.command == "report":
+            try:
+                text = build_report(conn)
+            except RuntimeError as e:
+                print(f"{e}\nRun `python manage_schema.py apply` first.")
+                return 1
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            print(text)
+            print(f"\nReport written to {args.output}")
+    return 0
+
+
+def _confirm_truncate():
+    """--reset di Postgres: user harus mengetik nama database dulu (non-interaktif → tolak)"""
+    target = f"{DB_NAME}@{DB_HOST}:{DB_PORT}"
+    if not sys.stdin.isatty():
+        print(f"Refusing to truncate {target} without --yes-truncate.")
+        return False
+    answer = input(f"This TRUNCATEs the talent tables in {target}. Type the database name to continue: ")
+    return answer.strip() == DB_NAME
+
+
+def _seed(conn, args):
+    if args.reset:
+        create_tables(conn)
+        truncate_tables(conn)
+    counts = seed_dataset(
+        conn, args.employees, seed=args.seed, batch_size=args.batch_size, timesheet_days=args.timesheet_days,
+    )
+    for table, n in counts.items():
+        print(f"{table}: {n} rows")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
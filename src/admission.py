@@ -0,0 +1,232 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from src.config import (
+    logger, SEARCH_MAX_CONCURRENT, SEARCH_MAX_QUEUE, SEARCH_QUEUE_TIMEOUT_S,
+    RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST,
+)
+from src.metrics import Counter, Histogram, register_gauge
+
+# =============================================
+# Admission control (dipakai FastAPI, Flask, Telegram)
+# 1. Token bucket per user/session → terlalu sering: Rejected("rate_limited") → 429
+# 2. Maks SEARCH_MAX_CONCURRENT search jalan bersamaan (masing-masing 4 query SQL)
+# 3. Sisanya antri (maks SEARCH_MAX_QUEUE, tunggu maks SEARCH_QUEUE_TIMEOUT_S);
+#    antrian penuh / timeout → Rejected("busy") → 503, langsung, tanpa menyentuh Postgres
+# Waiter sync (Flask thread) dan async (event loop) berbagi satu antrian FIFO.
+# =============================================
+
+ADMISSION_REJECTED_TOTAL = Counter(
+    "talent_admission_rejected_total", "Searches rejected by admission control", ["reason"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "talent_admission_wait_seconds", "Time spent waiting in the admission queue",
+)
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason  # "rate_limited" | "busy"
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+    @property
+    def status_code(self) -> int:
+        return 429 if self.reason == "rate_limited" else 503
+
+    @property
+    def message(self) -> str:
+        if self.reason == "rate_limited":
+            return f"Too many searches, please retry in {self.retry_after}s"
+        return f"Search service is busy, please retry in {self.retry_after}s"
+
+
+class TokenBucket:
+    """Token bucket per key; rate_per_minute <= 0 → tanpa batas."""
+
+    MAX_KEYS = 10000
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self._buckets = {}  # key → (tokens, last_refill)
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key) -> float:
+        """0 → boleh; > 0 → detik sampai token berikutnya tersedia."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                if len(self._buckets) > self.MAX_KEYS:
+                    self._evict_full(now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def _evict_full(self, now):
+        # bucket yang sudah terisi penuh lagi sama dengan bucket baru → aman dibuang
+        for key, (tokens, last) in list(self._buckets.items()):
+            if tokens + (now - last) * self.rate >= self.burst:
+                del self._buckets[key]
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, event=None, loop=None, future=None):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+    def wake(self):
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(True)
+
+
+class Ticket:
+    """Slot yang didapat dari acquire(); release() idempotent (aman dipanggil dari 2 jalur)."""
+    __slots__ = ("_controller", "_released")
+
+    def __init__(self, controller):
+        self._controller = controller
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent, max_queue, queue_timeout, rate_per_minute, burst):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.buckets = TokenBucket(rate_per_minute, burst)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+
+    # --- state (untuk metrics / health) ---
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def check_rate(self, key):
+        wait = self.buckets.try_acquire(key)
+        if wait > 0:
+            ADMISSION_REJECTED_TOTAL.inc(reason="rate_limited")
+            logger.info(f"[{key}] rate limited, retry in {wait:.1f}s")
+            raise Rejected("rate_limited", wait)
+
+    def _try_enter_or_enqueue(self, make_waiter):
+        """None → slot didapat langsung; _Waiter → harus menunggu."""
+        with self._lock:
+            if self._in_flight < self.max_concurrent and not self._waiters:
+                self._in_flight += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                ADMISSION_REJECTED_TOTAL.inc(reason="queue_full")
+                raise Rejected("busy", self.queue_timeout)
+            waiter = make_waiter()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter) -> bool:
+        """Waiter berhenti menunggu (timeout/cancel). True → ternyata slot sudah diberikan."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def _release(self):
+        with self._lock:
+            if self._waiters:
+                # slot langsung dipindah ke waiter berikutnya (in_flight tetap)
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self._in_flight -= 1
+
+    # --- sync (Flask) ---
+    def acquire(self, key, rate_limited=True) -> Ticket:
+        if rate_limited:
+            self.check_rate(key)
+        waiter = self._try_enter_or_enqueue(lambda: _Waiter(event=threading.Event()))
+        if waiter is not None:
+            t0 = time.perf_counter()
+            waiter.event.wait(self.queue_timeout)
+            if not waiter.granted and not self._abandon(waiter):
+                ADMISSION_REJECTED_TOTAL.inc(reason="queue_timeout")
+                raise Rejected("busy", self.queue_timeout)
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - t0)
+        return Ticket(self)
+
+    @contextmanager
+    def admit(self, key):
+        ticket = self.acquire(key)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    # --- async (FastAPI, Telegram) ---
+    async def acquire_async(self, key, rate_limited=True) -> Ticket:
+        """rate_limited=False → caller sudah memanggil check_rate() sendiri."""
+        if rate_limited:
+            self.check_rate(key)
+        loop = asyncio.get_running_loop()
+        waiter = self._try_enter_or_enqueue(lambda: _Waiter(loop=loop, future=loop.create_future()))
+        if waiter is not None:
+            t0 = time.perf_counter()
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                if not self._abandon(waiter):
+                    ADMISSION_REJECTED_TOTAL.inc(reason="queue_timeout")
+                    raise Rejected("busy", self.queue_timeout)
+            except asyncio.CancelledError:
+                if self._abandon(waiter):
+                    self._release()
+                raise
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - t0)
+        return Ticket(self)
+
+    @asynccontextmanager
+    async def admit_async(self, key):
+        ticket = await self.acquire_async(key)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+
+admission = AdmissionController(
+    SEARCH_MAX_CONCURRENT, SEARCH_MAX_QUEUE, SEARCH_QUEUE_TIMEOUT_S, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST,
+)
+
+register_gauge(
+    "talent_admission_searches", "Searches running / waiting for a slot", ["state"],
+    lambda: {("in_flight",): admission.in_flight, ("queued",): admission.queue_depth},
+)
@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+# =============================================
+# Background event loop untuk API sync
+# - run_all_queries (sync) = run_sync(run_all_queries_async(...))
+# - Satu loop per proses di daemon thread → asyncpg pool bisa dipakai ulang
+#   oleh caller sync (UI Tkinter, Flask, script test)
+# - contextvars caller ikut terbawa (run_coroutine_threadsafe menyalin context)
+# =============================================
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_background_loop():
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def run_sync(coro):
+    """Jalankan coroutine di background loop dan tunggu hasilnya (blocking)."""
+    loop = get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the background loop; await the coroutine instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
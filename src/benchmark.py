@@ -0,0 +1,182 @@
+import json
+import time
+import statistics
+from collections import defaultdict
+from src.storage import get_backend
+from src.async_runtime import run_sync
+from src.intent_parser import call_ollama_intent
+from src.sql_builder import build_clauses, build_queries
+from src.query_executor import build_employees, evaluate_employee, _ids_without_name
+from src.scoring import score_candidate
+from src.formatter import format_employee_summary, format_bucketed_sentences
+
+# =============================================
+# Micro-benchmark per stage pipeline search (lihat benchmark.py)
+# - Tiap stage diukur TERPISAH dengan input yang sama seperti pipeline asli:
+#   intent → build_clauses → 4 query SQL (+ resolve nama) → merge →
+#   score_candidate → rank → formatter
+# - Tanpa span / metrics / slow query log → yang terukur hanya kode stage itu
+# - Hasil: min / median / p95 / mean (ms) per stage, bisa disimpan ke JSON
+#   dan dibandingkan dengan run sebelumnya (--compare)
+# =============================================
+
+DEFAULT_QUERIES = [
+    "3 sdm python",
+    "5 sdm Java spring",
+    "10 sdm react node",
+    "Technical Leader core banking",
+    "20 sdm java exp > 3",
+    "50 sdm kotlin",
+]
+
+TABLE_NAMES = [
+    "autobot_dataset_talent_profile_role_tech",
+    "autobot_dataset_talent_profile_project_experiences",
+    "autobot_dataset_talent_profile_education",
+    "autobot_dataset_talent_timesheet",
+]
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.sizes = defaultdict(list)
+
+    def measure(self, stage, func, *args, size=None):
+        t0 = time.perf_counter()
+        result = func(*args)
+        self.samples[stage].append(time.perf_counter() - t0)
+        if size is not None:
+            self.sizes[stage].append(size(result))
+        return result
+
+    def add(self, stage, seconds, size=None):
+        self.samples[stage].append(seconds)
+        if size is not None:
+            self.sizes[stage].append(size)
+
+    def summary(self) -> dict:
+        out = {}
+        for stage, values in self.samples.items():
+            ms = sorted(v * 1000 for v in values)
+            out[stage] = {
+                "n": len(ms),
+                "min_ms": round(ms[0], 3),
+                "median_ms": round(statistics.median(ms), 3),
+                "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+                "mean_ms": round(statistics.fmean(ms), 3),
+            }
+            if self.sizes.get(stage):
+                out[stage]["items"] = round(statistics.fmean(self.sizes[stage]), 1)
+        return out
+
+
+async def _fetch_each(queries, statement_timeout_ms=None):
+    """4 query di satu koneksi, tiap statement diukur sendiri → (rows_by_table, names, {label: detik})."""
+    async with get_backend().connect(statement_timeout_ms) as db:
+        rows_by_table, timings = {}, {}
+        for label, sql, params in queries:
+            t0 = time.perf_counter()
+            rows_by_table[label] = await db.fetch(sql, params)
+            timings[label] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        names = await db.resolve_names(_ids_without_name(rows_by_table))
+        timings["names"] = time.perf_counter() - t0
+    return rows_by_table, names, timings
+
+
+def _score_all(built, intent):
+    for d in built:
+        score_candidate(d, intent)
+    return built
+
+
+def _rank(built, intent, session_id):
+    ranked = [d for d in built if evaluate_employee(d, intent, session_id)]
+    ranked.sort(key=lambda x: x.get("score", 0), reverse=True)
+    return ranked
+
+
+def bench_query(query: str, timer: StageTimer, session_id: str = "bench"):
+    """Satu putaran pipeline untuk `query`, semua stage dicatat di timer."""
+    intent, _ = timer.measure("intent", call_ollama_intent, query)
+    timer.measure("build_clauses", build_clauses, intent)
+    queries = build_queries(intent, get_backend().fulltext)
+
+    rows_by_table, names, sql_timings = run_sync(_fetch_each(queries))
+    for label, seconds in sql_timings.items():
+        timer.add(f"sql.{label}", seconds, len(rows_by_table[label]) if label in rows_by_table else len(names))
+
+    built = timer.measure("merge", build_employees, rows_by_table, names, size=len)
+    timer.measure("score_candidate", _score_all, built, intent, size=len)
+    ranked = timer.measure("rank", _rank, built, intent, session_id, size=len)
+
+    lim = intent.get("limit", {}) or {}
+    primary = ranked[:int(lim.get("primary", 3))]
+    backup = ranked[len(primary):len(primary) + int(lim.get("backup", 2))]
+    timer.measure("format_employee_summary", lambda: [format_employee_summary(e, intent) for e in primary],
+                  size=len)
+    timer.measure("format_bucketed_sentences",
+                  lambda: format_bucketed_sentences([(e, e.get("score", 0)) for e in primary + backup]))
+    return len(ranked)
+
+
+def dataset_sizes(backend=None) -> dict:
+    backend = backend or get_backend()
+    sizes = {}
+    with backend.connect_sync() as db:
+        for table in TABLE_NAMES:
+            if backend.name == "postgres":
+                # reltuples (hasil ANALYZE) → instan, count(*) di 20 juta baris tidak
+                rows = db.fetch("SELECT reltuples::bigint AS n FROM pg_class WHERE oid = %s::regclass", [f"public.{table}"])
+            else:
+                rows = db.fetch(f"SELECT COUNT(*) AS n FROM {table}", [])
+            sizes[table] = rows[0]["n"]
+    return sizes
+
+
+def run_benchmark(queries, iterations: int = 10, warmup: int = 2, progress=print) -> dict:
+    """{"overall": {stage: stats}, "queries": {query: {"candidates", "stages"}}}"""
+    overall = StageTimer()
+    per_query = {}
+    for query in queries:
+        for _ in range(warmup):
+            bench_query(query, StageTimer())
+        timer = StageTimer()
+        candidates = 0
+        for _ in range(iterations):
+            candidates = bench_query(query, timer)
+        for stage, values in timer.samples.items():
+            overall.samples[stage].extend(values)
+            overall.sizes[stage].extend(timer.sizes.get(stage, []))
+        per_query[query] = {"candidates": candidates, "stages": timer.summary()}
+        progress(f"  {query!r}: {candidates} candidates")
+    return {"overall": overall.summary(), "queries": per_query}
+
+
+def format_table(stages: dict, baseline: dict = None) -> str:
+    """Tabel teks per stage; baseline (hasil run lain) → kolom perubahan median."""
+    header = f"{'stage':<28}{'n':>5}{'min':>10}{'median':>10}{'p95':>10}{'mean':>10}{'items':>9}"
+    if baseline:
+        header += f"{'Δ median':>11}"
+    lines = [header, "-" * len(header)]
+    for stage, s in stages.items():
+        line = (
+            f"{stage:<28}{s['n']:>5}{s['min_ms']:>10.3f}{s['median_ms']:>10.3f}"
+            f"{s['p95_ms']:>10.3f}{s['mean_ms']:>10.3f}{s.get('items', ''):>9}"
+        )
+        if baseline:
+            old = baseline.get(stage, {}).get("median_ms")
+            line += f"{(s['median_ms'] - old) / old * 100:>+10.1f}%" if old else f"{'-':>11}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def save_result(path: str, result: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def load_result(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+# =============================================
+# Search cancellation
+# - CancelToken dibuat per search oleh caller (API / Telegram / UI)
+# - query_executor meng-attach callback pembatalan untuk task yang
+#   sedang jalan; cancel() → task di-cancel, asyncpg mengirim cancel
+#   request ke Postgres untuk statement yang sedang berjalan
+# - Thread-safe: boleh di-cancel dari thread lain (mis. tombol UI)
+# =============================================
+
+
+class SearchCancelled(Exception):
+    """Search dibatalkan (client disconnect / query baru dari user yang sama)."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callback = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def attach(self, callback):
+        with self._lock:
+            self._callback = callback
+            cancelled = self._cancelled
+        if cancelled:
+            callback()
+
+    def detach(self):
+        with self._lock:
+            self._callback = None
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callback = self._callback
+        if callback is not None:
+            try:
+                callback()
+            except Exception:
+                pass  # task sudah selesai / loop sudah tertutup
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise SearchCancelled()
+
+
+async def run_cancellable(coro, cancel_token):
+    """Jalankan coro sebagai task terpisah → bisa di-cancel dari thread lain lewat CancelToken."""
+    task = asyncio.ensure_future(coro)
+    if cancel_token is not None:
+        loop = asyncio.get_running_loop()
+        cancel_token.attach(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if cancel_token is not None and cancel_token.cancelled:
+            raise SearchCancelled()
+        raise
+    finally:
+        if cancel_token is not None:
+            cancel_token.detach()
@@ -0,0 +1,142 @@
+import time
+import threading
+from src.config import (
+    logger, LLM_CIRCUIT_FAILURES, LLM_CIRCUIT_RESET_S, DB_CIRCUIT_FAILURES, DB_CIRCUIT_RESET_S,
+)
+from src.metrics import Counter, register_gauge
+
+# =============================================
+# Circuit breakers (Ollama, database)
+# - closed    : semua call jalan; N kegagalan berturut-turut → open
+# - open      : call langsung ditolak (tanpa menunggu timeout) →
+#               intent: heuristic parser, search: hasil terakhir intent tsb (stale)
+# - half_open : setelah reset_s, SATU request berikutnya jadi probe;
+#               sukses → closed, gagal → open lagi (reset_s dari awal)
+# Pemakaian: allow() → call → success() / failure(); abandon() kalau call
+# berhenti tanpa hasil (cancel, cache miss) supaya slot probe dilepas.
+# =============================================
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_TRANSITIONS_TOTAL = Counter(
+    "talent_circuit_transitions_total", "Circuit breaker state changes", ["circuit", "state"],
+)
+CIRCUIT_REJECTED_TOTAL = Counter(
+    "talent_circuit_rejected_total", "Calls skipped because the circuit was open", ["circuit"],
+)
+
+
+class CircuitOpen(Exception):
+    """Call ditolak circuit breaker; atribut sama dengan admission.Rejected (→ 503 + Retry-After)."""
+
+    status_code = 503
+
+    def __init__(self, circuit: str, retry_after: float):
+        super().__init__(f"{circuit} circuit is open")
+        self.circuit = circuit
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+    @property
+    def message(self) -> str:
+        return f"The {self.circuit} is unavailable, please retry in {self.retry_after}s"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_s: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_s = reset_s
+        self._lock = threading.Lock()  # dipakai thread Flask + event loop
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _transition(self, state):
+        if state != self._state:
+            logger.warning("[circuit] %s: %s → %s (failures=%d)", self.name, self._state, state, self._failures)
+            self._state = state
+            CIRCUIT_TRANSITIONS_TOTAL.inc(circuit=self.name, state=state)
+
+    def allow(self) -> bool:
+        """True → call boleh jalan (closed, atau jadi probe half-open); False → circuit open."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN and now - self._opened_at >= self.reset_s:
+                self._transition(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            # probe yang menggantung lebih lama dari reset_s tidak menahan circuit selamanya
+            if self._state == HALF_OPEN and (self._probe_started is None or now - self._probe_started > self.reset_s):
+                self._probe_started = now
+                return True
+        CIRCUIT_REJECTED_TOTAL.inc(circuit=self.name)
+        return False
+
+    def check(self):
+        """allow() atau CircuitOpen."""
+        if not self.allow():
+            raise CircuitOpen(self.name, self.retry_after)
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            self._transition(CLOSED)
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def record(self, ok: bool):
+        if ok:
+            self.success()
+        else:
+            self.failure()
+
+    def abandon(self):
+        """Call selesai tanpa vonis (cancel / bukan kesalahan service) → slot probe dilepas."""
+        with self._lock:
+            self._probe_started = None
+
+    @property
+    def retry_after(self) -> float:
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_s - (time.monotonic() - self._opened_at))
+
+    def snapshot(self) -> dict:
+        """State untuk /health."""
+        with self._lock:
+            state = self._state
+            if state == OPEN and time.monotonic() - self._opened_at >= self.reset_s:
+                state = HALF_OPEN  # transisi baru dicatat saat request berikutnya
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_after_s": round(self.retry_after, 1) if state == OPEN else 0.0,
+            }
+
+
+llm_breaker = CircuitBreaker("llm", LLM_CIRCUIT_FAILURES, LLM_CIRCUIT_RESET_S)
+db_breaker = CircuitBreaker("database", DB_CIRCUIT_FAILURES, DB_CIRCUIT_RESET_S)
+BREAKERS = (llm_breaker, db_breaker)
+
+
+def circuit_states() -> dict:
+    return {b.name: b.snapshot() for b in BREAKERS}
+
+
+register_gauge(
+    "talent_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["circuit"],
+    lambda: {(b.name,): _STATE_VALUE[b.snapshot()["state"]] for b in BREAKERS},
+)
@@ -1,6 +1,9 @@
 import os
+import copy
+import queue
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 # =============================================
@@ -12,6 +15,15 @@ DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASS = os.getenv("DB_PASS")
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+
+# =============================================
+# Storage backend (src/storage.py)
+# =============================================
+# postgres (default) | sqlite → satu file database, tanpa server (demo / offline dev)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgres").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/talent.db")
 
 # =============================================
 # Ollama (local LLM)
@@ -20,12 +32,148 @@ OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
 MODEL_CHAT = os.getenv("MODEL_CHAT", "qwen3:4b")
 # PRD v14: default tetap 50000 detik (override via .env)
 OLLAMA_TIMEOUT = int(os.getenv("OLLAMA_TIMEOUT", "50000"))
+# LLM intent parsing; default off → heuristic parser saja (stabil)
+LLM_INTENT_ENABLED = os.getenv("LLM_INTENT_ENABLED", "0") == "1"
+# Record / replay response Ollama (src/llm_cache.py): off | record | replay | auto
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off").lower()
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "data/llm_cache")
+
+# =============================================
+# Search indexes (lihat manage_schema.py)
+# =============================================
+# Full-text predicate untuk project description. Aktifkan setelah
+# `python manage_schema.py apply` membuat kolom project_tsv.
+PROJECT_FULLTEXT = os.getenv("PROJECT_FULLTEXT", "0") == "1"
+
+# =============================================
+# Per-search deadline (Postgres statement_timeout)
+# =============================================
+SEARCH_STATEMENT_TIMEOUT_MS = int(os.getenv("SEARCH_STATEMENT_TIMEOUT_MS", "15000"))
+
+# Batch search (POST /search/batch)
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "100"))
+# Maksimum parse intent (panggilan Ollama) yang berjalan bersamaan dalam satu batch
+BATCH_PARSE_CONCURRENCY = max(1, int(os.getenv("BATCH_PARSE_CONCURRENCY", "4")))
+
+# =============================================
+# Latency budget per search (src/deadline.py)
+# =============================================
+# 0 = tanpa budget (default: OLLAMA_TIMEOUT PRD v14 tidak dipotong)
+SEARCH_BUDGET_S = float(os.getenv("SEARCH_BUDGET_S", "0"))
+# LLM intent hanya dicoba kalau sisa budget > reserve ini (untuk SQL wajib + scoring)
+BUDGET_SQL_RESERVE_S = float(os.getenv("BUDGET_SQL_RESERVE_S", "2.0"))
+# Stage opsional (education, timesheet, ringkasan) hanya jalan kalau sisa budget > reserve ini
+BUDGET_OPTIONAL_RESERVE_S = float(os.getenv("BUDGET_OPTIONAL_RESERVE_S", "0.3"))
+
+# =============================================
+# Admission control (src/admission.py)
+# =============================================
+# Search yang boleh jalan bersamaan (tiap search = 4 statement SQL)
+SEARCH_MAX_CONCURRENT = int(os.getenv("SEARCH_MAX_CONCURRENT", "8"))
+SEARCH_MAX_QUEUE = int(os.getenv("SEARCH_MAX_QUEUE", "32"))
+SEARCH_QUEUE_TIMEOUT_S = float(os.getenv("SEARCH_QUEUE_TIMEOUT_S", "10"))
+# Token bucket per user/session; 0 = tanpa rate limit
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+
+# =============================================
+# Circuit breakers (src/circuit_breaker.py)
+# =============================================
+# N kegagalan berturut-turut → circuit open; setelah *_RESET_S satu request jadi probe
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", "3"))
+LLM_CIRCUIT_RESET_S = float(os.getenv("LLM_CIRCUIT_RESET_S", "30"))
+# Search yang degraded (statement timeout) juga dihitung gagal
+DB_CIRCUIT_FAILURES = int(os.getenv("DB_CIRCUIT_FAILURES", "5"))
+DB_CIRCUIT_RESET_S = float(os.getenv("DB_CIRCUIT_RESET_S", "15"))
+
+# =============================================
+# Paginated results (src/result_store.py)
+# =============================================
+# Ranking lengkap per search (id + score) disimpan untuk halaman berikutnya
+RESULT_STORE_MAX_ENTRIES = int(os.getenv("RESULT_STORE_MAX_ENTRIES", "2000"))
+RESULT_STORE_TTL_S = float(os.getenv("RESULT_STORE_TTL_S", "1800"))
+# Hasil lengkap terakhir per intent → dijawab (stale) saat circuit database open
+STALE_RESULTS_MAX_ENTRIES = int(os.getenv("STALE_RESULTS_MAX_ENTRIES", "500"))
+STALE_RESULTS_MAX_AGE_S = float(os.getenv("STALE_RESULTS_MAX_AGE_S", "86400"))
+
+# =============================================
+# Conversation refinement (src/conversation.py)
+# =============================================
+# Baris hasil search terakhir per session (untuk narrowing di memory)
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "200"))
+CONVERSATION_TTL_S = float(os.getenv("CONVERSATION_TTL_S", "900"))
+
+# =============================================
+# Streaming export (src/export.py)
+# =============================================
+# Baris per round trip named cursor; export jalan lama → timeout sendiri
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "2000"))
+EXPORT_STATEMENT_TIMEOUT_MS = int(os.getenv("EXPORT_STATEMENT_TIMEOUT_MS", "300000"))
+# Kandidat per record batch / row group (export Arrow / Parquet)
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+
+# =============================================
+# PDF reports (src/pdf_report.py)
+# =============================================
+# Report dibuat di worker process; job API disimpan REPORT_JOB_TTL_S detik
+REPORT_DIR = os.getenv("REPORT_DIR", "logs/reports")
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_MAX_PENDING = int(os.getenv("REPORT_MAX_PENDING", "8"))
+REPORT_MAX_JOBS = int(os.getenv("REPORT_MAX_JOBS", "100"))
+REPORT_JOB_TTL_S = float(os.getenv("REPORT_JOB_TTL_S", "3600"))
+
+# =============================================
+# Slow query log (logs/slow_queries.jsonl)
+# =============================================
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "500"))
+# Fraksi statement lambat yang di-EXPLAIN ANALYZE (query jalan 2x → jangan 1.0 di production)
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.1"))
+SLOW_QUERY_EXPLAIN_MAX_PER_MIN = int(os.getenv("SLOW_QUERY_EXPLAIN_MAX_PER_MIN", "6"))
+
+# =============================================
+# Request tracing (src/tracing.py)
+# =============================================
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+# OTLP/JSON, satu trace per baris; kosongkan untuk menonaktifkan file export
+TRACE_FILE = os.getenv("TRACE_FILE", "logs/traces.jsonl")
+# OTLP/HTTP JSON endpoint, mis. http://localhost:4318/v1/traces (opsional)
+TRACE_COLLECTOR_URL = os.getenv("TRACE_COLLECTOR_URL", "")
+
+# =============================================
+# Opt-in profiling per search (src/profiling.py)
+# =============================================
+# X-Debug-Profile header di API hanya dihormati kalau diizinkan
+DEBUG_PROFILE_ALLOWED = os.getenv("DEBUG_PROFILE_ALLOWED", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+
+# =============================================
+# Logging knobs
+# =============================================
+# DEBUG → baris per kandidat ikut ditulis (ribuan per search); untuk investigasi saja
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fraksi baris debug per kandidat (excluded/scored) yang ditulis saat LOG_LEVEL=DEBUG; 1.0 = semua
+LOG_CANDIDATE_SAMPLE_RATE = float(os.getenv("LOG_CANDIDATE_SAMPLE_RATE", "0.05"))
+# SQL audit (logs/sql_queries.jsonl) → ditulis per batch oleh thread terpisah
+SQL_AUDIT_FLUSH_EVERY = int(os.getenv("SQL_AUDIT_FLUSH_EVERY", "20"))
+SQL_AUDIT_FLUSH_SECONDS = float(os.getenv("SQL_AUDIT_FLUSH_SECONDS", "2.0"))
 
 # =============================================
 # Logging setup (console + daily rotating file)
+# - Logger hanya memasukkan record ke queue; console/file ditulis oleh
+#   QueueListener di thread sendiri → request tidak menunggu disk
+# - Format %-style: record di bawah level dibuang tanpa format; yang lolos hanya
+#   dirender message-nya (msg % args) saat masuk queue, supaya dict / list yang
+#   diubah caller sesudahnya tidak mengubah isi log. Format baris lengkap
+#   (timestamp, level) dan I/O console/file dikerjakan listener.
+# - propagate=False: tanpa ini setiap record juga sampai ke root logger →
+#   basicConfig di telegram_bot menulis baris kedua ke console secara sinkron di
+#   thread pemanggil (dobel + melewati queue). Konsekuensinya caplog pytest /
+#   handler di root tidak melihat record "TalentSearch"; pasang handler langsung
+#   di `logger` kalau perlu.
 # =============================================
 logger = logging.getLogger("TalentSearch")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
 
 os.makedirs("logs", exist_ok=True)
 
@@ -33,10 +181,26 @@ os.makedirs("logs", exist_ok=True)
 _console = logging.StreamHandler()
 _console.setLevel(logging.INFO)
 _console.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-logger.addHandler(_console)
 
 # File handler (DEBUG, rotate daily keep 7 days)
 _file = TimedRotatingFileHandler("logs/app.log", when="midnight", backupCount=7, encoding="utf-8")
 _file.setLevel(logging.DEBUG)
 _file.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
-logger.addHandler(_file)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler bawaan memformat baris lengkap di thread pemanggil; di sini hanya message-nya."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()  # snapshot args (mutable) sebelum pindah thread
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+_log_queue = queue.SimpleQueue()
+logger.addHandler(_DeferredQueueHandler(_log_queue))
+_listener = QueueListener(_log_queue, _console, _file, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
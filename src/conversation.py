@@ -0,0 +1,204 @@
+import re
+import copy
+import time
+import threading
+from collections import OrderedDict
+from src.config import PROJECT_FULLTEXT, CONVERSATION_MAX_SESSIONS, CONVERSATION_TTL_S
+from src.metrics import register_gauge
+
+# =============================================
+# Conversation refinement per session
+# "java developers" → "now with core banking" → "with exp > 5"
+# - Pesan yang diawali kata sambung (now, with, only, dan, yang, ...) digabung
+#   dengan intent sebelumnya (merge_intents)
+# - State menyimpan baris 4 tabel dari search DB terakhir (base_intent) +
+#   nama hasil resolve → kalau intent baru hanya MEMPERSEMPIT filter SQL
+#   base_intent (narrows), baris tsb difilter ulang di Python (filter_rows)
+#   lalu di-ranking seperti biasa; DB hanya dipakai kalau intent melebar
+# - Experience & limit tidak ada di SQL → selalu bisa dihitung di memory
+# =============================================
+
+REFINEMENT_RE = re.compile(
+    r"^\s*(now|also|and|with|without|only|but|plus|just|then|"
+    r"dan|yang|dengan|hanya|juga|lalu|terus|sekarang)\b",
+    re.I,
+)
+DEFAULT_LIMIT = {"primary": 3, "backup": 2}
+
+
+def is_refinement(text: str) -> bool:
+    """Pesan lanjutan (bukan search baru)?"""
+    return bool(REFINEMENT_RE.match(text or ""))
+
+
+def _merge_terms(prev_block, new_block):
+    merged = {"must_have": list(prev_block.get("must_have", [])), "nice_to_have": list(prev_block.get("nice_to_have", []))}
+    for key in ("must_have", "nice_to_have"):
+        for term in new_block.get(key, []):
+            if term not in merged["must_have"] and term not in merged[key]:
+                merged[key].append(term)
+    return merged
+
+
+def merge_intents(prev: dict, new: dict) -> dict:
+    """Intent sebelumnya + batasan baru dari pesan lanjutan."""
+    merged = copy.deepcopy(prev)
+    merged.pop("force_show", None)
+    for key in ("skills", "projects"):
+        if new.get(key):
+            merged[key] = _merge_terms(merged.get(key, {}) or {}, new[key])
+    for key in ("role", "name"):
+        if new.get(key):
+            merged[key] = new[key]
+    for key in ("experience", "education", "timesheet"):
+        if new.get(key):
+            merged[key] = {**(merged.get(key) or {}), **new[key]}
+    # heuristic parser selalu mengisi limit default → hanya jumlah eksplisit yang menimpa
+    if new.get("limit") and new["limit"] != DEFAULT_LIMIT:
+        merged["limit"] = new["limit"]
+    return merged
+
+
+# =============================================
+# Narrowing (mengikuti clause di sql_builder)
+# =============================================
+
+def _terms(intent: dict, key: str) -> set:
+    block = intent.get(key, {}) or {}
+    return {str(t).lower() for t in list(block.get("must_have", [])) + list(block.get("nice_to_have", []))}
+
+
+def _narrower_like(prev_value, new_value) -> bool:
+    """Satu `ILIKE %x%`: baris baru ⊆ baris lama kalau x baru mengandung x lama."""
+    if not prev_value:
+        return True
+    return bool(new_value) and str(prev_value).lower() in str(new_value).lower()
+
+
+def _narrower_terms(prev_terms: set, new_terms: set) -> bool:
+    """OR dari ILIKE: tiap term baru harus mengandung salah satu term lama."""
+    if not prev_terms:
+        return True
+    return bool(new_terms) and all(any(p in n for p in prev_terms) for n in new_terms)
+
+
+def narrows(base: dict, new: dict, fulltext: bool = PROJECT_FULLTEXT) -> bool:
+    """
+    True → baris yang akan dikembalikan SQL untuk `new` ⊆ baris untuk `base`
+    di keempat tabel, jadi `new` bisa dievaluasi dari baris `base` di memory.
+    """
+    if base.get("force_show") or new.get("force_show"):
+        return False
+    if not _narrower_like(base.get("role"), new.get("role")):
+        return False
+    if not _narrower_like(base.get("name"), new.get("name")):
+        return False
+    if not _narrower_terms(_terms(base, "skills"), _terms(new, "skills")):
+        return False
+    if fulltext:
+        # phraseto_tsquery tidak bisa ditiru persis di Python → harus identik
+        if _terms(base, "projects") != _terms(new, "projects"):
+            return False
+    elif not _narrower_terms(_terms(base, "projects"), _terms(new, "projects")):
+        return False
+    for key in ("education", "timesheet"):
+        if (base.get(key) or {}) != (new.get(key) or {}):
+            return False
+    return True
+
+
+def _ilike(value, term) -> bool:
+    return str(term).lower() in str(value or "").lower()
+
+
+def filter_rows(rows_by_table: dict, intent: dict, fulltext: bool = PROJECT_FULLTEXT) -> dict:
+    """Filter SQL intent (role / skills / projects / name) diterapkan ke baris di memory."""
+    role = intent.get("role")
+    name = intent.get("name")
+    skills = _terms(intent, "skills")
+    projects = _terms(intent, "projects")
+
+    def role_ok(r):
+        return (
+            (not role or _ilike(r.get("role"), role))
+            and (not skills or any(_ilike(r.get("ready_technology"), t) or _ilike(r.get("role"), t) for t in skills))
+            and (not name or _ilike(r.get("full_name"), name))
+        )
+
+    def project_ok(r):
+        return (
+            (fulltext or not projects
+             or any(_ilike(r.get("nama_project"), t) or _ilike(r.get("project_description"), t) for t in projects))
+            and (not name or _ilike(r.get("nama_lengkap"), name))
+        )
+
+    return {
+        "roles": [r for r in rows_by_table.get("roles", []) if role_ok(r)],
+        "projects": [r for r in rows_by_table.get("projects", []) if project_ok(r)],
+        # EDU_SQL: name clause memfilter kolom `name` (di-select sebagai major)
+        "education": [r for r in rows_by_table.get("education", []) if not name or _ilike(r.get("major"), name)],
+        "timesheet": [r for r in rows_by_table.get("timesheet", []) if not name or _ilike(r.get("employee_name"), name)],
+    }
+
+
+# =============================================
+# State per session
+# =============================================
+
+class ConversationState:
+    __slots__ = ("base_intent", "intent", "rows_by_table", "names", "built", "updated")
+
+    def __init__(self, base_intent, rows_by_table, names):
+        self.base_intent = base_intent
+        self.intent = base_intent
+        self.rows_by_table = rows_by_table
+        self.names = names
+        self.built = None  # employee (roles, projects, total experience) dari base, dibuat saat pertama dipakai
+        self.updated = time.monotonic()
+
+
+class ConversationStore:
+    def __init__(self, max_sessions: int, ttl_s: float):
+        self.max_sessions = max_sessions
+        self.ttl_s = ttl_s
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def get(self, session_id):
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is None:
+                return None
+            if time.monotonic() - state.updated > self.ttl_s:
+                del self._states[session_id]
+                return None
+            return state
+
+    def save(self, session_id, state):
+        state.updated = time.monotonic()
+        with self._lock:
+            self._states[session_id] = state
+            self._states.move_to_end(session_id)
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+
+    def touch(self, session_id, intent):
+        """Narrowing di memory: intent terakhir diganti, baris base tetap."""
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is not None:
+                state.intent = intent
+                state.updated = time.monotonic()
+                self._states.move_to_end(session_id)
+
+    def reset(self, session_id):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+
+conversations = ConversationStore(CONVERSATION_MAX_SESSIONS, CONVERSATION_TTL_S)
+
+register_gauge("talent_conversation_sessions", "Sessions with refinement state", [], lambda: {(): len(conversations)})
@@ -1,16 +1,103 @@
+import re
+import asyncio
 import psycopg2
+import asyncpg
 from psycopg2.extras import RealDictCursor
-from src.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS
+from src.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASS, DB_POOL_MIN, DB_POOL_MAX
+from src.metrics import register_gauge
 
 # =============================================
 # Database helpers
 # =============================================
 
 def get_conn():
+    """Koneksi sync (psycopg2) → dipakai tooling: manage_schema, seed dataset."""
     return psycopg2.connect(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASS,
-    )
\ No newline at end of file
+    )
+
+
+# =============================================
+# Async pool (asyncpg) → dipakai search pipeline
+# - Pool terikat ke event loop, jadi disimpan per loop
+#   (FastAPI / Telegram / background loop run_sync masing-masing punya pool)
+# - Yang disimpan task pembuatnya: request pertama yang bersamaan menunggu
+#   pool yang sama (tidak ada pool dobel yang bocor); gagal → dicoba lagi
+#   request berikutnya. Entry loop yang sudah ditutup dibuang.
+# =============================================
+
+_pools = {}  # loop → asyncio.Task (create_pool)
+
+
+def _prune_closed_loops():
+    for loop in [loop for loop in _pools if loop.is_closed()]:
+        _pools.pop(loop, None)
+
+
+def _ready_pools():
+    _prune_closed_loops()
+    return [t.result() for t in list(_pools.values()) if t.done() and not t.cancelled() and t.exception() is None]
+
+
+def _pool_stats():
+    pools = _ready_pools()
+    return {
+        ("size",): sum(p.get_size() for p in pools),
+        ("idle",): sum(p.get_idle_size() for p in pools),
+        ("max",): sum(p.get_max_size() for p in pools),
+    }
+
+
+register_gauge("talent_db_pool_connections", "asyncpg pool connections (all event loops)", ["state"], _pool_stats)
+
+
+async def _create_pool():
+    return await asyncpg.create_pool(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASS,
+        min_size=DB_POOL_MIN,
+        max_size=DB_POOL_MAX,
+    )
+
+
+async def get_pool():
+    loop = asyncio.get_running_loop()
+    creating = _pools.get(loop)
+    if creating is None:
+        _prune_closed_loops()
+        creating = loop.create_task(_create_pool())
+        _pools[loop] = creating
+    try:
+        # shield → request yang di-cancel tidak ikut membatalkan pool untuk request lain
+        return await asyncio.shield(creating)
+    except Exception:
+        if _pools.get(loop) is creating and creating.done():
+            _pools.pop(loop, None)
+        raise
+
+
+async def close_pool():
+    creating = _pools.pop(asyncio.get_running_loop(), None)
+    if creating is None:
+        return
+    try:
+        pool = await creating
+    except Exception:
+        return
+    await pool.close()
+
+
+_PLACEHOLDER_RE = re.compile(r"%s")
+
+
+def to_asyncpg(sql: str, params):
+    """sql_builder pakai placeholder psycopg2 (%s) → asyncpg ($1, $2, ...)."""
+    counter = iter(range(1, len(params) + 1))
+    return _PLACEHOLDER_RE.sub(lambda _: f"${next(counter)}", sql), list(params)
@@ -0,0 +1,64 @@
+import time
+from src.config import logger, SEARCH_BUDGET_S, BUDGET_SQL_RESERVE_S, BUDGET_OPTIONAL_RESERVE_S
+from src.metrics import Counter
+
+# =============================================
+# Latency budget end-to-end per search (SEARCH_BUDGET_S)
+# - Deadline dibuat saat request masuk (antrian admission ikut terhitung) dan
+#   diteruskan ke call_ollama_intent, run_all_queries dan formatter
+# - Stage wajib selalu jalan: intent (heuristic kalau LLM tidak muat),
+#   roles + projects (kandidat), scoring
+# - Stage opsional: education, timesheet, ringkasan per kandidat
+#   → sisa budget <= BUDGET_OPTIONAL_RESERVE_S: di-skip
+#   → selain itu dipotong: statement timeout = sisa budget - reserve
+#   yang tidak jalan / tidak selesai → deadline.skipped → response "omitted"
+# - Tabel yang difilter intent (mis. "lulusan S1", timesheet per project) tetap wajib
+# =============================================
+
+OPTIONAL_TABLES = ("education", "timesheet")
+
+BUDGET_SKIPPED_TOTAL = Counter(
+    "talent_budget_skipped_total", "Optional stages skipped or cut short by the search latency budget", ["stage"],
+)
+
+
+class Deadline:
+    def __init__(self, budget_s: float):
+        self.budget_s = budget_s
+        self.expires = time.monotonic() + budget_s
+        self.skipped = []
+
+    @classmethod
+    def start(cls, budget_s: float = SEARCH_BUDGET_S):
+        """Deadline baru, atau None kalau budget dimatikan (0)."""
+        return cls(budget_s) if budget_s and budget_s > 0 else None
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def allows(self, reserve_s: float = BUDGET_OPTIONAL_RESERVE_S) -> bool:
+        """Stage boleh dimulai kalau setelahnya masih tersisa reserve_s."""
+        return self.remaining() > reserve_s
+
+    def timeout_s(self, reserve_s: float = BUDGET_OPTIONAL_RESERVE_S) -> float:
+        return max(0.0, self.remaining() - reserve_s)
+
+    def skip(self, stage: str):
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+            BUDGET_SKIPPED_TOTAL.inc(stage=stage)
+            logger.info("[budget] %s skipped, %.0fms of %.1fs left", stage, self.remaining() * 1000, self.budget_s)
+
+
+def is_optional(label: str, intent: dict) -> bool:
+    """education / timesheet tanpa filter dari intent → boleh di-skip."""
+    return label in OPTIONAL_TABLES and not (intent or {}).get(label)
+
+
+def llm_timeout(deadline, default_s: float):
+    """Timeout panggilan Ollama: default, dipotong sisa budget; None → LLM tidak muat, pakai heuristic."""
+    if deadline is None:
+        return default_s
+    if not deadline.allows(BUDGET_SQL_RESERVE_S):
+        return None
+    return min(default_s, deadline.timeout_s(BUDGET_SQL_RESERVE_S))
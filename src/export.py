@@ -0,0 +1,324 @@
+import io
+import csv
+import time
+import datetime as dt
+from src.storage import get_backend
+from src.sql_builder import build_queries, restrict_to_employees
+from src.query_executor import TABLES, build_employee, evaluate_employee, group_by_employee
+from src.config import logger, EXPORT_FETCH_SIZE, EXPORT_STATEMENT_TIMEOUT_MS, EXPORT_BATCH_ROWS
+
+# pyarrow opsional: hanya dibutuhkan export Arrow / Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+# =============================================
+# Streaming export (dipakai UI, FastAPI, Flask)
+# - Intent dijalankan ulang di storage backend lewat cursor streaming (Postgres: named /
+#   server-side cursor): baris diambil per EXPORT_FETCH_SIZE, hasil search tidak disimpan di RAM
+# - mode "sections": 4 tabel berurutan (format lama export_csv), baris langsung
+#   diteruskan ke CSV → memory konstan
+# - mode "ranked": satu baris per kandidat, terurut score desc. Keempat query
+#   di-ORDER BY employee_id lalu di-merge-join → hanya baris SATU employee yang
+#   dipegang sekaligus; yang disimpan sampai akhir cuma baris ringkas per
+#   kandidat (untuk sorting), bukan puluhan ribu baris timesheet
+# - Arrow IPC / Parquet: lihat iter_columnar di bawah
+# - progress(stage, count): stage = nama tabel (baris terbaca) / "candidates"
+# =============================================
+
+EXPORT_MODES = ("ranked", "sections")
+COLUMNAR_FORMATS = ("arrow", "parquet")
+COLUMNAR_MEDIA_TYPES = {"arrow": "application/vnd.apache.arrow.stream", "parquet": "application/vnd.apache.parquet"}
+
+RANKED_COLUMNS = [
+    "rank", "employee_id", "full_name", "score", "total_experience_years",
+    "roles", "technologies", "projects", "education",
+    "timesheet_entries", "timesheet_projects", "last_timesheet_date",
+]
+
+
+def _ordered(queries):
+    # COLLATE "C" → urutan byte = urutan str Python (merge-join di _merge_by_employee)
+    return [
+        (label, f'SELECT * FROM ({sql}) q ORDER BY q.employee_id COLLATE "C"', params)
+        for label, sql, params in queries
+    ]
+
+
+def _stream(db, label, sql, params, fetch_size, progress=None, cancel_token=None):
+    """Baris satu query lewat cursor streaming backend, fetch_size baris per round trip."""
+    count = 0
+    for row in db.stream(label, sql, params, fetch_size):
+        count += 1
+        if count % fetch_size == 0:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if progress:
+                progress(label, count)
+        yield row
+    if progress:
+        progress(label, count)
+
+
+def log_progress(session_id: str):
+    """Callback progress untuk API: tiap batch named cursor ditulis ke log."""
+    def progress(stage, count):
+        logger.info("[%s] export %s: %d rows", session_id, stage, count)
+    return progress
+
+
+def _merge_by_employee(streams: dict):
+    """{label: iterator terurut employee_id} → (employee_id, {label: [rows]}) per employee."""
+    heads = {label: next(it, None) for label, it in streams.items()}
+    while True:
+        current = [row["employee_id"] for row in heads.values() if row is not None]
+        if not current:
+            return
+        emp_id = min(current)
+        tables = {t: [] for t in TABLES}
+        for label, it in streams.items():
+            row = heads[label]
+            while row is not None and row["employee_id"] == emp_id:
+                tables[label].append(row)
+                row = next(it, None)
+            heads[label] = row
+        yield emp_id, tables
+
+
+def _join(values) -> str:
+    return "; ".join(dict.fromkeys(str(v) for v in values if v))
+
+
+def flatten_employee(d: dict) -> list:
+    """Employee (build_employee + score) → satu baris CSV tanpa kolom rank."""
+    timesheet = d["timesheet"]
+    dates = [r.get("start_date") for r in timesheet if r.get("start_date")]
+    return [
+        d["employee_id"],
+        d["full_name"],
+        d.get("score", 0),
+        d["total_experience_years"],
+        _join(r.get("role") for r in d["roles"]),
+        _join(r.get("ready_technology") for r in d["roles"]),
+        _join(r.get("nama_project") for r in d["projects"]),
+        _join(" ".join(str(r.get(k)) for k in ("degree", "major", "school") if r.get(k)) for r in d["education"]),
+        len(timesheet),
+        _join(r.get("project_name") for r in timesheet),
+        max(dates) if dates else "",
+    ]
+
+
+def _rank_pass(db, intent, session_id, fetch_size, progress, cancel_token, keep):
+    """Merge-join 4 stream → [(score, keep(employee))] terurut score desc; baris mentah tidak disimpan."""
+    streams = {
+        label: _stream(db, label, sql, params, fetch_size, progress, cancel_token)
+        for label, sql, params in _ordered(build_queries(intent, db.backend.fulltext))
+    }
+    scored = []
+    for emp_id, tables in _merge_by_employee(streams):
+        d = build_employee(emp_id, tables)
+        if evaluate_employee(d, intent, session_id):
+            scored.append((d["score"], keep(d)))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+def _ranked_rows(db, intent, session_id, fetch_size, progress, cancel_token):
+    scored = _rank_pass(db, intent, session_id, fetch_size, progress, cancel_token, flatten_employee)
+    # semua cursor sudah habis dibaca → koneksi bebas untuk query nama
+    unnamed = [row for _, row in scored if row[1] == f"EMP-{row[0]}"]
+    names = db.resolve_names([row[0] for row in unnamed])
+    for row in unnamed:
+        row[1] = names.get(str(row[0]), row[1])
+
+    yield RANKED_COLUMNS
+    for rank, (_, row) in enumerate(scored, 1):
+        if rank % fetch_size == 0:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if progress:
+                progress("candidates", rank)
+        yield [rank] + row
+    if progress:
+        progress("candidates", len(scored))
+
+
+def _section_rows(db, intent, fetch_size, progress, cancel_token):
+    for label, sql, params in build_queries(intent, db.backend.fulltext):
+        yield [label]
+        empty = True
+        for row in _stream(db, label, sql, params, fetch_size, progress, cancel_token):
+            if empty:
+                yield list(row.keys())
+                empty = False
+            yield list(row.values())
+        if empty:
+            yield ["(empty)"]
+        yield []
+
+
+def iter_export_rows(intent: dict, mode: str = "ranked", session_id: str = "export",
+                     progress=None, cancel_token=None, fetch_size: int = EXPORT_FETCH_SIZE):
+    """
+    Generator baris CSV (list) untuk intent; koneksi dibuka saat iterasi dimulai
+    dan ditutup saat selesai / generator di-close (client disconnect, cancel).
+    """
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode: {mode}")
+    t0 = time.perf_counter()
+    with get_backend().connect_sync(EXPORT_STATEMENT_TIMEOUT_MS) as db:
+        if mode == "ranked":
+            yield from _ranked_rows(db, intent, session_id, fetch_size, progress, cancel_token)
+        else:
+            yield from _section_rows(db, intent, fetch_size, progress, cancel_token)
+    logger.info("[%s] %s export finished in %.2fs", session_id, mode, time.perf_counter() - t0)
+
+
+def write_csv(fileobj, rows) -> int:
+    """Tulis baris ke file (text mode, newline=""); return jumlah baris."""
+    writer = csv.writer(fileobj)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def iter_csv(rows, chunk_rows: int = 500):
+    """Baris → potongan teks CSV (untuk StreamingResponse / Flask Response)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if pending:
+        yield buf.getvalue()
+
+
+# =============================================
+# Columnar export (Arrow IPC stream / Parquet) untuk tim analytics
+# - Satu baris per kandidat (ranked), detail 4 tabel sebagai kolom list<struct>
+#   → tidak ada informasi yang hilang seperti di CandidateSummary JSON
+# - Pass 1: _rank_pass (hanya id + score yang disimpan)
+# - Pass 2: per EXPORT_BATCH_ROWS kandidat, baris detail diambil ulang dengan
+#   restrict_to_employees (seperti halaman berikutnya di pagination) → satu
+#   record batch / row group; byte yang sudah ditulis writer langsung di-yield
+# =============================================
+
+def arrow_schema():
+    text = pa.string()
+    return pa.schema([
+        ("rank", pa.int32()),
+        ("employee_id", text),
+        ("full_name", text),
+        ("score", pa.float64()),
+        ("total_experience_months", pa.int32()),
+        ("total_experience_years", pa.float64()),
+        ("roles", pa.list_(pa.struct([("role", text), ("ready_technology", text)]))),
+        ("projects", pa.list_(pa.struct([
+            ("nama_project", text), ("project_description", text), ("durasi_role", text),
+        ]))),
+        ("education", pa.list_(pa.struct([("degree", text), ("school", text), ("major", text)]))),
+        ("timesheet", pa.list_(pa.struct([("project_name", text), ("date", pa.date32())]))),
+    ])
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return dt.date.fromisoformat(value[:10])
+    return value
+
+
+def _candidate_record(rank, score, d) -> dict:
+    return {
+        "rank": rank,
+        "employee_id": str(d["employee_id"]),
+        "full_name": d["full_name"],
+        "score": float(score),
+        "total_experience_months": d["total_experience_months"],
+        "total_experience_years": d["total_experience_years"],
+        "roles": [{"role": r.get("role"), "ready_technology": r.get("ready_technology")} for r in d["roles"]],
+        "projects": [
+            {"nama_project": r.get("nama_project"), "project_description": r.get("project_description"),
+             "durasi_role": r.get("durasi_role")}
+            for r in d["projects"]
+        ],
+        "education": [{"degree": r.get("degree"), "school": r.get("school"), "major": r.get("major")} for r in d["education"]],
+        "timesheet": [{"project_name": r.get("project_name"), "date": _as_date(r.get("start_date"))} for r in d["timesheet"]],
+    }
+
+
+def _hydrate(db, intent, ranked_slice, first_rank, schema):
+    """[(score, employee_id)] → RecordBatch (baris detail hanya untuk employee di slice ini)."""
+    ids = [emp_id for _, emp_id in ranked_slice]
+    rows_by_table = {
+        label: db.fetch(sql, params)
+        for label, sql, params in restrict_to_employees(build_queries(intent, db.backend.fulltext), ids)
+    }
+    grouped = group_by_employee(rows_by_table)
+    built = [build_employee(emp_id, grouped.get(emp_id, {})) for emp_id in ids]
+    names = db.resolve_names([d["employee_id"] for d in built if d["full_name"] == f"EMP-{d['employee_id']}"])
+    records = []
+    for n, ((score, _), d) in enumerate(zip(ranked_slice, built)):
+        d["full_name"] = names.get(str(d["employee_id"]), d["full_name"])
+        records.append(_candidate_record(first_rank + n, score, d))
+    return pa.RecordBatch.from_pylist(records, schema=schema)
+
+
+class _ChunkSink:
+    """File-like tujuan writer pyarrow; isinya diambil per batch dengan drain()."""
+
+    def __init__(self):
+        self._chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_columnar(intent: dict, fmt: str = "arrow", session_id: str = "export", progress=None,
+                  cancel_token=None, batch_rows: int = EXPORT_BATCH_ROWS, fetch_size: int = EXPORT_FETCH_SIZE):
+    """Generator bytes Arrow IPC stream / Parquet: kandidat ranked, satu record batch per batch_rows."""
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed (pip install pyarrow)")
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+    t0 = time.perf_counter()
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with get_backend().connect_sync(EXPORT_STATEMENT_TIMEOUT_MS) as db:
+        ranked = _rank_pass(db, intent, session_id, fetch_size, progress, cancel_token, lambda d: d["employee_id"])
+        out = pa.PythonFile(sink, mode="w")
+        writer = pa.ipc.new_stream(out, schema) if fmt == "arrow" else pq.ParquetWriter(out, schema)
+        try:
+            for start in range(0, len(ranked), batch_rows):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                writer.write_batch(_hydrate(db, intent, ranked[start:start + batch_rows], start + 1, schema))
+                if progress:
+                    progress("candidates", min(start + batch_rows, len(ranked)))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+    logger.info("[%s] %s export of %d candidates finished in %.2fs", session_id, fmt, len(ranked), time.perf_counter() - t0)
@@ -1,3 +1,6 @@
+from src.metrics import timed_stage
+from src.tracing import traced
+from src.profiling import profiled_stage
 
 
 def build_must_nice_sections(emp: dict, intent: dict):
@@ -21,6 +24,9 @@ def build_must_nice_sections(emp: dict, intent: dict):
     return must_lines, nice_lines
 
 
+@traced("format_employee_summary")
+@timed_stage("formatting")
+@profiled_stage("formatting")
 def format_employee_summary(emp: dict, intent: dict) -> str:
     name = emp.get("full_name", f"EMP-{emp['employee_id']}")
     role_level = ""
@@ -109,6 +115,9 @@ def format_employee_summary(emp: dict, intent: dict) -> str:
     return "\n".join(parts)
 
 
+@traced("format_bucketed_sentences")
+@timed_stage("formatting")
+@profiled_stage("formatting")
 def format_bucketed_sentences(sorted_emps):
     lines = []
     for emp, score in sorted_emps:
@@ -123,3 +132,14 @@ def format_bucketed_sentences(sorted_emps):
         years = emp.get("total_experience_years", 0)
         lines.append(f"{name} {role or ''} {techs or ''} {years:.1f} years.")
     return "\n".join(lines)
+
+
+def format_candidate(emp: dict, intent: dict, deadline=None) -> str:
+    """
+    Ringkasan lengkap (format_employee_summary); budget search hampir habis
+    (src/deadline.py) → satu kalimat pendek dan "summary" masuk deadline.skipped.
+    """
+    if deadline is not None and not deadline.allows():
+        deadline.skip("summary")
+        return format_bucketed_sentences([(emp, emp.get("score", 0))])
+    return format_employee_summary(emp, intent)
@@ -1,7 +1,16 @@
 import re
 import json
-from typing import Tuple, Dict, Any
-from src.config import logger
+import time
+import asyncio
+from typing import Tuple, Dict, Any, Optional
+import ollama
+from src.config import logger, OLLAMA_HOST, MODEL_CHAT, OLLAMA_TIMEOUT, LLM_INTENT_ENABLED
+from src.metrics import INTENT_PARSE_SECONDS
+from src.llm_cache import llm_cache, LLMCacheMiss
+from src.circuit_breaker import llm_breaker
+from src.deadline import llm_timeout
+from src.tracing import traced
+from src.profiling import profiled_stage
 
 # Regex untuk deteksi pengalaman
 EXPERIENCE_GT_RE = re.compile(r"(experience|exp)\s*[>]\s*(\d+)\s*(years?|year)?", re.I)
@@ -108,31 +117,170 @@ def _extract_skills(txt: str) -> Dict[str, list]:
         "nice_to_have": sorted(list(nice_skills))
     }
 
-def call_ollama_intent(user_query: str) -> Tuple[Dict[str, Any], str]:
+# =============================================
+# LLM intent prompt (Ollama, format JSON)
+# =============================================
+INTENT_SYSTEM_PROMPT = """You convert talent search requests into JSON. Reply with JSON only, using these keys:
+{"role": str, "skills": {"must_have": [str], "nice_to_have": [str]},
+ "projects": {"must_have": [str], "nice_to_have": [str]},
+ "experience": {"min_months": int, "max_months": int},
+ "education": {"preferred": {"degree": str, "school": str}, "substitute": {"degree": str, "school": str}},
+ "timesheet": {"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "project": str},
+ "limit": {"primary": int, "backup": int}, "name": str}
+Omit keys that are not mentioned. Capitalized skills are must_have, lowercase skills are nice_to_have.
+Skills and projects are lowercase in the output."""
+
+
+def _llm_messages(txt: str):
+    return [
+        {"role": "system", "content": INTENT_SYSTEM_PROMPT},
+        {"role": "user", "content": txt},
+    ]
+
+
+def _intent_from_llm(content: str) -> Dict[str, Any]:
+    """Validasi + normalisasi JSON dari LLM; error → caller fallback ke heuristic."""
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError(f"LLM returned {type(data).__name__}, expected object")
+
+    intent: Dict[str, Any] = {}
+    if data.get("role"):
+        intent["role"] = str(data["role"])
+    for key in ("skills", "projects"):
+        block = data.get(key) or {}
+        must = [str(x).lower() for x in block.get("must_have", []) or [] if x]
+        nice = [str(x).lower() for x in block.get("nice_to_have", []) or [] if x]
+        if must or nice:
+            intent[key] = {"must_have": must, "nice_to_have": nice}
+    exp = {k: int(v) for k, v in (data.get("experience") or {}).items()
+           if k in ("min_months", "max_months", "min_years", "max_years") and v is not None}
+    if exp:
+        intent["experience"] = exp
+    for key in ("education", "timesheet"):
+        if data.get(key):
+            intent[key] = data[key]
+    if data.get("name"):
+        intent["name"] = str(data["name"])
+
+    lim = data.get("limit") or {}
+    intent["limit"] = {
+        "primary": int(lim.get("primary") or 3),
+        "backup": int(lim.get("backup") or 2),
+    }
+    return intent
+
+
+def _name_only_intent(txt: str) -> Optional[Dict[str, Any]]:
+    if _only_name_query(txt):
+        name = txt.strip().strip('"').strip("'")
+        intent = {"name": name, "force_show": True}
+        logger.info(f"[intent] name-only -> {intent}")
+        return intent
+    return None
+
+
+def _llm_failed(error: Exception, t0: float):
+    """LLM gagal → dicatat (metrics + circuit breaker), caller lanjut ke heuristic."""
+    INTENT_PARSE_SECONDS.observe(time.perf_counter() - t0, method="llm_failed")
+    if isinstance(error, LLMCacheMiss):
+        llm_breaker.abandon()  # replay tanpa rekaman, Ollama tidak dipanggil
+    else:
+        llm_breaker.failure()
+    logger.error("LLM parsing failed, using heuristic. Error: %s", error)
+
+
+class _IntentCall:
+    """
+    Satu parse intent, dipakai bersama call_ollama_intent & versi async.
+    Keduanya hanya beda di transport (llm_cache.chat vs chat_async);
+    name-only, timeout/circuit, parsing response, metrics, dan fallback ada di sini.
+    """
+
+    def __init__(self, user_query: str, deadline=None):
+        self.txt = user_query.strip()
+        self.result = None
+        self.messages = None
+
+        # 1) Name-only
+        t0 = time.perf_counter()
+        intent = _name_only_intent(self.txt)
+        if intent:
+            INTENT_PARSE_SECONDS.observe(time.perf_counter() - t0, method="name")
+            self.result = (intent, self.txt)
+            return
+
+        # 2) Try LLM (LLM_INTENT_ENABLED=1), fallback heuristic
+        #    circuit LLM open (Ollama berkali-kali gagal / timeout) → langsung heuristic
+        self.timeout = llm_timeout(deadline, OLLAMA_TIMEOUT) if LLM_INTENT_ENABLED else None
+        if self.timeout and llm_breaker.allow():
+            self.t0 = time.perf_counter()
+            self.messages = _llm_messages(self.txt)
+
+    def chat_args(self, client_cls):
+        """Argumen llm_cache.chat / chat_async; client_cls = ollama.Client atau ollama.AsyncClient."""
+        client = client_cls(host=OLLAMA_HOST, timeout=self.timeout)
+        messages = self.messages
+        return MODEL_CHAT, messages, "json", lambda: client.chat(model=MODEL_CHAT, messages=messages, format="json")
+
+    def llm_done(self, resp) -> Tuple[Dict[str, Any], str]:
+        intent = _intent_from_llm(resp["message"]["content"])
+        llm_breaker.success()
+        INTENT_PARSE_SECONDS.observe(time.perf_counter() - self.t0, method="llm")
+        logger.info(f"[intent] llm -> {intent}")
+        return intent, self.txt
+
+    def llm_failed(self, error: Exception):
+        _llm_failed(error, self.t0)
+
+    def fallback(self) -> Tuple[Dict[str, Any], str]:
+        # 3) Heuristic fallback
+        with INTENT_PARSE_SECONDS.time(method="heuristic"):
+            return heuristic_intent(self.txt)
+
+
+@traced("call_ollama_intent")
+@profiled_stage("intent")
+def call_ollama_intent(user_query: str, deadline=None) -> Tuple[Dict[str, Any], str]:
     """
     Parse user query → intent.
     - Nama saja → {"name": "Dedi", "force_show": True}
     - Experience → min_months / max_months
     - Skills, role, timesheet juga diisi
+    - deadline (src/deadline.py) → timeout LLM dipotong sisa budget; tidak muat → heuristic
     """
-    txt = user_query.strip()
+    call = _IntentCall(user_query, deadline)
+    if call.result:
+        return call.result
+    if call.messages:
+        try:
+            return call.llm_done(llm_cache.chat(*call.chat_args(ollama.Client)))
+        except Exception as e:
+            call.llm_failed(e)
+    return call.fallback()
 
-    # 1) Name-only
-    if _only_name_query(txt):
-        name = txt.strip().strip('"').strip("'")
-        intent = {"name": name, "force_show": True}
-        logger.info(f"[intent] name-only -> {intent}")
-        return intent, txt
 
-    # 2) Try LLM (skip for now, fallback heuristic)
-    try:
-        raise RuntimeError("Skip LLM for stability")
-    except Exception as e:
-        logger.error("LLM parsing failed, using heuristic. Error: %s", e)
+@traced("call_ollama_intent")
+@profiled_stage("intent")
+async def call_ollama_intent_async(user_query: str, deadline=None) -> Tuple[Dict[str, Any], str]:
+    """Versi async call_ollama_intent (FastAPI / Telegram) → tidak memblok event loop."""
+    call = _IntentCall(user_query, deadline)
+    if call.result:
+        return call.result
+    if call.messages:
+        try:
+            return call.llm_done(await llm_cache.chat_async(*call.chat_args(ollama.AsyncClient)))
+        except asyncio.CancelledError:
+            llm_breaker.abandon()
+            raise
+        except Exception as e:
+            call.llm_failed(e)
+    return call.fallback()
 
-    # 3) Heuristic fallback
-    intent: Dict[str, Any] = {}
 
+def heuristic_intent(txt: str) -> Tuple[Dict[str, Any], str]:
+    """Regex/whitelist parser (tanpa LLM)."""
+    intent: Dict[str, Any] = {}
     # Check for quantity request (e.g., "5 talent python")
     quantity_match = re.match(r"^(\d+)\s+(?:talent|person|people|kandidat|candidates?|orang|individual|sdm|resource|resources)\b", txt, re.I)
     if quantity_match:
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import hashlib
+import datetime as dt
+from src.config import logger, LLM_CACHE_MODE, LLM_CACHE_DIR
+from src.metrics import Counter
+
+# =============================================
+# Record / replay untuk panggilan Ollama (LLM_CACHE_MODE)
+# - off    : langsung ke Ollama (default)
+# - record : panggil Ollama, response disimpan (menimpa rekaman lama)
+# - replay : HANYA dari rekaman; tidak ada → LLMCacheMiss (intent_parser fallback heuristic)
+# - auto   : ada rekaman → dipakai, tidak ada → Ollama + simpan
+# - Key = sha256(model, messages, format) → satu file JSON per prompt di LLM_CACHE_DIR,
+#   bisa di-commit sebagai fixture; test / benchmark jadi cepat dan deterministik
+# =============================================
+
+MODES = ("off", "record", "replay", "auto")
+
+LLM_CACHE_TOTAL = Counter(
+    "talent_llm_cache_total", "LLM record/replay lookups", ["result"],
+)
+
+
+class LLMCacheMiss(Exception):
+    """Mode replay dan prompt ini belum pernah direkam."""
+
+
+def cache_key(model: str, messages, fmt=None) -> str:
+    payload = json.dumps({"model": model, "messages": messages, "format": fmt}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, directory: str, mode: str = "off"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM_CACHE_MODE: {mode} (expected one of {', '.join(MODES)})")
+        self.directory = directory
+        self.mode = mode
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def load(self, key: str):
+        try:
+            with open(self.path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.error(f"[llm-cache] unreadable recording {key}: {e}")
+            return None
+
+    def store(self, key, model, messages, fmt, response, seconds):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "model": model,
+            "format": fmt,
+            "messages": messages,
+            "response": dict(response),
+            "recorded_at": dt.datetime.now().isoformat(timespec="seconds"),
+            "latency_s": round(seconds, 3),
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp, path)  # atomic → pembaca tidak pernah melihat file setengah jadi
+
+    def _lookup(self, key):
+        """Rekaman untuk key (replay / auto) atau None kalau harus memanggil Ollama."""
+        if self.mode not in ("replay", "auto"):
+            return None
+        hit = self.load(key)
+        if hit is not None:
+            LLM_CACHE_TOTAL.inc(result="hit")
+            return hit["response"]
+        LLM_CACHE_TOTAL.inc(result="miss")
+        if self.mode == "replay":
+            raise LLMCacheMiss(f"no recording for {key[:12]} in {self.directory}")
+        return None
+
+    def _record(self, key, model, messages, fmt, response, seconds):
+        self.store(key, model, messages, fmt, response, seconds)
+        LLM_CACHE_TOTAL.inc(result="recorded")
+
+    def chat(self, model, messages, fmt, call):
+        """call() → response Ollama; dibungkus record / replay sesuai mode."""
+        if self.mode == "off":
+            return call()
+        key = cache_key(model, messages, fmt)
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        t0 = time.perf_counter()
+        response = call()
+        self._record(key, model, messages, fmt, response, time.perf_counter() - t0)
+        return response
+
+    async def chat_async(self, model, messages, fmt, call):
+        """Versi async: call() → awaitable response Ollama."""
+        if self.mode == "off":
+            return await call()
+        key = cache_key(model, messages, fmt)
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        t0 = time.perf_counter()
+        response = await call()
+        self._record(key, model, messages, fmt, response, time.perf_counter() - t0)
+        return response
+
+
+llm_cache = LLMCache(LLM_CACHE_DIR, LLM_CACHE_MODE)
@@ -0,0 +1,121 @@
+import json
+import time
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.intent_parser import heuristic_intent
+from src.llm_cache import LLMCache, cache_key
+
+# =============================================
+# Ollama stand-in (python loadtest.py ollama)
+# - HTTP server lokal dengan endpoint /api/chat dan /api/tags seperti Ollama
+# - Jawaban: rekaman llm_cache (replay_dir) kalau prompt pernah direkam,
+#   selain itu heuristic_intent dalam format JSON LLM
+# - Latency buatan (gauss latency ± jitter) + failure injection:
+#   error_rate → HTTP 500, bad_json_rate → content bukan JSON,
+#   hang_rate → response ditahan hang_s detik (uji OLLAMA_TIMEOUT)
+# - Config di server.config → bisa diubah saat server jalan (test fallback)
+# =============================================
+
+DEFAULT_CONFIG = {
+    "latency_s": 0.3,
+    "jitter_s": 0.1,
+    "error_rate": 0.0,
+    "bad_json_rate": 0.0,
+    "hang_rate": 0.0,
+    "hang_s": 30.0,
+    "model": "stand-in",
+}
+
+
+class _OllamaStandIn(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/api/tags":
+            return self._json({"models": [{"name": self.server.config["model"]}]})
+        self.send_error(404)
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            return self.send_error(404)
+        config = self.server.config
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = body.get("model", config["model"])
+
+        roll = self.server.rng.random()
+        if roll < config["error_rate"]:
+            self.server.count("error")
+            return self._json({"error": "injected failure"}, status=500)
+        roll -= config["error_rate"]
+        if roll < config["hang_rate"]:
+            self.server.count("hang")
+            time.sleep(config["hang_s"])
+            return self._json({"error": "injected hang"}, status=500)
+        roll -= config["hang_rate"]
+
+        time.sleep(max(0.0, self.server.rng.gauss(config["latency_s"], config["jitter_s"])))
+        if roll < config["bad_json_rate"]:
+            self.server.count("bad_json")
+            content = "Sure! Here is the JSON you asked for:"
+        else:
+            content = self._content(model, body)
+        self._json({
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+        })
+
+    def _content(self, model, body):
+        cache = self.server.replay
+        if cache is not None:
+            recorded = cache.load(cache_key(model, body.get("messages", []), body.get("format")))
+            if recorded is not None:
+                self.server.count("replayed")
+                return recorded["response"]["message"]["content"]
+        self.server.count("heuristic")
+        user = [m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user"]
+        intent, _ = heuristic_intent(user[-1] if user else "")
+        return json.dumps(intent, default=str)
+
+    def _json(self, payload, status=200):
+        data = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client sudah timeout (hang injection)
+
+    def log_message(self, format, *args):
+        pass  # satu baris per request → terlalu ramai saat load test
+
+
+class OllamaStandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config, replay_dir=None, seed=None):
+        super().__init__(address, _OllamaStandIn)
+        self.config = config
+        self.replay = LLMCache(replay_dir, "replay") if replay_dir else None
+        self.rng = random.Random(seed)
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+
+def serve_ollama_standin(port=11435, latency_ms=300.0, jitter_ms=100.0, host="127.0.0.1",
+                         replay_dir=None, seed=None, **failures) -> OllamaStandInServer:
+    """
+    Server /api/chat di thread sendiri; set OLLAMA_HOST=http://host:port + LLM_INTENT_ENABLED=1 di service.
+    failures: error_rate, bad_json_rate, hang_rate (0..1), hang_s.
+    """
+    config = dict(DEFAULT_CONFIG, latency_s=latency_ms / 1000, jitter_s=jitter_ms / 1000, **failures)
+    server = OllamaStandInServer((host, port), config, replay_dir, seed)
+    threading.Thread(target=server.serve_forever, name="ollama-standin", daemon=True).start()
+    return server
@@ -0,0 +1,256 @@
+import re
+import json
+import time
+import random
+import threading
+import statistics
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# =============================================
+# Load test untuk api_service / flask_service (lihat loadtest.py)
+# - Corpus query: .jsonl ({"query": ...}), app.log (baris "... query: ..."), atau teks 1 query/baris
+# - Closed loop (--concurrency N, tanpa --rate): N client, request berikutnya setelah response
+# - Open loop (--rate R): kedatangan Poisson R req/s; latency dihitung dari waktu JADWAL,
+#   jadi antrian di sisi client ikut terhitung (tidak ada coordinated omission)
+# - Sweep beberapa rate → tabel p50/p95/p99 + error per step, knee = step pertama yang
+#   p95 > 2× step awal, error > 1% atau throughput < 90% rate
+# - Ollama stand-in (src/llm_standin.py) → jalur LLM ikut diuji tanpa model sungguhan
+# =============================================
+
+# Baris log: "... [session] API search query: 5 sdm java" / "... User query: ..."
+LOG_QUERY_RE = re.compile(r"\] (?:API search query|API stream search query|User query|User .+? query): (.+)$")
+
+KNEE_P95_FACTOR = 2.0
+KNEE_ERROR_RATE = 0.01
+KNEE_THROUGHPUT_RATIO = 0.9
+
+
+def load_corpus(path: str) -> list:
+    """
+    Query dari .jsonl (field query/text), log aplikasi (.log), atau teks biasa (1 query/baris).
+    Baris .jsonl yang bukan JSON atau tanpa field query/text → ValueError (dengan nomor baris).
+    """
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{lineno}: invalid JSON ({e})") from None
+                if not isinstance(record, dict) or not (record.get("query") or record.get("text")):
+                    raise ValueError(f"{path}:{lineno}: expected an object with a \"query\" or \"text\" field")
+                query = record.get("query") or record.get("text")
+            elif ".log" in path:
+                match = LOG_QUERY_RE.search(line)
+                query = match.group(1) if match else None
+            else:
+                query = line
+            if query and str(query).strip():
+                queries.append(str(query).strip())
+    return queries
+
+
+# =============================================
+# Client
+# =============================================
+
+class Sample:
+    __slots__ = ("query", "status", "latency", "queued", "timings", "error")
+
+    def __init__(self, query, status, latency, queued=0.0, timings=None, error=None):
+        self.query = query
+        self.status = status  # 0 = tidak ada response (timeout / connection error)
+        self.latency = latency
+        self.queued = queued
+        self.timings = timings or {}
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def send_search(base_url, query, session_id, scheduled=None, timeout=120.0, endpoint="/search") -> Sample:
+    """Satu POST; latency dari `scheduled` (open loop) atau dari saat dikirim."""
+    started = time.perf_counter()
+    scheduled = scheduled if scheduled is not None else started
+    try:
+        response = _session().post(
+            f"{base_url}{endpoint}", json={"query": query, "session_id": session_id}, timeout=timeout,
+        )
+        latency = time.perf_counter() - scheduled
+        timings = {}
+        error = None
+        if response.status_code == 200:
+            timings = response.json().get("timings") or {}
+        else:
+            error = response.text[:200]
+        return Sample(query, response.status_code, latency, started - scheduled, timings, error)
+    except requests.exceptions.RequestException as e:
+        return Sample(query, 0, time.perf_counter() - scheduled, started - scheduled, error=type(e).__name__)
+
+
+def run_load(base_url, queries, rate=None, concurrency=8, duration=30.0, sessions=50, timeout=120.0,
+             endpoint="/search", seed=42, progress=None) -> dict:
+    """
+    Jalankan load selama `duration` detik → summarize().
+    rate=None → closed loop dengan `concurrency` client; rate=R → open loop Poisson,
+    `concurrency` = batas request in-flight di sisi client.
+    Session id dibagi ke `sessions` user supaya rate limit per session tidak langsung kena.
+    """
+    rng = random.Random(seed)
+    samples = []
+    lock = threading.Lock()
+    counter = [0]
+    t_start = time.perf_counter()
+    deadline = t_start + duration
+
+    def record(sample):
+        with lock:
+            samples.append(sample)
+            if progress and len(samples) % 50 == 0:
+                progress(f"  {len(samples)} requests, {time.perf_counter() - t_start:.0f}s")
+
+    def next_request():
+        with lock:
+            i = counter[0]
+            counter[0] += 1
+        return queries[i % len(queries)], f"loadtest-{i % sessions}"
+
+    if rate is None:
+        def client():
+            while time.perf_counter() < deadline:
+                query, session_id = next_request()
+                record(send_search(base_url, query, session_id, timeout=timeout, endpoint=endpoint))
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest") as pool:
+            scheduled = t_start
+            while True:
+                scheduled += rng.expovariate(rate)
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                query, session_id = next_request()
+                pool.submit(send_search, base_url, query, session_id, scheduled, timeout, endpoint) \
+                    .add_done_callback(lambda f: record(f.result()))
+
+    wall = time.perf_counter() - t_start
+    summary = summarize(samples, wall)
+    summary["rate"] = rate
+    summary["concurrency"] = concurrency
+    return summary
+
+
+# =============================================
+# Report
+# =============================================
+
+def _pct(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def summarize(samples, wall_seconds) -> dict:
+    ok = [s for s in samples if s.ok]
+    latencies = sorted(s.latency * 1000 for s in ok)
+    stages = defaultdict(list)
+    for s in ok:
+        for stage, seconds in s.timings.items():
+            if isinstance(seconds, (int, float)):
+                stages[stage].append(seconds * 1000)
+    errors = Counter(s.status for s in samples if not s.ok)
+    return {
+        "requests": len(samples),
+        "ok": len(ok),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput": round(len(ok) / wall_seconds, 3) if wall_seconds else 0.0,
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "errors": {str(status): n for status, n in sorted(errors.items())},
+        "error_samples": sorted({s.error for s in samples if s.error})[:5],
+        "latency_ms": {
+            "p50": round(_pct(latencies, 0.50), 1),
+            "p95": round(_pct(latencies, 0.95), 1),
+            "p99": round(_pct(latencies, 0.99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+            "mean": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        },
+        "client_queue_ms_p95": round(_pct(sorted(s.queued * 1000 for s in samples), 0.95), 1),
+        "stages_ms": {
+            stage: {"mean": round(statistics.fmean(v), 1), "p95": round(_pct(sorted(v), 0.95), 1)}
+            for stage, v in sorted(stages.items())
+        },
+    }
+
+
+def format_summary(summary: dict) -> str:
+    lat = summary["latency_ms"]
+    mode = f"rate {summary['rate']}/s" if summary.get("rate") else f"{summary.get('concurrency')} clients"
+    lines = [
+        f"{mode}: {summary['requests']} requests in {summary['wall_seconds']:.1f}s, "
+        f"{summary['throughput']:.2f} ok/s, error rate {summary['error_rate'] * 100:.1f}% {summary['errors'] or ''}",
+        f"latency ms: p50 {lat['p50']:.1f} | p95 {lat['p95']:.1f} | p99 {lat['p99']:.1f} | max {lat['max']:.1f}"
+        f" | client queue p95 {summary['client_queue_ms_p95']:.1f}",
+    ]
+    if summary["stages_ms"]:
+        lines.append(f"{'stage':<22}{'mean':>10}{'p95':>10}")
+        for stage, s in summary["stages_ms"].items():
+            lines.append(f"{stage:<22}{s['mean']:>10.1f}{s['p95']:>10.1f}")
+    for error in summary["error_samples"]:
+        lines.append(f"error: {error}")
+    return "\n".join(lines)
+
+
+def find_knee(steps) -> int:
+    """Index step pertama yang sudah lewat knee, -1 kalau semua step sehat."""
+    if not steps:
+        return -1
+    base_p95 = steps[0]["latency_ms"]["p95"] or 1.0
+    for i, step in enumerate(steps):
+        offered = step.get("rate")
+        if (step["error_rate"] > KNEE_ERROR_RATE
+                or step["latency_ms"]["p95"] > KNEE_P95_FACTOR * base_p95
+                or (offered and step["throughput"] < KNEE_THROUGHPUT_RATIO * offered)):
+            return i
+    return -1
+
+
+def format_sweep(steps) -> str:
+    knee = find_knee(steps)
+    header = f"{'load':>12}{'ok/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>9}"
+    lines = [header, "-" * len(header)]
+    for i, step in enumerate(steps):
+        load = f"{step['rate']}/s" if step.get("rate") else f"{step['concurrency']} cl"
+        lat = step["latency_ms"]
+        line = (
+            f"{load:>12}{step['throughput']:>9.2f}{lat['p50']:>10.1f}{lat['p95']:>10.1f}{lat['p99']:>10.1f}"
+            f"{step['error_rate'] * 100:>8.1f}%"
+        )
+        if i == knee:
+            line += "  ← knee"
+        lines.append(line)
+    return "\n".join(lines)
+
@@ -1,14 +1,80 @@
 import os  
+import json
+import atexit
+import queue
+import threading
 import datetime as dt  
+from src.config import SQL_AUDIT_FLUSH_EVERY, SQL_AUDIT_FLUSH_SECONDS
   
 def ensure_logs_dir():  
     os.makedirs("logs", exist_ok=True)  
   
-def append_sql_log(header, queries):  
-    ensure_logs_dir()  
-    with open("logs/sql_queries.txt", "a", encoding="utf-8") as f:  
-        f.write(f"-- {dt.datetime.now().isoformat()}\n")  
-        f.write(header + "\n")  
-        for q in queries:  
-            f.write(q + "\n")  
-        f.write("\n") 
+# =============================================
+# SQL audit log (logs/sql_queries.jsonl)
+# - 1 baris JSON per search; file dibuka sekali, ditulis per batch oleh thread sendiri
+# - flush tiap SQL_AUDIT_FLUSH_EVERY entri atau SQL_AUDIT_FLUSH_SECONDS, dan saat exit
+# =============================================
+
+SQL_AUDIT_LOG = "logs/sql_queries.jsonl"
+
+
+class SqlAuditWriter:
+    def __init__(self, path, flush_every, flush_seconds):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def write(self, entry: dict):
+        if self._thread is None:
+            self._start()
+        self._queue.put(entry)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sql-audit-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        ensure_logs_dir()
+        with open(self.path, "a", encoding="utf-8") as f:
+            pending = []
+            while True:
+                try:
+                    entry = self._queue.get(timeout=self.flush_seconds)
+                except queue.Empty:
+                    entry = None
+                if entry is not None and entry is not _STOP:
+                    pending.append(json.dumps(entry, ensure_ascii=False, default=str))
+                if pending and (entry is None or entry is _STOP or len(pending) >= self.flush_every):
+                    f.write("\n".join(pending) + "\n")
+                    f.flush()
+                    pending = []
+                if entry is _STOP:
+                    return
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+
+
+_STOP = object()
+_sql_audit = SqlAuditWriter(SQL_AUDIT_LOG, SQL_AUDIT_FLUSH_EVERY, SQL_AUDIT_FLUSH_SECONDS)
+
+
+def append_sql_log(header, queries, params=None, session_id=None):
+    """Catat SQL satu search ke audit log (non-blocking)."""
+    entry = {
+        "ts": dt.datetime.now().isoformat(),
+        "session_id": session_id,
+        "header": header,
+        "queries": [" ".join(q.split()) for q in queries],
+    }
+    if params is not None:
+        entry["params"] = [[str(p) for p in ps] for ps in params]
+    _sql_audit.write(entry)
@@ -0,0 +1,220 @@
+import time
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager
+
+# =============================================
+# Metrics (Prometheus text format, tanpa dependency tambahan)
+# - Dicatat di modul src → API, Telegram bot, dan UI berbagi instrumentasi
+# - GET /metrics (api_service / flask_service) → render()
+# =============================================
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _fmt_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + inner + "}"
+
+
+def _fmt_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = list(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge biasa (set/inc/dec) atau callback → dihitung saat scrape."""
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), callback=None):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+        self._callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def collect(self):
+        lines = self.header()
+        if self._callback is not None:
+            try:
+                # callback → {label tuple: value}
+                items = list(self._callback().items())
+            except Exception:
+                items = []
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, v in items:
+            lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_value(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key → [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self, **labels):
+        """(sum, count) → dipakai load test untuk rata-rata per stage."""
+        state = self._values.get(self._key(labels))
+        return (state[-2], state[-1]) if state else (0.0, 0)
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def collect(self):
+        lines = self.header()
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for key, state in items:
+            for i, bound in enumerate(self.buckets):
+                le = _fmt_labels(self.labelnames, key, [("le", _fmt_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{le} {state[i]}")
+            inf = _fmt_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{inf} {state[-1]}")
+            lbl = _fmt_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{lbl} {_fmt_value(state[-2])}")
+            lines.append(f"{self.name}_count{lbl} {state[-1]}")
+        return lines
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for m in metrics:
+        lines.extend(m.collect())
+    return "\n".join(lines) + "\n"
+
+
+# =============================================
+# Pipeline metrics
+# =============================================
+
+INTENT_PARSE_SECONDS = Histogram(
+    "talent_intent_parse_seconds", "Intent parsing latency", ["method"],
+)
+SQL_QUERY_SECONDS = Histogram(
+    "talent_sql_query_seconds", "Latency of each search SQL statement", ["table"],
+)
+STAGE_SECONDS = Histogram(
+    "talent_stage_seconds", "Latency of pipeline stages (merge, scoring, formatting, serialization)", ["stage"],
+)
+SEARCHES_TOTAL = Counter(
+    "talent_searches_total", "Searches executed", ["kind"],
+)
+SQL_TIMEOUTS_TOTAL = Counter(
+    "talent_sql_timeouts_total", "SQL statements that hit statement_timeout", ["table"],
+)
+SEARCHES_SUPERSEDED_TOTAL = Counter(
+    "talent_searches_superseded_total", "Chat searches dropped because a newer query arrived", ["stage"],
+)
+CANDIDATES_RETURNED = Histogram(
+    "talent_candidates_returned", "Candidates returned per search", [],
+    buckets=(0, 1, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+def timed_stage(stage):
+    """Decorator: durasi fungsi (sync / async) → talent_stage_seconds{stage=...}."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with STAGE_SECONDS.time(stage=stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def register_gauge(name, help_text, labelnames, callback):
+    """Gauge callback untuk pool/cache: callback() → {(label values...): value}."""
+    return Gauge(name, help_text, labelnames, callback=callback)
@@ -0,0 +1,236 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+import datetime as dt
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from src.config import logger, REPORT_DIR, REPORT_WORKERS, REPORT_MAX_PENDING, REPORT_MAX_JOBS, REPORT_JOB_TTL_S
+from src.formatter import format_employee_summary
+from src.admission import Rejected
+from src.metrics import register_gauge
+
+# =============================================
+# PDF report (UI "Export PDF", API /reports/pdf)
+# - Dibuat di worker PROCESS (ProcessPoolExecutor, spawn) → thread Tk / event loop
+#   tidak ikut menunggu reportlab, dan memory build dilepas saat selesai
+# - Flowable dibuat bertahap: _IncrementalFlowables mengisi ulang list dari generator
+#   setiap kali reportlab membaca panjangnya → yang ada di memory hanya ±1 halaman,
+#   format_employee_summary dipanggil per kandidat saat halamannya di-layout
+# - Job API: submit → poll → download; hasil di REPORT_DIR, dibuang setelah REPORT_JOB_TTL_S
+# =============================================
+
+# Flowable yang disiapkan di depan (≈ satu halaman A4)
+FLOWABLES_AHEAD = 60
+
+
+class _IncrementalFlowables(list):
+    """
+    List flowable untuk doc.build(): BaseDocTemplate.build mengulang `while len(flowables)`
+    dan mengambil dari depan, jadi list diisi ulang dari `source` di __len__.
+    """
+
+    def __init__(self, source, ahead=FLOWABLES_AHEAD):
+        super().__init__()
+        self._source = iter(source)
+        self._ahead = ahead
+        self._exhausted = False
+
+    def __len__(self):
+        while not self._exhausted and list.__len__(self) < self._ahead:
+            flowable = next(self._source, None)
+            if flowable is None:
+                self._exhausted = True
+            else:
+                self.append(flowable)
+        return list.__len__(self)
+
+
+def _intent_flowables(intent, styles):
+    yield Paragraph("<b>User Query Summary</b>", styles["Heading2"])
+    if intent.get("name"):
+        yield Paragraph(f"Candidate Search for: {escape(str(intent['name']))}", styles["Normal"])
+    else:
+        skills = intent.get("skills", {}) or {}
+        yield Paragraph(f"Role: {escape(str(intent.get('role') or ''))}", styles["Normal"])
+        yield Paragraph(f"Must Have Skills: {escape(', '.join(skills.get('must_have', [])))}", styles["Normal"])
+        yield Paragraph(f"Nice to Have Skills: {escape(', '.join(skills.get('nice_to_have', [])))}", styles["Normal"])
+    yield Spacer(1, 12)
+
+
+def _report_flowables(query, intent, employees, styles, counter):
+    yield Paragraph("<b>Talent Search Report</b>", styles["Title"])
+    yield Paragraph(f"Generated: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles["Normal"])
+    if query:
+        yield Paragraph(f"Query: {escape(query)}", styles["Normal"])
+    yield Spacer(1, 12)
+
+    if intent:
+        yield from _intent_flowables(intent, styles)
+
+    yield Paragraph("<b>Candidates</b>", styles["Heading2"])
+    for i, emp in enumerate(employees, 1):
+        summary = format_employee_summary(emp, intent).splitlines()
+        counter[0] = i
+        yield Paragraph(f"{i}. {escape(summary[0])}", styles["Heading3"])  # Name line
+        for line in summary[1:]:
+            if not line.strip():
+                yield Spacer(1, 6)
+            else:
+                yield Paragraph(escape(line), styles["Normal"])
+        yield Spacer(1, 12)
+
+
+def _page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def build_pdf(path: str, query: str, intent: dict, employees) -> dict:
+    """Tulis report ke `path` → {"seconds", "size_bytes", "pages", "candidates"}."""
+    t0 = time.perf_counter()
+    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(path, pagesize=A4)
+    counter = [0]
+    flowables = _IncrementalFlowables(_report_flowables(query, intent or {}, employees, styles, counter))
+    doc.build(flowables, onFirstPage=_page_number, onLaterPages=_page_number)
+    return {
+        "seconds": round(time.perf_counter() - t0, 3),
+        "size_bytes": os.path.getsize(path),
+        "pages": doc.page,
+        "candidates": counter[0],
+    }
+
+
+def search_and_build_pdf(path: str, query: str, intent, session_id: str) -> dict:
+    """Job API (di worker process): intent (parse kalau belum ada) → search → PDF."""
+    from src.intent_parser import call_ollama_intent
+    from src.query_executor import run_all_queries
+
+    t0 = time.perf_counter()
+    if intent is None:
+        intent, _ = call_ollama_intent(query)
+    employees, raw, sql_time = run_all_queries(intent, session_id, query=query)
+    search_seconds = time.perf_counter() - t0
+    stats = build_pdf(path, query, intent, employees)
+    stats["search_seconds"] = round(search_seconds, 3)
+    return stats
+
+
+# =============================================
+# Worker process pool
+# - spawn (bukan fork): parent punya thread (background loop, log listener)
+#   yang tidak aman di-fork
+# =============================================
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def submit_pdf(path: str, query: str, intent: dict, employees):
+    """UI: kandidat yang sudah tampil → PDF di worker process; return Future(stats)."""
+    return get_pool().submit(build_pdf, path, query, intent, list(employees))
+
+
+# =============================================
+# Report jobs (API)
+# =============================================
+
+class ReportJob:
+    __slots__ = ("job_id", "session_id", "query", "status", "path", "stats", "error", "created", "finished")
+
+    def __init__(self, session_id, query):
+        self.job_id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.query = query
+        self.status = "pending"  # pending → done | failed
+        self.path = os.path.join(REPORT_DIR, f"{self.job_id}.pdf")
+        self.stats = {}
+        self.error = None
+        self.created = time.monotonic()
+        self.finished = None
+
+    def to_dict(self) -> dict:
+        d = {"job_id": self.job_id, "status": self.status, "query": self.query, **self.stats}
+        if self.error:
+            d["error"] = self.error
+        if self.finished is not None:
+            d["total_seconds"] = round(self.finished - self.created, 3)
+        return d
+
+
+class ReportJobs:
+    def __init__(self, max_jobs: int, max_pending: int, ttl_s: float):
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.ttl_s = ttl_s
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def counts(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {(s,): statuses.count(s) for s in ("pending", "done", "failed")}
+
+    def submit(self, session_id: str, query: str, intent=None) -> ReportJob:
+        """Rejected("busy") kalau job yang belum selesai sudah REPORT_MAX_PENDING."""
+        job = ReportJob(session_id, query)
+        with self._lock:
+            self._evict(time.monotonic())
+            if sum(1 for j in self._jobs.values() if j.status == "pending") >= self.max_pending:
+                raise Rejected("busy", 5)
+            self._jobs[job.job_id] = job
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        future = get_pool().submit(search_and_build_pdf, job.path, query, intent, session_id)
+        future.add_done_callback(lambda f: self._finish(job, f))
+        logger.info(f"[{session_id}] PDF report job {job.job_id} submitted: {query}")
+        return job
+
+    def _finish(self, job, future):
+        job.finished = time.monotonic()
+        try:
+            job.stats = future.result()
+            job.status = "done"
+            logger.info(
+                f"[{job.session_id}] PDF report {job.job_id}: {job.stats['candidates']} candidates, "
+                f"{job.stats['pages']} pages, {job.stats['size_bytes']} bytes in {job.stats['seconds']:.2f}s"
+            )
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"[{job.session_id}] PDF report {job.job_id} failed: {e}")
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict(self, now):
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            if len(self._jobs) < self.max_jobs and now - oldest.created <= self.ttl_s:
+                break
+            if oldest.status == "pending":
+                break  # masih dikerjakan worker → jangan hapus file-nya
+            self._jobs.popitem(last=False)
+            if os.path.exists(oldest.path):
+                os.remove(oldest.path)
+
+
+report_jobs = ReportJobs(REPORT_MAX_JOBS, REPORT_MAX_PENDING, REPORT_JOB_TTL_S)
+
+register_gauge("talent_report_jobs", "PDF report jobs by status", ["status"], report_jobs.counts)
@@ -0,0 +1,285 @@
+import os
+import re
+import json
+import time
+import pstats
+import cProfile
+import asyncio
+import functools
+import threading
+import tracemalloc
+import contextvars
+import datetime as dt
+from src.config import logger, PROFILE_DIR
+
+# =============================================
+# Opt-in profiling per search (cProfile + tracemalloc)
+# - Diaktifkan per request: header X-Debug-Profile (API), /profile (Telegram admin),
+#   checkbox "Profile next search" (UI)
+# - Stage (intent, sql, merge, scoring, formatting) ditandai dengan profile_stage();
+#   tanpa SearchProfile aktif → _NOOP, request biasa tidak membayar apa-apa
+# - Artifact: PROFILE_DIR/<timestamp>_<label>.json (ringkasan) + .prof (pstats / snakeviz)
+# - cProfile per thread: stage yang jalan di background loop (run_sync) diprofile di thread itu
+# =============================================
+
+ALLOCATION_FILES = ("query_executor.py", "scoring.py")
+# Snapshot tracemalloc di akhir stage ini (trace di-clear di awal stage,
+# jadi snapshot hanya berisi alokasi stage itu yang masih hidup)
+ALLOCATION_STAGES = ("sql", "merge", "scoring")
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 10
+
+_active = contextvars.ContextVar("active_profile", default=None)
+# tracemalloc global per proses → satu profiled search sekaligus
+_busy = threading.Lock()
+
+
+class _StageStats:
+    __slots__ = ("calls", "seconds", "peak_bytes", "alloc_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0
+        self.alloc_bytes = 0
+
+
+class _Stage:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        p = self.profile
+        self._outer = not p._stack
+        p._stack.append(self.name)
+        self._snapshot = self._outer and self.name in ALLOCATION_STAGES and self.name not in p.snapshots
+        if self._outer:
+            if p._started_tracemalloc:
+                tracemalloc.clear_traces()
+            self._mem0 = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._own_profiler = p._enable_thread_profiler()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        p = self.profile
+        elapsed = time.perf_counter() - self._t0
+        if self._own_profiler:
+            p._disable_thread_profiler()
+        p._stack.pop()
+        stats = p.stages.setdefault(self.name, _StageStats())
+        stats.calls += 1
+        stats.seconds += elapsed
+        if self._outer:
+            current, peak = tracemalloc.get_traced_memory()
+            stats.peak_bytes = max(stats.peak_bytes, peak - self._mem0)
+            stats.alloc_bytes += current - self._mem0
+        if self._snapshot:
+            # diolah nanti di _write_artifacts (statistics() lambat → di luar pengukuran)
+            p.snapshots[self.name] = tracemalloc.take_snapshot()
+        return False
+
+
+class _NoopStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+def profile_stage(name):
+    """Tandai stage pipeline; no-op kalau search ini tidak diprofile."""
+    profile = _active.get()
+    if profile is None:
+        return _NOOP
+    return _Stage(profile, name)
+
+
+def profiled_stage(name):
+    """Decorator versi profile_stage (sync / async)."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with profile_stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def wants_profile(header_value) -> bool:
+    """Nilai header X-Debug-Profile → True kalau profiling diminta."""
+    return str(header_value or "").strip().lower() in ("1", "true", "yes")
+
+
+def _allocation_sites(snapshot):
+    """Alokasi (masih hidup) per baris, hanya di query_executor / scoring."""
+    top = [
+        s for s in snapshot.statistics("lineno")
+        if os.path.basename(s.traceback[0].filename) in ALLOCATION_FILES
+    ][:TOP_ALLOCATIONS]
+    return [
+        {
+            "site": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+            "size_kb": round(s.size / 1024, 1),
+            "count": s.count,
+        }
+        for s in top
+    ]
+
+
+def _top_functions(stats, sort_index):
+    """sort_index: 2 = tottime (self), 3 = cumtime."""
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][sort_index], reverse=True)[:TOP_FUNCTIONS]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{lineno}({func})",
+            "ncalls": nc,
+            "tottime": round(tt, 4),
+            "cumtime": round(ct, 4),
+        }
+        for (filename, lineno, func), (cc, nc, tt, ct, _) in rows
+    ]
+
+
+class SearchProfile:
+    """
+    with SearchProfile(session_id, query) as prof:
+        ... search ...
+    prof.artifact → path JSON, prof.summary_text() → ringkasan untuk chat/UI.
+
+    Di FastAPI/Telegram cProfile mencakup seluruh event loop selama search berjalan,
+    jadi request lain yang bersamaan ikut tercatat di top functions.
+    """
+
+    def __init__(self, label: str, query: str = ""):
+        self.label = label
+        self.query = query
+        self.stages = {}
+        self.allocation_sites = {}
+        self.snapshots = {}
+        self.artifact = None
+        self.enabled = False
+        self._stack = []
+        self._profilers = {}
+        self._owned = threading.local()
+        self._started_tracemalloc = False
+
+    # --- cProfile per thread ---
+    def _enable_thread_profiler(self) -> bool:
+        tid = threading.get_ident()
+        if getattr(self._owned, "active", False):
+            return False
+        prof = self._profilers.get(tid) or cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:
+            # profiler lain sudah aktif di thread ini
+            return False
+        self._profilers[tid] = prof
+        self._owned.active = True
+        return True
+
+    def _disable_thread_profiler(self):
+        self._profilers[threading.get_ident()].disable()
+        self._owned.active = False
+
+    def __enter__(self):
+        if not _busy.acquire(blocking=False):
+            logger.warning(f"[{self.label}] another profiled search is running, profiling skipped")
+            return self
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._token = _active.set(self)
+        self._t0 = time.perf_counter()
+        self._own_profiler = self._enable_thread_profiler()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        try:
+            total = time.perf_counter() - self._t0
+            if self._own_profiler:
+                self._disable_thread_profiler()
+            _active.reset(self._token)
+            self.artifact = self._write_artifacts(total, exc_type)
+            logger.info(f"[{self.label}] profile written to {self.artifact}")
+        except Exception as e:
+            logger.error("Writing profile artifact failed: %s", e)
+        finally:
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            _busy.release()
+        return False
+
+    def _write_artifacts(self, total: float, exc_type) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]", "_", str(self.label))[:40]
+        base = os.path.join(PROFILE_DIR, f"{stamp}_{safe_label}")
+
+        stats = None
+        for prof in self._profilers.values():
+            if stats is None:
+                stats = pstats.Stats(prof)
+            else:
+                stats.add(prof)
+        for name, snapshot in self.snapshots.items():
+            self.allocation_sites[name] = _allocation_sites(snapshot)
+        self.snapshots = {}
+
+        top_cumulative, top_self = [], []
+        if stats is not None:
+            stats.dump_stats(base + ".prof")
+            top_cumulative = _top_functions(stats, sort_index=3)
+            top_self = _top_functions(stats, sort_index=2)
+
+        self.report = {
+            "label": self.label,
+            "query": self.query,
+            "timestamp": dt.datetime.now().isoformat(),
+            "total_seconds": round(total, 4),
+            "error": exc_type.__name__ if exc_type else None,
+            "stages": {
+                name: {
+                    "calls": s.calls,
+                    "seconds": round(s.seconds, 4),
+                    "peak_kb": round(s.peak_bytes / 1024, 1),
+                    "alloc_kb": round(s.alloc_bytes / 1024, 1),
+                }
+                for name, s in self.stages.items()
+            },
+            "top_functions": top_cumulative,
+            "top_self_time": top_self,
+            "allocation_sites": self.allocation_sites,
+            "pstats_file": base + ".prof" if stats is not None else None,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.report, f, ensure_ascii=False, indent=2)
+        return base + ".json"
+
+    def summary_text(self, top_n: int = 5) -> str:
+        if not self.artifact:
+            return "Profiling skipped (another profiled search is running)."
+        lines = [f"Profile: {self.artifact}", f"Total: {self.report['total_seconds']:.3f}s"]
+        for name, s in self.report["stages"].items():
+            lines.append(f"  {name:<11} {s['seconds']:.3f}s  peak {s['peak_kb']:.0f} KB  ({s['calls']}x)")
+        lines.append("Top functions (self time):")
+        for f in self.report["top_self_time"][:top_n]:
+            lines.append(f"  {f['tottime']:.3f}s  {f['function']}")
+        return "\n".join(lines)
@@ -1,11 +1,26 @@
 import time
 import re
+import json
+import random
+import asyncio
+import logging
 from collections import defaultdict
-from psycopg2.extras import RealDictCursor
-from src.database import get_conn
-from src.sql_builder import ROLE_SQL, PROJECT_SQL, EDU_SQL, TIMESHEET_SQL, build_clauses
-from src.config import logger
+from src.storage import get_backend, StatementTimeout
+from src.sql_builder import build_queries, restrict_to_employees
+from src.config import logger, LOG_CANDIDATE_SAMPLE_RATE
 from src.scoring import score_candidate  # ✅ scoring import
+from src.slow_query_log import is_slow, should_explain, record_slow_query, explain_in_background
+from src.cancellation import run_cancellable, SearchCancelled
+from src.circuit_breaker import db_breaker, CircuitOpen
+from src.deadline import is_optional
+from src.async_runtime import run_sync
+from src.tracing import span
+from src.profiling import profile_stage
+from src.metrics import SQL_QUERY_SECONDS, SQL_TIMEOUTS_TOTAL, STAGE_SECONDS, SEARCHES_TOTAL, CANDIDATES_RETURNED
+from src.result_store import results, last_results, decode_cursor, next_cursor, CursorExpired
+from src.conversation import conversations, ConversationState, is_refinement, merge_intents, narrows, filter_rows
+
+TABLES = ("roles", "projects", "education", "timesheet")
 
 
 # =============================================
@@ -30,174 +45,495 @@ def parse_duration_to_months(text: str) -> int:
 # Query execution & merging
 # =============================================
 
-def resolve_employee_name(emp_id):
+async def _timed_fetch(db, label, sql, params, session_id, intent, timeout_ms=None):
+    """Execute + fetch satu statement, catat durasi; statement lambat → slow query log."""
+    with span(f"sql.{label}") as sp:
+        t0 = time.perf_counter()
+        rows = await db.fetch(sql, params, timeout_ms)
+        elapsed = time.perf_counter() - t0
+        sp.set("db.rows", len(rows))
+    SQL_QUERY_SECONDS.observe(elapsed, table=label)
+    logger.info("[%s] %s fetched: %d in %.1fms", session_id, label, len(rows), elapsed * 1000)
+
+    if is_slow(elapsed):
+        if should_explain():
+            explain_in_background(db.backend, session_id, intent, label, sql, params, elapsed, len(rows))
+        else:
+            record_slow_query(session_id, intent, label, sql, params, elapsed, len(rows))
+    return rows
+
+
+async def _fetch_or_degrade(db, label, sql, params, session_id, intent, omitted, timeout_ms=None):
+    """Statement yang kena statement timeout → [] + dicatat di `omitted` (bukan error 500)."""
+    try:
+        return await _timed_fetch(db, label, sql, params, session_id, intent, timeout_ms)
+    except StatementTimeout:
+        logger.warning("[%s] %s query hit statement_timeout → omitted", session_id, label)
+        SQL_TIMEOUTS_TOTAL.inc(table=label)
+        omitted.append(label)
+        return []
+
+
+def _ids_without_name(rows_by_table) -> set:
+    named = set()
+    name_cols = {"roles": "full_name", "projects": "nama_lengkap", "education": "name", "timesheet": "employee_name"}
+    all_ids = set()
+    for label, col in name_cols.items():
+        for r in rows_by_table.get(label, []):
+            all_ids.add(r["employee_id"])
+            if r.get(col):
+                named.add(r["employee_id"])
+    return all_ids - named
+
+
+async def fetch_all_rows(db, queries, session_id, intent, deadline=None):
+    """
+    Jalankan [(label, sql, params)] di satu koneksi backend → ({label: rows}, omitted, names, timings).
+    deadline → tabel opsional (src/deadline.py) di-skip / dipotong sisa budget; masuk deadline.skipped.
+    """
+    omitted = []
+    rows_by_table = {}
+    timings = {}
+    for label, sql, params in queries:
+        t0 = time.perf_counter()
+        if deadline is not None and is_optional(label, intent):
+            if not deadline.allows():
+                deadline.skip(label)
+                rows_by_table[label] = []
+                continue
+            truncated = []
+            rows_by_table[label] = await _fetch_or_degrade(
+                db, label, sql, params, session_id, intent, truncated, deadline.timeout_s() * 1000
+            )
+            if truncated:
+                deadline.skip(label)
+        else:
+            rows_by_table[label] = await _fetch_or_degrade(db, label, sql, params, session_id, intent, omitted)
+        timings[f"sql_{label}"] = round(time.perf_counter() - t0, 4)
+    names = await db.resolve_names(_ids_without_name(rows_by_table))
+    return rows_by_table, omitted, names, timings
+
+
+async def _guarded(make_fetch, cancel_token=None):
+    """
+    run_cancellable(make_fetch()) lewat circuit breaker database.
+    Circuit open → CircuitOpen tanpa menyentuh DB. Exception / tabel yang kena
+    statement timeout → kegagalan; cancel → tanpa vonis.
+    """
+    db_breaker.check()
     try:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT full_name FROM public.autobot_dataset_talent_profile_role_tech "
-                    "WHERE employee_id=%s LIMIT 1",
-                    (emp_id,),
-                )
-                row = cur.fetchone()
-                if row and row[0]:
-                    return row[0]
+        outcome = await run_cancellable(make_fetch(), cancel_token)
+    except (SearchCancelled, asyncio.CancelledError):
+        db_breaker.abandon()
+        raise
     except Exception:
-        pass
-    return None
-
-
-def run_all_queries(intent: dict, session_id: str):
-    clauses = build_clauses(intent)
-    role_clause, skill_clause, role_params, name_clause = clauses["role"]
-    proj_clause, proj_params, name_clause_p = clauses["project"]
-    edu_clause, edu_params, name_clause_e = clauses["education"]
-    ts_date_clause, ts_proj_clause, ts_params, name_clause_t = clauses["timesheet"]
-
-    q_role = ROLE_SQL.format(
-        role_clause=role_clause, skill_clause=skill_clause, name_clause=name_clause
-    )
-    q_proj = PROJECT_SQL.format(
-        proj_clause=proj_clause, name_clause=name_clause_p
-    )
-    q_edu = EDU_SQL.format(
-        edu_clause=edu_clause, name_clause=name_clause_e
-    )
-    q_ts = TIMESHEET_SQL.format(
-        ts_date_clause=ts_date_clause, ts_proj_clause=ts_proj_clause, name_clause=name_clause_t
-    )
-
-    logger.debug(f"[{session_id}] SQL[roles]: {q_role} | params={role_params}")
-    logger.debug(f"[{session_id}] SQL[projects]: {q_proj} | params={proj_params}")
-    logger.debug(f"[{session_id}] SQL[education]: {q_edu} | params={edu_params}")
-    logger.debug(f"[{session_id}] SQL[timesheet]: {q_ts} | params={ts_params}")
-
-    with get_conn() as conn:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            t0 = time.perf_counter()
-
-            # Roles
-            cur.execute(q_role, role_params)
-            role_rows = cur.fetchall()
-            logger.info(f"[{session_id}] roles fetched: {len(role_rows)}")
-
-            # Projects
-            cur.execute(q_proj, proj_params)
-            proj_rows = cur.fetchall()
-            logger.info(f"[{session_id}] projects fetched: {len(proj_rows)}")
-
-            # Education
-            cur.execute(q_edu, edu_params)
-            edu_rows = cur.fetchall()
-            logger.info(f"[{session_id}] education fetched: {len(edu_rows)}")
-
-            # Timesheet
-            cur.execute(q_ts, ts_params)
-            ts_rows = cur.fetchall()
-            logger.info(f"[{session_id}] timesheet fetched: {len(ts_rows)}")
+        db_breaker.failure()
+        raise
+    return outcome
+
+
+def _stale_or_raise(intent: dict, session_id: str, error: CircuitOpen):
+    """Circuit database open → hasil lengkap terakhir untuk intent ini (raw["stale"]), atau error-nya."""
+    stale = last_results.get(intent)
+    if stale is None:
+        raise error
+    employees, raw = stale
+    logger.warning("[%s] database circuit open → stale result (%.0fs old)", session_id, raw["stale_age_s"])
+    SEARCHES_TOTAL.inc(kind="stale")
+    return employees, raw
+
+
+def group_by_employee(rows_by_table) -> dict:
+    """{employee_id: {"roles": [...], "projects": [...], ...}}"""
+    grouped = defaultdict(lambda: {t: [] for t in TABLES})
+    for label in TABLES:
+        for r in rows_by_table.get(label, []):
+            grouped[r["employee_id"]][label].append(r)
+    return grouped
+
+
+def build_employee(emp_id, tables: dict, names=None) -> dict:
+    d = {
+        "employee_id": emp_id,
+        "roles": tables.get("roles", []),
+        "projects": tables.get("projects", []),
+        "education": tables.get("education", []),
+        "timesheet": tables.get("timesheet", []),
+    }
 
-            t1 = time.perf_counter()
+    # Full name resolution
+    name = None
+    if d["roles"]:
+        name = d["roles"][0].get("full_name")
+    elif d["projects"]:
+        name = d["projects"][0].get("nama_lengkap")
+    elif d["education"]:
+        name = d["education"][0].get("name")
+    elif d["timesheet"]:
+        name = d["timesheet"][0].get("employee_name")
+    if not name and names:
+        name = names.get(str(emp_id))
+    d["full_name"] = name or f"EMP-{emp_id}"
+
+    # =============================================
+    # ✅ Compute total experience (months + years)
+    # =============================================
+    total_months = 0
+    for p in d["projects"]:
+        total_months += parse_duration_to_months(p.get("durasi_role"))
+    d["total_experience_months"] = total_months
+    d["total_experience_years"] = round(total_months / 12, 2)
+    return d
+
+
+def _candidate_debug() -> bool:
+    """Level guard + sampling untuk baris debug per kandidat (ribuan per search)."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    return LOG_CANDIDATE_SAMPLE_RATE >= 1.0 or random.random() < LOG_CANDIDATE_SAMPLE_RATE
+
+
+def evaluate_employee(d: dict, intent: dict, session_id: str, debug: bool = False) -> bool:
+    """
+    Filter experience + scoring. True → kandidat lolos (score & breakdown diisi ke d).
+    debug=True → alasan excluded / score ditulis ke log (lihat _candidate_debug).
+    """
+    emp_id = d["employee_id"]
+
+    # ✅ Apply experience filter (bulan basis)
+    exp_req = intent.get("experience", {})
+    min_years = exp_req.get("min_years")
+    max_years = exp_req.get("max_years")
+    min_months = exp_req.get("min_months")
+    max_months = exp_req.get("max_months")
+
+    # Handle min experience requirement
+    if min_years is not None:
+        min_months = min_years * 12
+    if min_months is not None:
+        if d["total_experience_months"] < min_months:
+            if debug:
+                logger.debug("[%s] Candidate %s excluded (exp %s < %s mo)", session_id, emp_id, d["total_experience_months"], min_months)
+            return False
+
+    # Handle max experience requirement
+    if max_years is not None:
+        max_months = max_years * 12
+    if max_months is not None:
+        if d["total_experience_months"] > max_months:
+            if debug:
+                logger.debug("[%s] Candidate %s excluded (exp %s > %s mo)", session_id, emp_id, d["total_experience_months"], max_months)
+            return False
+
+    # ✅ Apply scoring
+    score, breakdown, exclude = score_candidate(d, intent)
+    if exclude:
+        if debug:
+            logger.debug("[%s] Candidate %s excluded. Breakdown=%s", session_id, emp_id, breakdown)
+        return False
+
+    d["score"] = score
+    d["scoring_breakdown"] = breakdown
+    if debug:
+        logger.debug("[%s] Candidate %s scored=%s, breakdown=%s", session_id, emp_id, score, breakdown)
+    return True
+
+
+def page_size(intent: dict) -> int:
+    """Kandidat per halaman = jumlah primary yang diminta."""
+    return int((intent.get("limit", {}) or {}).get("primary", 3))
+
+
+def build_employees(rows_by_table, names=None) -> list:
+    return [build_employee(emp_id, tables, names) for emp_id, tables in group_by_employee(rows_by_table).items()]
+
+
+def rank_employees(rows_by_table, intent: dict, session_id: str, names=None, built=None):
+    """
+    Gabungkan hasil 4 tabel per employee → SEMUA kandidat lolos, terurut score desc.
+    built → employee yang sudah di-build dari rows_by_table (refinement di memory).
+    """
+    if built is None:
+        with span("merge"), profile_stage("merge"), STAGE_SECONDS.time(stage="merge"):
+            built = build_employees(rows_by_table, names)
+
+    with span("score_candidate", candidates=len(built)), profile_stage("scoring"), STAGE_SECONDS.time(stage="scoring"):
+        employees = [d for d in built if evaluate_employee(d, intent, session_id, _candidate_debug())]
+
+        # ✅ Sort & apply limit
+        employees.sort(key=lambda x: x.get("score", 0), reverse=True)
+    return employees
+
+
+def _limit(employees, intent: dict):
+    primary = intent.get("limit", {}).get("primary", 3)
+    backup = intent.get("limit", {}).get("backup", 2)
+    return employees[: primary + backup]
 
-    # Grouping results by employee
-    roles_by_emp = defaultdict(list)
-    for r in role_rows:
-        roles_by_emp[r["employee_id"]].append(r)
 
-    proj_by_emp = defaultdict(list)
-    for p in proj_rows:
-        proj_by_emp[p["employee_id"]].append(p)
+def merge_employees(rows_by_table, intent: dict, session_id: str, names=None):
+    """Gabungkan hasil 4 tabel per employee → kandidat terurut (score desc) + limit."""
+    return _limit(rank_employees(rows_by_table, intent, session_id, names), intent)
 
-    edu_by_emp = defaultdict(list)
-    for e in edu_rows:
-        edu_by_emp[e["employee_id"]].append(e)
 
-    ts_by_emp = defaultdict(list)
-    for t in ts_rows:
-        ts_by_emp[t["employee_id"]].append(t)
+async def run_all_queries_async(intent: dict, session_id: str, cancel_token=None, statement_timeout_ms=None,
+                                query: str = "", backend=None, deadline=None):
+    """
+    Satu search. Ranking lengkap (id + score) disimpan di result_store →
+    raw["search_id"], raw["total_ranked"], raw["next_cursor"] untuk halaman berikutnya.
+    backend=None → STORAGE_BACKEND (src/storage.py).
+    deadline (src/deadline.py) → tabel opsional yang di-skip ikut di raw["omitted"].
+    """
+    try:
+        rows_by_table, omitted, names, timings, sql_time = await _fetch_rows(
+            intent, session_id, cancel_token, statement_timeout_ms, backend, deadline
+        )
+    except CircuitOpen as e:
+        employees, raw = _stale_or_raise(intent, session_id, e)
+        return employees, raw, 0.0
+    employees, raw = await _ranked_result(rows_by_table, omitted, names, intent, session_id, query, timings, sql_time)
+    SEARCHES_TOTAL.inc(kind="single")
+    return employees, raw, sql_time
+
+
+async def _fetch_rows(intent: dict, session_id: str, cancel_token=None, statement_timeout_ms=None, backend=None,
+                      deadline=None):
+    """4 statement SQL intent → (rows_by_table, omitted, names, timings, sql_time); circuit open → CircuitOpen."""
+    backend = backend or get_backend()
+    queries = build_queries(intent, backend.fulltext)
+    for label, sql, params in queries:
+        logger.debug("[%s] SQL[%s]: %s | params=%s", session_id, label, sql, params)
+
+    async def _fetch():
+        async with backend.connect(statement_timeout_ms) as db:
+            return await fetch_all_rows(db, queries, session_id, intent, deadline)
+
+    t0 = time.perf_counter()
+    with span("sql", statements=len(queries)) as sp, profile_stage("sql"):
+        rows_by_table, omitted, names, timings = await _guarded(_fetch, cancel_token)
+        if omitted:
+            sp.set("omitted", ",".join(omitted))
+    # search degraded (statement timeout) = database lambat → ikut membuka circuit;
+    # tabel yang di-skip karena budget request bukan kesalahan database
+    db_breaker.record(ok=not omitted)
+    if deadline is not None and deadline.skipped:
+        omitted = omitted + deadline.skipped
+    return rows_by_table, omitted, names, timings, time.perf_counter() - t0
+
+
+async def _ranked_result(rows_by_table, omitted, names, intent, session_id, query, timings, sql_time, built=None):
+    """Ranking + simpan ke result_store → (employees terbatas limit, raw)."""
+    t1 = time.perf_counter()
+    # grouping + scoring = CPU murni → di thread supaya event loop tetap melayani request lain
+    ranked = await asyncio.to_thread(rank_employees, rows_by_table, intent, session_id, names, built)
+    employees = _limit(ranked, intent)
+    stored = results.put(session_id, query, intent, ranked)
+    t2 = time.perf_counter()
+    logger.info("[%s] merged employees: %d | SQL time=%.2fs", session_id, len(employees), sql_time)
+    CANDIDATES_RETURNED.observe(len(employees))
+
+    raw = dict(rows_by_table)
+    raw["omitted"] = omitted  # tabel yang di-skip karena timeout (hasil degraded)
+    raw["search_id"] = stored.search_id
+    raw["total_ranked"] = stored.total
+    raw["next_cursor"] = next_cursor(stored.search_id, page_size(intent), stored.total)
+    raw["timings"] = {**timings, "sql": round(sql_time, 4), "merge": round(t2 - t1, 4)}
+    if not omitted:
+        last_results.put(intent, employees, raw)
+    return employees, raw
+
+
+async def run_refined_async(user_query: str, intent: dict, session_id: str, cancel_token=None,
+                            statement_timeout_ms=None, deadline=None):
+    """
+    Search dalam percakapan (Telegram, UI, API "refine": true).
+    - Pesan lanjutan ("now with ...") → digabung dengan intent sebelumnya
+    - Intent yang hanya mempersempit search DB terakhir → dievaluasi dari baris
+      yang tersimpan di memory (tanpa SQL); selain itu → search DB biasa
+    Return (intent efektif, employees, raw, sql_time); raw["refinement"] = "memory" | "database".
+    Circuit database open → hasil terakhir intent tsb (raw["stale"]), lihat _stale_or_raise.
+    """
+    state = conversations.get(session_id)
+    if state is not None and is_refinement(user_query):
+        intent = merge_intents(state.intent, intent)
+
+    if state is not None and narrows(state.base_intent, intent):
+        with span("refine.memory", base_rows=sum(len(v) for v in state.rows_by_table.values())):
+            rows_by_table = filter_rows(state.rows_by_table, intent)
+            built = None
+            if all(len(rows_by_table[t]) == len(state.rows_by_table.get(t, [])) for t in TABLES):
+                # tidak ada baris yang terbuang (mis. hanya experience / limit berubah)
+                # → employee hasil build sebelumnya dipakai ulang (copy: evaluate mengisi score)
+                if state.built is None:
+                    state.built = await asyncio.to_thread(build_employees, state.rows_by_table, state.names)
+                built = [dict(d) for d in state.built]
+            employees, raw = await _ranked_result(
+                rows_by_table, [], state.names, intent, session_id, user_query, {}, 0.0, built
+            )
+        conversations.touch(session_id, intent)
+        SEARCHES_TOTAL.inc(kind="refined")
+        raw["refinement"] = "memory"
+        logger.info("[%s] refined in memory: %s", session_id, intent)
+        return intent, employees, raw, 0.0
 
-    # Collect unique employee IDs
-    emp_ids = set(roles_by_emp.keys()) | set(proj_by_emp.keys()) | set(edu_by_emp.keys()) | set(ts_by_emp.keys())
+    try:
+        rows_by_table, omitted, names, timings, sql_time = await _fetch_rows(
+            intent, session_id, cancel_token, statement_timeout_ms, deadline=deadline
+        )
+    except CircuitOpen as e:
+        employees, raw = _stale_or_raise(intent, session_id, e)
+        raw["refinement"] = "stale"
+        return intent, employees, raw, 0.0
+    employees, raw = await _ranked_result(rows_by_table, omitted, names, intent, session_id, user_query, timings, sql_time)
+    SEARCHES_TOTAL.inc(kind="single")
+    if omitted:
+        # baris tidak lengkap → bukan dasar yang aman untuk narrowing berikutnya
+        conversations.reset(session_id)
+    else:
+        conversations.save(session_id, ConversationState(intent, rows_by_table, names))
+    raw["refinement"] = "database"
+    return intent, employees, raw, sql_time
+
+
+def run_refined(user_query: str, intent: dict, session_id: str, cancel_token=None, statement_timeout_ms=None,
+                deadline=None):
+    return run_sync(run_refined_async(user_query, intent, session_id, cancel_token, statement_timeout_ms, deadline))
+
+
+def _intent_key(intent: dict) -> str:
+    return json.dumps(intent, sort_keys=True, default=str)
+
+
+def _statement_key(sql: str, params) -> tuple:
+    return (sql, tuple(repr(p) for p in params))
+
+
+async def run_batch_queries_async(intents, session_id: str, cancel_token=None, statement_timeout_ms=None):
+    """
+    Batch search (POST /search/batch):
+    - intent identik → dihitung sekali, hasilnya dipakai ulang
+    - statement SQL identik antar intent (mis. tabel tanpa filter) → dieksekusi sekali
+    - semua statement di SATU koneksi
+    Return ([(employees, raw, sql_time)] sesuai urutan intents, stats).
+    """
+    unique = {}
+    for intent in intents:
+        unique.setdefault(_intent_key(intent), intent)
+
+    backend = get_backend()
+    plans = {key: build_queries(intent, backend.fulltext) for key, intent in unique.items()}
+    statements = {}
+    for queries in plans.values():
+        for label, sql, params in queries:
+            statements.setdefault(_statement_key(sql, params), (label, sql, params))
+
+    async def _fetch():
+        async with backend.connect(statement_timeout_ms) as db:
+            results, durations, timed_out = {}, {}, set()
+            for key, (label, sql, params) in statements.items():
+                omitted = []
+                t0 = time.perf_counter()
+                results[key] = await _fetch_or_degrade(db, label, sql, params, session_id, None, omitted)
+                durations[key] = time.perf_counter() - t0
+                if omitted:
+                    timed_out.add(key)
+            all_rows = {label: [] for label in TABLES}
+            for key, (label, _, _) in statements.items():
+                all_rows[label].extend(results[key])
+            names = await db.resolve_names(_ids_without_name(all_rows))
+            return results, durations, timed_out, names
+
+    t0 = time.perf_counter()
+    results, durations, timed_out, names = await _guarded(_fetch, cancel_token)
+    db_breaker.record(ok=not timed_out)
+    logger.info(
+        "[%s] batch: %d queries, %d unique intents, %d statements in %.2fs",
+        session_id, len(intents), len(unique), len(statements), time.perf_counter() - t0,
+    )
 
+    outcomes = {}
+    for key, intent in unique.items():
+        rows_by_table, omitted, timings = {}, [], {}
+        for label, sql, params in plans[key]:
+            skey = _statement_key(sql, params)
+            rows_by_table[label] = results[skey]
+            timings[f"sql_{label}"] = round(durations[skey], 4)
+            if skey in timed_out:
+                omitted.append(label)
+        sql_time = sum(durations[_statement_key(sql, params)] for _, sql, params in plans[key])
+        t1 = time.perf_counter()
+        employees = await asyncio.to_thread(merge_employees, rows_by_table, intent, session_id, names)
+        raw = dict(rows_by_table)
+        raw["omitted"] = omitted
+        raw["timings"] = {**timings, "sql": round(sql_time, 4), "merge": round(time.perf_counter() - t1, 4)}
+        outcomes[key] = (employees, raw, sql_time)
+
+    SEARCHES_TOTAL.inc(len(intents), kind="batch")
+    for employees, _, _ in outcomes.values():
+        CANDIDATES_RETURNED.observe(len(employees))
+
+    stats = {
+        "unique_intents": len(unique),
+        "statements_executed": len(statements),
+        "statements_requested": len(intents) * len(TABLES),
+    }
+    return [outcomes[_intent_key(intent)] for intent in intents], stats
+
+
+async def run_page_async(cursor: str, session_id: str, cancel_token=None, statement_timeout_ms=None):
+    """
+    Halaman berikutnya dari search yang tersimpan (cursor dari raw["next_cursor"]).
+    Ranking tidak diulang: hanya kandidat di halaman ini yang di-hydrate dari DB
+    (intent yang sama + employee_id = ANY(ids)) → score & breakdown identik.
+    Return (employees, page, sql_time); CursorError / CursorExpired kalau cursor rusak / kadaluarsa.
+    """
+    search_id, offset = decode_cursor(cursor)
+    stored = results.get(search_id)
+    if stored is None:
+        raise CursorExpired("Search expired, please run it again")
+    size = page_size(stored.intent)
+    ids = [emp_id for emp_id, _ in stored.page(offset, size)]
+    backend = get_backend()
+    queries = restrict_to_employees(build_queries(stored.intent, backend.fulltext), ids)
+
+    async def _fetch():
+        async with backend.connect(statement_timeout_ms) as db:
+            return await fetch_all_rows(db, queries, session_id, stored.intent)
+
+    t0 = time.perf_counter()
+    with span("sql.page", statements=len(queries), candidates=len(ids)):
+        rows_by_table, omitted, names, timings = await _guarded(_fetch, cancel_token)
+    db_breaker.record(ok=not omitted)
+    sql_time = time.perf_counter() - t0
+
+    grouped = group_by_employee(rows_by_table)
     employees = []
-    for emp_id in emp_ids:
-        d = {
-            "employee_id": emp_id,
-            "roles": roles_by_emp.get(emp_id, []),
-            "projects": proj_by_emp.get(emp_id, []),
-            "education": edu_by_emp.get(emp_id, []),
-            "timesheet": ts_by_emp.get(emp_id, []),
-        }
-
-        # Full name resolution
-        name = None
-        if d["roles"]:
-            name = d["roles"][0].get("full_name")
-        elif d["projects"]:
-            name = d["projects"][0].get("nama_lengkap")
-        elif d["education"]:
-            name = d["education"][0].get("name")
-        elif d["timesheet"]:
-            name = d["timesheet"][0].get("employee_name")
-        if not name:
-            name = resolve_employee_name(emp_id)
-        d["full_name"] = name or f"EMP-{emp_id}"
-
-        # =============================================
-        # ✅ Compute total experience (months + years)
-        # =============================================
-        total_months = 0
-        for p in d["projects"]:
-            total_months += parse_duration_to_months(p.get("durasi_role"))
-        d["total_experience_months"] = total_months
-        d["total_experience_years"] = round(total_months / 12, 2)
-
-        # ✅ Apply experience filter (bulan basis)
-        exp_req = intent.get("experience", {})
-        min_years = exp_req.get("min_years")
-        max_years = exp_req.get("max_years")
-        min_months = exp_req.get("min_months")
-        max_months = exp_req.get("max_months")
-
-        # Handle min experience requirement
-        if min_years is not None:
-            min_months = min_years * 12
-        if min_months is not None:
-            if d["total_experience_months"] < min_months:
-                logger.debug(f"[{session_id}] Candidate {emp_id} excluded (exp {d['total_experience_months']} < {min_months} mo)")
-                continue
-
-        # Handle max experience requirement
-        if max_years is not None:
-            max_months = max_years * 12
-        if max_months is not None:
-            if d["total_experience_months"] > max_months:
-                logger.debug(f"[{session_id}] Candidate {emp_id} excluded (exp {d['total_experience_months']} > {max_months} mo)")
-                continue
-
-        # ✅ Apply scoring
-        score, breakdown, exclude = score_candidate(d, intent)
-        if exclude:
-            logger.debug(f"[{session_id}] Candidate {emp_id} excluded. Breakdown={breakdown}")
-            continue
-
-        d["score"] = score
-        d["scoring_breakdown"] = breakdown
-        employees.append(d)
+    for emp_id in ids:
+        d = build_employee(emp_id, grouped.get(emp_id, {}), names)
+        if evaluate_employee(d, stored.intent, session_id):
+            employees.append(d)
+    logger.info("[%s] page %s@%d: %d/%d candidates in %.2fs", session_id, search_id, offset, len(employees), len(ids), sql_time)
+
+    page = {
+        "search_id": search_id,
+        "query": stored.query,
+        "intent": stored.intent,
+        "offset": offset,
+        "total_ranked": stored.total,
+        "next_cursor": next_cursor(search_id, offset + size, stored.total),
+        "omitted": omitted,
+        "timings": {**timings, "sql": round(sql_time, 4)},
+    }
+    return employees, page, sql_time
 
-        logger.debug(f"[{session_id}] Candidate {emp_id} scored={score}, breakdown={breakdown}")
 
-    # ✅ Sort & apply limit
-    employees.sort(key=lambda x: x.get("score", 0), reverse=True)
-    primary = intent.get("limit", {}).get("primary", 3)
-    backup = intent.get("limit", {}).get("backup", 2)
-    employees = employees[: primary + backup]
+def run_page(cursor: str, session_id: str, cancel_token=None, statement_timeout_ms=None):
+    return run_sync(run_page_async(cursor, session_id, cancel_token, statement_timeout_ms))
 
-    logger.info(f"[{session_id}] merged employees: {len(employees)} | SQL time={(t1 - t0):.2f}s")
 
-    raw = {
-        "roles": role_rows,
-        "projects": proj_rows,
-        "education": edu_rows,
-        "timesheet": ts_rows,
-    }
-    return employees, raw, (t1 - t0)
+def run_all_queries(intent: dict, session_id: str, cancel_token=None, statement_timeout_ms=None, query: str = "",
+                    backend=None, deadline=None):
+    """API sync (UI, Flask, script) → thin wrapper di atas run_all_queries_async."""
+    return run_sync(
+        run_all_queries_async(intent, session_id, cancel_token, statement_timeout_ms, query, backend, deadline)
+    )
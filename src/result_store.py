@@ -0,0 +1,156 @@
+import json
+import time
+import secrets
+import threading
+from array import array
+from collections import OrderedDict
+from src.config import RESULT_STORE_MAX_ENTRIES, RESULT_STORE_TTL_S, STALE_RESULTS_MAX_ENTRIES, STALE_RESULTS_MAX_AGE_S
+from src.metrics import register_gauge
+
+# =============================================
+# Ranked result store (pagination)
+# - Tiap search menyimpan ranking LENGKAP sebagai id + score (bukan dict kandidat)
+# - Halaman berikutnya: ambil id di slice itu → hydrate hanya kandidat tsb
+#   (lihat query_executor.run_page_async), tanpa mengulang ranking
+# - Dibatasi jumlah entry (LRU) dan umur (TTL); cursor kadaluarsa → CursorExpired
+# Cursor: "<search_id>:<offset>" (pendek, muat di callback_data Telegram ≤ 64 byte)
+# LastResults: hasil lengkap terakhir per intent (kandidat yang ditampilkan saja)
+# → fallback stale saat circuit database open (src/circuit_breaker.py)
+# =============================================
+
+
+class CursorError(ValueError):
+    """Cursor rusak."""
+
+
+class CursorExpired(CursorError):
+    """Search-nya sudah dibuang dari store (TTL / LRU) → jalankan ulang search."""
+
+
+class StoredSearch:
+    __slots__ = ("search_id", "session_id", "query", "intent", "ids", "scores", "created")
+
+    def __init__(self, search_id, session_id, query, intent, ranked):
+        self.search_id = search_id
+        self.session_id = session_id
+        self.query = query
+        self.intent = intent
+        self.ids = tuple(e["employee_id"] for e in ranked)
+        self.scores = array("d", (float(e.get("score", 0)) for e in ranked))
+        self.created = time.monotonic()
+
+    @property
+    def total(self) -> int:
+        return len(self.ids)
+
+    def page(self, offset: int, size: int):
+        """[(employee_id, score)] untuk slice [offset, offset + size)."""
+        return list(zip(self.ids[offset:offset + size], self.scores[offset:offset + size]))
+
+
+class ResultStore:
+    def __init__(self, max_entries: int, ttl_s: float):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # dipakai thread Flask + event loop
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, session_id, query, intent, ranked) -> StoredSearch:
+        entry = StoredSearch(secrets.token_urlsafe(9), session_id, query, intent, ranked)
+        with self._lock:
+            self._entries[entry.search_id] = entry
+            self._evict(time.monotonic())
+        return entry
+
+    def get(self, search_id):
+        with self._lock:
+            entry = self._entries.get(search_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.created > self.ttl_s:
+                del self._entries[search_id]
+                return None
+            self._entries.move_to_end(search_id)
+            return entry
+
+    def _evict(self, now):
+        # entry tertua ada di depan (insert / move_to_end)
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if len(self._entries) <= self.max_entries and now - oldest.created <= self.ttl_s:
+                break
+            self._entries.popitem(last=False)
+
+
+def encode_cursor(search_id: str, offset: int) -> str:
+    return f"{search_id}:{offset}"
+
+
+def decode_cursor(cursor: str):
+    search_id, sep, offset = str(cursor or "").rpartition(":")
+    if not sep or not search_id or not offset.isdigit():
+        raise CursorError("Invalid cursor")
+    return search_id, int(offset)
+
+
+def next_cursor(search_id, offset: int, total: int):
+    """Cursor halaman setelah `offset`, None kalau sudah habis."""
+    if not search_id or offset >= total:
+        return None
+    return encode_cursor(search_id, offset)
+
+
+class LastResults:
+    """Intent → (employees, ringkasan raw) search lengkap terakhir; LRU + umur maksimum."""
+
+    RAW_KEYS = ("search_id", "total_ranked", "next_cursor")
+
+    def __init__(self, max_entries: int, max_age_s: float):
+        self.max_entries = max_entries
+        self.max_age_s = max_age_s
+        self._entries = OrderedDict()  # intent key → (employees, raw, stored_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(intent: dict) -> str:
+        return json.dumps(intent, sort_keys=True, default=str)
+
+    def put(self, intent, employees, raw):
+        if self.max_entries <= 0:
+            return
+        key = self.key(intent)
+        summary = {k: raw.get(k) for k in self.RAW_KEYS}
+        with self._lock:
+            self._entries[key] = (list(employees), summary, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, intent):
+        """(employees, raw) dengan raw["stale"] = True + umur, atau None."""
+        key = self.key(intent)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            employees, summary, stored_at = entry
+            age = time.time() - stored_at
+            if age > self.max_age_s:
+                del self._entries[key]
+                return None
+        raw = {**summary, "omitted": [], "timings": {}, "stale": True, "stale_age_s": round(age, 1)}
+        return [dict(e) for e in employees], raw
+
+
+results = ResultStore(RESULT_STORE_MAX_ENTRIES, RESULT_STORE_TTL_S)
+last_results = LastResults(STALE_RESULTS_MAX_ENTRIES, STALE_RESULTS_MAX_AGE_S)
+
+register_gauge("talent_result_store_entries", "Ranked searches kept for pagination", [], lambda: {(): len(results)})
+register_gauge("talent_stale_results_entries", "Last complete result per intent (stale fallback)", [],
+               lambda: {(): len(last_results)})
@@ -0,0 +1,188 @@
+import json
+import time
+from src.config import logger
+from src.sql_builder import build_queries
+
+# =============================================
+# Search indexes
+# - pg_trgm GIN index untuk kolom yang di-match pakai ILIKE '%x%'
+#   (leading wildcard → btree tidak terpakai, tanpa ini selalu Seq Scan)
+# - tsvector (generated column) + GIN untuk full-text project description
+# =============================================
+
+TRGM_INDEXES = [
+    # (index name, table, column)
+    ("idx_role_tech_full_name_trgm", "autobot_dataset_talent_profile_role_tech", "full_name"),
+    ("idx_role_tech_role_trgm", "autobot_dataset_talent_profile_role_tech", "role"),
+    ("idx_role_tech_ready_technology_trgm", "autobot_dataset_talent_profile_role_tech", "ready_technology"),
+    ("idx_project_nama_project_trgm", "autobot_dataset_talent_profile_project_experiences", "nama_project"),
+    ("idx_project_description_trgm", "autobot_dataset_talent_profile_project_experiences", "porject_description"),
+    ("idx_education_school_trgm", "autobot_dataset_talent_profile_education", "school"),
+    ("idx_timesheet_employee_name_trgm", "autobot_dataset_talent_timesheet", "employee_name"),
+]
+
+TSV_COLUMNS = [
+    # (table, column, source expression, index name)
+    (
+        "autobot_dataset_talent_profile_project_experiences",
+        "project_tsv",
+        "to_tsvector('simple', coalesce(nama_project, '') || ' ' || coalesce(porject_description, ''))",
+        "idx_project_tsv",
+    ),
+]
+
+
+def apply_indexes(conn):
+    """Buat extension pg_trgm, trigram index, dan kolom tsvector (idempotent)."""
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in TRGM_INDEXES:
+            logger.info(f"[schema] create {name}")
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON public.{table} "
+                f"USING gin ({column} gin_trgm_ops)"
+            )
+        for table, column, expr, index in TSV_COLUMNS:
+            logger.info(f"[schema] create {table}.{column}")
+            cur.execute(
+                f"ALTER TABLE public.{table} ADD COLUMN IF NOT EXISTS {column} tsvector "
+                f"GENERATED ALWAYS AS ({expr}) STORED"
+            )
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {index} ON public.{table} USING gin ({column})")
+        for table in {t for _, t, _ in TRGM_INDEXES}:
+            cur.execute(f"ANALYZE public.{table}")
+    conn.commit()
+
+
+def drop_indexes(conn):
+    """Hapus semua index/kolom di atas."""
+    with conn.cursor() as cur:
+        for name, _, _ in TRGM_INDEXES:
+            cur.execute(f"DROP INDEX IF EXISTS public.{name}")
+        for table, column, _, index in TSV_COLUMNS:
+            cur.execute(f"DROP INDEX IF EXISTS public.{index}")
+            cur.execute(f"ALTER TABLE public.{table} DROP COLUMN IF EXISTS {column}")
+    conn.commit()
+
+
+def verify_indexes(conn):
+    """Return list masalah (kosong = semua index & kolom ada dan valid)."""
+    problems = []
+    with conn.cursor() as cur:
+        cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not cur.fetchone():
+            problems.append("extension pg_trgm is not installed")
+
+        cur.execute(
+            "SELECT c.relname, i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = 'public'"
+        )
+        existing = {name: valid for name, valid in cur.fetchall()}
+        wanted = [name for name, _, _ in TRGM_INDEXES] + [index for *_, index in TSV_COLUMNS]
+        for name in wanted:
+            if name not in existing:
+                problems.append(f"index {name} is missing")
+            elif not existing[name]:
+                problems.append(f"index {name} is invalid (rebuild with REINDEX)")
+
+        for table, column, _, _ in TSV_COLUMNS:
+            cur.execute(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_schema = 'public' AND table_name = %s AND column_name = %s",
+                (table, column),
+            )
+            if not cur.fetchone():
+                problems.append(f"column {table}.{column} is missing")
+    return problems
+
+
+# =============================================
+# EXPLAIN ANALYZE report (before/after)
+# =============================================
+
+REPORT_INTENTS = [
+    {"name": "Saputra"},
+    {"role": "Technical Leader", "skills": {"must_have": ["java"], "nice_to_have": ["python"]}},
+    {"skills": {"must_have": ["kotlin"], "nice_to_have": []}},
+    {"projects": {"must_have": ["core banking"], "nice_to_have": ["payment gateway"]}},
+    {"education": {"preferred": {"degree": "D3", "school": "Polban"}, "substitute": {}}},
+]
+
+
+def _scan_types(plan):
+    nodes = [plan.get("Node Type", "")]
+    for child in plan.get("Plans", []) or []:
+        nodes.extend(_scan_types(child))
+    return nodes
+
+
+def explain_intents(conn, intents, fulltext, use_indexes=True):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) untuk setiap query yang difilter → list of dict.
+    use_indexes=False → planner dilarang memakai index (SET LOCAL, hanya di transaksi ini);
+    schema tidak disentuh, transaksi di-rollback di akhir.
+    """
+    rows = []
+    with conn.cursor() as cur:
+        if not use_indexes:
+            cur.execute("SET LOCAL enable_bitmapscan = off")
+            cur.execute("SET LOCAL enable_indexscan = off")
+            cur.execute("SET LOCAL enable_indexonlyscan = off")
+        for intent in intents:
+            for label, sql, params in build_queries(intent, fulltext=fulltext):
+                if not params:
+                    continue  # query tanpa filter → tidak relevan untuk index
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+                plan = cur.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                top = plan[0]
+                nodes = _scan_types(top["Plan"])
+                rows.append({
+                    "intent": json.dumps(intent, ensure_ascii=False),
+                    "table": label,
+                    "execution_ms": top.get("Execution Time", 0.0),
+                    "seq_scan": "Seq Scan" in nodes,
+                    "nodes": ", ".join(n for n in nodes if "Scan" in n),
+                })
+    conn.rollback()
+    return rows
+
+
+def build_report(conn, intents=None):
+    """
+    EXPLAIN tanpa index (ILIKE, index scan dimatikan), lalu dengan index (full-text) → markdown.
+    Read-only: index harus sudah ada (manage_schema.py apply), schema tidak diubah.
+    """
+    intents = intents or REPORT_INTENTS
+    problems = verify_indexes(conn)
+    conn.rollback()
+    if problems:
+        raise RuntimeError("search indexes are not applied: " + "; ".join(problems))
+
+    t0 = time.perf_counter()
+    before = explain_intents(conn, intents, fulltext=False, use_indexes=False)
+    after = explain_intents(conn, intents, fulltext=True)
+    elapsed = time.perf_counter() - t0
+
+    lines = [
+        "# EXPLAIN ANALYZE report: trigram / full-text indexes",
+        "",
+        "| intent | table | before ms | before scans | after ms | after scans |",
+        "|---|---|---:|---|---:|---|",
+    ]
+    for b, a in zip(before, after):
+        lines.append(
+            f"| `{b['intent']}` | {b['table']} | {b['execution_ms']:.2f} | {b['nodes']} "
+            f"| {a['execution_ms']:.2f} | {a['nodes']} |"
+        )
+    total_before = sum(r["execution_ms"] for r in before)
+    total_after = sum(r["execution_ms"] for r in after)
+    lines += [
+        "",
+        f"Total execution: before {total_before:.2f} ms, after {total_after:.2f} ms",
+        f"Seq scans: before {sum(r['seq_scan'] for r in before)}, after {sum(r['seq_scan'] for r in after)}",
+        f"Report built in {elapsed:.1f}s",
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,105 @@
+import json
+import time
+import random
+import asyncio
+import threading
+import contextvars
+import datetime as dt
+from src.config import (
+    logger, SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_RATE, SLOW_QUERY_EXPLAIN_MAX_PER_MIN,
+    SQL_AUDIT_FLUSH_EVERY, SQL_AUDIT_FLUSH_SECONDS,
+)
+from src.logger_helper import SqlAuditWriter
+
+# =============================================
+# Slow query log
+# - Setiap statement di atas SLOW_QUERY_MS ditulis sebagai 1 baris JSON
+# - Sebagian (sampled + dibatasi per menit) ditambah EXPLAIN (ANALYZE, BUFFERS)
+#   → EXPLAIN ANALYZE menjalankan query lagi, jadi tidak boleh tiap kali, dan
+#   jalan di task terpisah dengan koneksi sendiri (request tidak ikut menunggu)
+# - File ditulis oleh writer thread yang sama dengan SQL audit (tanpa open() per entri)
+# =============================================
+
+SLOW_QUERY_LOG = "logs/slow_queries.jsonl"
+
+_writer = SqlAuditWriter(SLOW_QUERY_LOG, SQL_AUDIT_FLUSH_EVERY, SQL_AUDIT_FLUSH_SECONDS)
+_explain_tasks = set()  # referensi task EXPLAIN yang masih jalan (supaya tidak di-GC)
+_lock = threading.Lock()
+_explain_window_start = 0.0
+_explain_count = 0
+
+
+def is_slow(duration_s: float) -> bool:
+    return duration_s * 1000 >= SLOW_QUERY_MS
+
+
+def should_explain() -> bool:
+    """Sampling + rate limit (maks SLOW_QUERY_EXPLAIN_MAX_PER_MIN per menit per proses)."""
+    global _explain_window_start, _explain_count
+    if SLOW_QUERY_EXPLAIN_RATE <= 0 or random.random() >= SLOW_QUERY_EXPLAIN_RATE:
+        return False
+    with _lock:
+        now = time.monotonic()
+        if now - _explain_window_start >= 60:
+            _explain_window_start = now
+            _explain_count = 0
+        if _explain_count >= SLOW_QUERY_EXPLAIN_MAX_PER_MIN:
+            return False
+        _explain_count += 1
+        return True
+
+
+async def explain_analyze(conn, sql: str, params):
+    """Ambil plan JSON (asyncpg conn, sql sudah pakai $n); error tidak boleh menggagalkan search."""
+    try:
+        plan = await conn.fetchval("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, *params)
+        return json.loads(plan) if isinstance(plan, str) else plan
+    except Exception as e:
+        logger.error("EXPLAIN capture failed: %s", e)
+        return None
+
+
+def _seq_scans(plan_node):
+    found = []
+    if plan_node.get("Node Type") == "Seq Scan":
+        found.append(plan_node.get("Relation Name"))
+    for child in plan_node.get("Plans", []) or []:
+        found.extend(_seq_scans(child))
+    return found
+
+
+def record_slow_query(session_id, intent, label, sql, params, duration_s, rows, plan=None):
+    entry = {
+        "ts": dt.datetime.now().isoformat(),
+        "session_id": session_id,
+        "intent": intent,
+        "statement": label,
+        "duration_ms": round(duration_s * 1000, 2),
+        "rows": rows,
+        "sql": " ".join(sql.split()),
+        "params": [str(p) for p in (params or [])],
+    }
+    if plan:
+        entry["plan"] = plan
+        entry["seq_scans"] = _seq_scans(plan[0]["Plan"]) if plan and "Plan" in plan[0] else []
+    _writer.write(entry)
+    logger.warning(f"[{session_id}] slow SQL[{label}] {entry['duration_ms']:.0f}ms (explain={'yes' if plan else 'no'})")
+
+
+def explain_in_background(backend, session_id, intent, label, sql, params, duration_s, rows):
+    """
+    Catat statement lambat + EXPLAIN ANALYZE-nya dari task terpisah (koneksi backend sendiri).
+    Context kosong → task tidak ikut ke trace / profile request yang memicunya.
+    """
+    async def _explain():
+        plan = None
+        try:
+            async with backend.connect() as db:
+                plan = await db.explain(sql, params)
+        except Exception as e:
+            logger.error("EXPLAIN capture failed: %s", e)
+        record_slow_query(session_id, intent, label, sql, params, duration_s, rows, plan)
+
+    task = asyncio.get_running_loop().create_task(_explain(), context=contextvars.Context())
+    _explain_tasks.add(task)
+    task.add_done_callback(_explain_tasks.discard)
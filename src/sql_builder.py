@@ -1,4 +1,7 @@
 import re
+import datetime as dt
+from src.config import PROJECT_FULLTEXT
+from src.tracing import traced
 
 # =============================================
 # SQL Templates
@@ -66,9 +69,10 @@ WHERE 1=1
 # - Name filter (disesuaikan per tabel agar aman)
 # =============================================
 
-def build_clauses(intent: dict):
+@traced("build_clauses")
+def build_clauses(intent: dict, fulltext: bool = PROJECT_FULLTEXT):
     role_clause, skill_clause, role_params = build_role_clause(intent)
-    proj_clause, proj_params = build_project_clause(intent)
+    proj_clause, proj_params = build_project_clause(intent, fulltext)
     edu_clause, edu_params = build_edu_clause(intent)
     ts_date_clause, ts_proj_clause, ts_params = build_timesheet_clause(intent)
 
@@ -85,6 +89,42 @@ def build_clauses(intent: dict):
         "timesheet": (ts_date_clause, ts_proj_clause, ts_params + ts_name_params, ts_name_clause),
     }
 
+# ---------------------------------------------
+# Final queries: [(label, sql, params)] untuk 4 tabel
+# (urutan = urutan eksekusi di query_executor)
+# ---------------------------------------------
+def build_queries(intent: dict, fulltext: bool = PROJECT_FULLTEXT):
+    clauses = build_clauses(intent, fulltext)
+    role_clause, skill_clause, role_params, name_clause = clauses["role"]
+    proj_clause, proj_params, name_clause_p = clauses["project"]
+    edu_clause, edu_params, name_clause_e = clauses["education"]
+    ts_date_clause, ts_proj_clause, ts_params, name_clause_t = clauses["timesheet"]
+    return [
+        ("roles", ROLE_SQL.format(
+            role_clause=role_clause, skill_clause=skill_clause, name_clause=name_clause
+        ), role_params),
+        ("projects", PROJECT_SQL.format(
+            proj_clause=proj_clause, name_clause=name_clause_p
+        ), proj_params),
+        ("education", EDU_SQL.format(
+            edu_clause=edu_clause, name_clause=name_clause_e
+        ), edu_params),
+        ("timesheet", TIMESHEET_SQL.format(
+            ts_date_clause=ts_date_clause, ts_proj_clause=ts_proj_clause, name_clause=name_clause_t
+        ), ts_params),
+    ]
+
+# ---------------------------------------------
+# Hydrate halaman berikutnya: filter intent yang sama, dibatasi ke employee tertentu
+# (dibungkus subquery → aman terhadap "OR" di education clause)
+# ---------------------------------------------
+def restrict_to_employees(queries, employee_ids):
+    ids = [str(e) for e in employee_ids]
+    return [
+        (label, f"SELECT * FROM ({sql}) q WHERE q.employee_id::text = ANY(%s)", list(params) + [ids])
+        for label, sql, params in queries
+    ]
+
 # ---------------------------------------------
 # Role Clause
 # ---------------------------------------------
@@ -119,8 +159,12 @@ def build_role_clause(intent):
 
 # ---------------------------------------------
 # Project Clause
+# - fulltext=True → description via project_tsv (GIN),
+#   nama_project tetap ILIKE (pakai trigram index)
+# - phraseto_tsquery cocok per token utuh, bukan substring:
+#   "java" tidak lagi cocok dengan "javascript" di description
 # ---------------------------------------------
-def build_project_clause(intent):
+def build_project_clause(intent, fulltext: bool = PROJECT_FULLTEXT):
     clauses = []
     params = []
 
@@ -131,8 +175,12 @@ def build_project_clause(intent):
     if all_proj:
         like_clauses = []
         for p in all_proj:
-            like_clauses.append("(nama_project ILIKE %s OR porject_description ILIKE %s)")
-            params.extend([f"%{p}%", f"%{p}%"])
+            if fulltext:
+                like_clauses.append("(nama_project ILIKE %s OR project_tsv @@ phraseto_tsquery('simple', %s))")
+                params.extend([f"%{p}%", p])
+            else:
+                like_clauses.append("(nama_project ILIKE %s OR porject_description ILIKE %s)")
+                params.extend([f"%{p}%", f"%{p}%"])
         clauses.append("AND (" + " OR ".join(like_clauses) + ")")
 
     return " ".join(clauses), params
@@ -181,10 +229,10 @@ def build_timesheet_clause(intent):
 
     if start:
         date_clause += " AND date >= %s"
-        params.append(start)
+        params.append(_as_date(start))
     if end:
         date_clause += " AND date <= %s"
-        params.append(end)
+        params.append(_as_date(end))
 
     if proj:
         proj_clause += " AND project_or_client_name ILIKE %s"
@@ -192,6 +240,15 @@ def build_timesheet_clause(intent):
 
     return date_clause, proj_clause, params
 
+def _as_date(value):
+    """'YYYY-MM-DD' → date (asyncpg tidak menerima string untuk kolom date)."""
+    if isinstance(value, str):
+        try:
+            return dt.date.fromisoformat(value.strip())
+        except ValueError:
+            return value
+    return value
+
 # ---------------------------------------------
 # Name Clause (per tabel)
 # ---------------------------------------------
@@ -0,0 +1,414 @@
+import os
+import re
+import time
+import asyncio
+import sqlite3
+import datetime as dt
+from contextlib import contextmanager, asynccontextmanager
+import asyncpg
+from psycopg2.extras import RealDictCursor
+from src.config import (
+    logger, STORAGE_BACKEND, SQLITE_PATH, PROJECT_FULLTEXT, SEARCH_STATEMENT_TIMEOUT_MS,
+)
+from src.database import get_pool, get_conn, to_asyncpg
+from src.slow_query_log import explain_analyze
+
+# =============================================
+# Storage backend (STORAGE_BACKEND=postgres | sqlite)
+# - query_executor / export hanya bicara dengan interface ini:
+#     async with backend.connect(timeout_ms) as db:   # search pipeline
+#         await db.fetch(sql, params[, timeout_ms]) / db.resolve_names(ids) / db.explain(sql, params)
+#     with backend.connect_sync(timeout_ms) as db:    # export (streaming)
+#         db.stream(label, sql, params, fetch_size) / db.fetch(...) / db.resolve_names(ids)
+# - SQL tetap dari sql_builder (dialek Postgres, placeholder %s); SQLite menerjemahkan:
+#   ILIKE → LIKE, = ANY(%s) → IN (?, ...), tanpa schema public. / cast ::text
+# - Statement yang lewat batas waktu → StatementTimeout (tabel di-omit, bukan error 500)
+# - Catatan SQLite: LIKE hanya case-insensitive untuk huruf ASCII, full-text
+#   project (PROJECT_FULLTEXT) tidak tersedia → selalu ILIKE/LIKE
+# =============================================
+
+NAME_TABLE = "autobot_dataset_talent_profile_role_tech"
+
+
+class StatementTimeout(Exception):
+    """Statement dihentikan karena melewati statement timeout."""
+
+
+# =============================================
+# Postgres (asyncpg untuk search, psycopg2 untuk export)
+# =============================================
+
+def _as_dicts(records) -> list:
+    return [dict(r) for r in records]
+
+
+class PostgresSession:
+    def __init__(self, backend, conn):
+        self.backend = backend
+        self.conn = conn
+
+    async def fetch(self, sql, params, timeout_ms=None) -> list:
+        """timeout_ms → statement_timeout khusus statement ini (transaction-local, kembali sendiri)."""
+        q, args = to_asyncpg(sql, params)
+        try:
+            if timeout_ms is None:
+                records = await self.conn.fetch(q, *args)
+            else:
+                async with self.conn.transaction():
+                    await self.conn.execute("SELECT set_config('statement_timeout', $1, true)", str(max(1, int(timeout_ms))))
+                    records = await self.conn.fetch(q, *args)
+        except asyncpg.exceptions.QueryCanceledError as e:
+            raise StatementTimeout(str(e)) from e
+        # Record → dict untuk puluhan ribu baris = CPU murni → di thread, event loop tidak tertahan
+        return await asyncio.to_thread(_as_dicts, records)
+
+    async def resolve_names(self, emp_ids) -> dict:
+        """Nama untuk employee yang tidak punya nama di baris hasil query (1 query untuk semua)."""
+        if not emp_ids:
+            return {}
+        try:
+            rows = await self.conn.fetch(
+                "SELECT DISTINCT ON (employee_id) employee_id, full_name "
+                f"FROM public.{NAME_TABLE} "
+                "WHERE employee_id::text = ANY($1::text[])",
+                [str(e) for e in emp_ids],
+            )
+            return {str(r["employee_id"]): r["full_name"] for r in rows if r["full_name"]}
+        except asyncpg.PostgresError:
+            return {}
+
+    async def explain(self, sql, params):
+        q, args = to_asyncpg(sql, params)
+        return await explain_analyze(self.conn, q, args)
+
+
+class PostgresSyncSession:
+    def __init__(self, backend, conn):
+        self.backend = backend
+        self.conn = conn
+
+    def stream(self, label, sql, params, fetch_size):
+        """Named (server-side) cursor → fetch_size baris per round trip."""
+        with self.conn.cursor(name=f"export_{label}", cursor_factory=RealDictCursor) as cur:
+            cur.itersize = fetch_size
+            cur.execute(sql, params)
+            yield from cur
+
+    def fetch(self, sql, params) -> list:
+        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def resolve_names(self, emp_ids) -> dict:
+        if not emp_ids:
+            return {}
+        with self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT DISTINCT ON (employee_id) employee_id, full_name "
+                f"FROM public.{NAME_TABLE} "
+                "WHERE employee_id::text = ANY(%s)",
+                ([str(e) for e in emp_ids],),
+            )
+            return {str(emp_id): name for emp_id, name in cur.fetchall() if name}
+
+
+class PostgresBackend:
+    name = "postgres"
+
+    def __init__(self, fulltext: bool = PROJECT_FULLTEXT):
+        self.fulltext = fulltext
+
+    @asynccontextmanager
+    async def connect(self, statement_timeout_ms=None):
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            timeout_ms = statement_timeout_ms or SEARCH_STATEMENT_TIMEOUT_MS
+            # session-level; pool menjalankan RESET ALL saat koneksi dikembalikan
+            await conn.execute("SELECT set_config('statement_timeout', $1, false)", str(int(timeout_ms)))
+            yield PostgresSession(self, conn)
+
+    @contextmanager
+    def connect_sync(self, statement_timeout_ms=None):
+        conn = get_conn()
+        try:
+            with conn.cursor() as cur:
+                # transaction-level: named cursor hanya hidup di dalam transaksi ini
+                cur.execute(
+                    "SELECT set_config('statement_timeout', %s, true)",
+                    (str(int(statement_timeout_ms or SEARCH_STATEMENT_TIMEOUT_MS)),),
+                )
+            yield PostgresSyncSession(self, conn)
+        finally:
+            conn.rollback()
+            conn.close()
+
+
+# =============================================
+# SQLite (stdlib sqlite3, satu file)
+# - Koneksi read-only per search; query jalan di thread (asyncio.to_thread)
+# - Timeout per statement lewat progress handler; cancel → conn.interrupt()
+# =============================================
+
+_PARAM_RE = re.compile(r"=\s*ANY\(%s\)|%s")
+_SQLITE_REWRITES = [
+    (re.compile(r"\bILIKE\b", re.IGNORECASE), "LIKE"),
+    (re.compile(r"\bpublic\."), ""),
+    (re.compile(r"::text\b"), ""),
+    (re.compile(r'COLLATE "C"'), "COLLATE BINARY"),
+]
+# progress handler dipanggil tiap N instruksi VM
+_PROGRESS_STEPS = 10000
+# batas host parameter per statement (SQLITE_MAX_VARIABLE_NUMBER lama = 999)
+_MAX_VARIABLES = 900
+
+
+def _sqlite_value(value):
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    return value
+
+
+def to_sqlite(sql: str, params):
+    """SQL sql_builder (dialek Postgres, %s) → (sql SQLite dengan ?, params)."""
+    values = iter(params)
+    out = []
+
+    def _placeholder(m):
+        value = next(values)
+        if m.group(0) == "%s":
+            out.append(_sqlite_value(value))
+            return "?"
+        items = [_sqlite_value(v) for v in value]
+        out.extend(items)
+        return f"IN ({', '.join('?' * len(items))})"
+
+    sql = _PARAM_RE.sub(_placeholder, sql)
+    for pattern, replacement in _SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql, out
+
+
+def _convert_date(raw: bytes):
+    try:
+        return dt.date.fromisoformat(raw.decode())
+    except ValueError:
+        return raw.decode()
+
+
+# kolom bertipe DATE dikembalikan sebagai datetime.date (sama dengan Postgres)
+sqlite3.register_converter("DATE", _convert_date)
+
+
+class SQLiteSyncSession:
+    def __init__(self, backend, conn, statement_timeout_ms=None):
+        self.backend = backend
+        self.conn = conn
+        self.timeout_s = (statement_timeout_ms or SEARCH_STATEMENT_TIMEOUT_MS) / 1000
+        self._deadline = None
+        conn.set_progress_handler(self._check_deadline, _PROGRESS_STEPS)
+
+    def _check_deadline(self):
+        return 1 if self._deadline is not None and time.monotonic() > self._deadline else 0
+
+    def _arm(self):
+        self._deadline = time.monotonic() + self.timeout_s
+
+    def _execute(self, sql, params):
+        q, args = to_sqlite(sql, params)
+        self._arm()
+        try:
+            return self.conn.execute(q, args)
+        except sqlite3.OperationalError as e:
+            self._raise_timeout(e)
+            raise
+
+    def _raise_timeout(self, e):
+        if "interrupted" in str(e) and self._deadline is not None and time.monotonic() > self._deadline:
+            raise StatementTimeout(str(e)) from e
+
+    def fetch(self, sql, params, timeout_ms=None) -> list:
+        timeout_s = self.timeout_s
+        if timeout_ms is not None:
+            self.timeout_s = timeout_ms / 1000
+        try:
+            cur = self._execute(sql, params)
+            try:
+                return [dict(r) for r in cur.fetchall()]
+            except sqlite3.OperationalError as e:
+                self._raise_timeout(e)
+                raise
+            finally:
+                cur.close()
+        finally:
+            self.timeout_s = timeout_s
+
+    def stream(self, label, sql, params, fetch_size):
+        cur = self._execute(sql, params)
+        try:
+            while True:
+                self._arm()  # seperti FETCH named cursor: timeout per round trip
+                try:
+                    rows = cur.fetchmany(fetch_size)
+                except sqlite3.OperationalError as e:
+                    self._raise_timeout(e)
+                    raise
+                if not rows:
+                    break
+                for r in rows:
+                    yield dict(r)
+        finally:
+            cur.close()
+
+    def resolve_names(self, emp_ids) -> dict:
+        ids = [str(e) for e in emp_ids]
+        names = {}
+        self._arm()
+        for start in range(0, len(ids), _MAX_VARIABLES):
+            chunk = ids[start:start + _MAX_VARIABLES]
+            rows = self.conn.execute(
+                f"SELECT employee_id, MAX(full_name) AS full_name FROM {NAME_TABLE} "
+                f"WHERE employee_id IN ({', '.join('?' * len(chunk))}) GROUP BY employee_id",
+                chunk,
+            ).fetchall()
+            names.update({str(r["employee_id"]): r["full_name"] for r in rows if r["full_name"]})
+        return names
+
+    def explain(self, sql, params):
+        q, args = to_sqlite(sql, params)
+        self._arm()
+        try:
+            return [{"sqlite_plan": [r["detail"] for r in self.conn.execute("EXPLAIN QUERY PLAN " + q, args)]}]
+        except sqlite3.Error as e:
+            logger.error("EXPLAIN capture failed: %s", e)
+            return None
+
+
+class SQLiteSession:
+    """Versi async SQLiteSyncSession: tiap statement di thread, cancel → interrupt."""
+
+    def __init__(self, sync_session):
+        self.backend = sync_session.backend
+        self._sync = sync_session
+
+    async def _run(self, func, *args):
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # statement masih jalan di thread → hentikan, tunggu sebelum koneksi ditutup
+            self._sync.conn.interrupt()
+            await asyncio.wait([future])
+            if not future.cancelled():
+                future.exception()  # "interrupted" sudah diharapkan
+            raise
+
+    async def fetch(self, sql, params, timeout_ms=None) -> list:
+        return await self._run(self._sync.fetch, sql, params, timeout_ms)
+
+    async def resolve_names(self, emp_ids) -> dict:
+        return await self._run(self._sync.resolve_names, emp_ids)
+
+    async def explain(self, sql, params):
+        return await self._run(self._sync.explain, sql, params)
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    fulltext = False
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(
+                f"SQLite database {self.path} not found "
+                "(python manage_schema.py seed --sqlite ... / copy-to-sqlite)"
+            )
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @asynccontextmanager
+    async def connect(self, statement_timeout_ms=None):
+        conn = await asyncio.to_thread(self._open)
+        try:
+            yield SQLiteSession(SQLiteSyncSession(self, conn, statement_timeout_ms))
+        finally:
+            conn.close()
+
+    @contextmanager
+    def connect_sync(self, statement_timeout_ms=None):
+        conn = self._open()
+        try:
+            yield SQLiteSyncSession(self, conn, statement_timeout_ms)
+        finally:
+            conn.close()
+
+
+# =============================================
+# Backend aktif
+# =============================================
+
+BACKENDS = {"postgres": PostgresBackend, "sqlite": SQLiteBackend}
+
+_backend = None
+
+
+def make_backend(name: str):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STORAGE_BACKEND: {name} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = make_backend(STORAGE_BACKEND)
+        logger.info(f"[storage] backend: {_backend.name}")
+    return _backend
+
+
+# =============================================
+# SQLite file: buat tabel / salin data dari Postgres
+# =============================================
+
+def connect_sqlite(path: str = SQLITE_PATH):
+    """Koneksi tulis (seed / copy); folder dibuat kalau belum ada."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return sqlite3.connect(path)
+
+
+def copy_to_sqlite(pg_conn, path: str = SQLITE_PATH, batch_size: int = 5000) -> dict:
+    """Salin keempat tabel dari Postgres ke file SQLite (tabel di file dikosongkan dulu)."""
+    from src.synthetic_data import TABLE_COLUMNS, create_tables, truncate_tables
+
+    conn = connect_sqlite(path)
+    counts = {}
+    try:
+        create_tables(conn)
+        truncate_tables(conn)
+        for table, columns in TABLE_COLUMNS.items():
+            cols = ", ".join(columns)
+            insert = f"INSERT INTO {table} ({cols}) VALUES ({', '.join('?' * len(columns))})"
+            counts[table] = 0
+            with pg_conn.cursor(name=f"copy_{table}") as cur:
+                cur.itersize = batch_size
+                cur.execute(f"SELECT {cols} FROM public.{table}")
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    conn.executemany(insert, [[_sqlite_value(v) for v in row] for row in rows])
+                    counts[table] += len(rows)
+            conn.commit()
+            logger.info(f"[storage] {table}: {counts[table]} rows copied to {path}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    pg_conn.rollback()
+    return counts
@@ -0,0 +1,52 @@
+import json
+
+# =============================================
+# Streaming search response (NDJSON / SSE)
+# Urutan event:
+#   1. intent     → segera setelah intent di-parse (sebelum SQL)
+#   2. candidate  → satu per kandidat, dikirim begitu selesai diformat
+#   3. done       → trailer: total, timing, degraded/omitted
+# Dipakai api_service (FastAPI) dan flask_service.
+# =============================================
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def wants_sse(accept_header: str) -> bool:
+    return SSE_MEDIA_TYPE in (accept_header or "")
+
+
+def intent_event(query: str, intent: dict, parse_time: float) -> dict:
+    return {"event": "intent", "query": query, "intent": intent, "parse_seconds": round(parse_time, 4)}
+
+
+def candidate_event(rank: int, candidate: dict, summary: str) -> dict:
+    return {"event": "candidate", "rank": rank, "candidate": candidate, "summary": summary}
+
+
+def done_event(total_found: int, sql_time: float, raw: dict, timings: dict) -> dict:
+    omitted = raw.get("omitted", [])
+    return {
+        "event": "done",
+        "total_found": total_found,
+        "search_time_seconds": round(sql_time, 4),
+        "degraded": bool(omitted),
+        "omitted": omitted,
+        "stale": bool(raw.get("stale")),
+        "timings": timings,
+        "next_cursor": raw.get("next_cursor"),
+    }
+
+
+def error_event(message: str) -> dict:
+    return {"event": "error", "message": message}
+
+
+def encode_ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+
+def encode_sse(event: dict) -> str:
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event['event']}\ndata: {data}\n\n"
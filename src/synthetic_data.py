@@ -0,0 +1,238 @@
+import io
+import csv
+import time
+import random
+import sqlite3
+import itertools
+import datetime as dt
+from src.config import logger
+
+# =============================================
+# Synthetic talent dataset
+# - Struktur tabel mengikuti kolom yang dipakai sql_builder/formatter
+# - Data di-load pakai COPY (bukan INSERT per baris)
+# - Skala: 1k – 1M employee; timesheet ≈ timesheet_days/2 baris per employee
+#   (1M employee × --timesheet-days 40 ≈ 20 juta baris timesheet)
+# - Teknologi / client / role tidak uniform (beberapa jauh lebih populer)
+#   → selektivitas filter mirip data asli, bukan semua term sama jarangnya
+# - Target: Postgres (COPY) atau file SQLite (STORAGE_BACKEND=sqlite, executemany)
+# - HANYA untuk database lokal / benchmark, bukan production
+# =============================================
+
+TABLE_DDL = {
+    "autobot_dataset_talent_profile_role_tech": """
+        CREATE TABLE IF NOT EXISTS public.autobot_dataset_talent_profile_role_tech (
+            employee_id      TEXT,
+            full_name        TEXT,
+            role             TEXT,
+            level            TEXT,
+            ready_technology TEXT
+        )""",
+    "autobot_dataset_talent_profile_project_experiences": """
+        CREATE TABLE IF NOT EXISTS public.autobot_dataset_talent_profile_project_experiences (
+            employee_id         TEXT,
+            nama_lengkap        TEXT,
+            nama_project        TEXT,
+            porject_description TEXT,
+            nama_client         TEXT,
+            project_role        TEXT,
+            durasi_role         TEXT
+        )""",
+    "autobot_dataset_talent_profile_education": """
+        CREATE TABLE IF NOT EXISTS public.autobot_dataset_talent_profile_education (
+            employee_id TEXT,
+            degree      TEXT,
+            school      TEXT,
+            name        TEXT,
+            graduation  TEXT
+        )""",
+    "autobot_dataset_talent_timesheet": """
+        CREATE TABLE IF NOT EXISTS public.autobot_dataset_talent_timesheet (
+            employee_id            TEXT,
+            employee_name          TEXT,
+            project_or_client_name TEXT,
+            task                   TEXT,
+            date                   DATE
+        )""",
+}
+
+TABLE_COLUMNS = {
+    "autobot_dataset_talent_profile_role_tech": [
+        "employee_id", "full_name", "role", "level", "ready_technology",
+    ],
+    "autobot_dataset_talent_profile_project_experiences": [
+        "employee_id", "nama_lengkap", "nama_project", "porject_description",
+        "nama_client", "project_role", "durasi_role",
+    ],
+    "autobot_dataset_talent_profile_education": [
+        "employee_id", "degree", "school", "name", "graduation",
+    ],
+    "autobot_dataset_talent_timesheet": [
+        "employee_id", "employee_name", "project_or_client_name", "task", "date",
+    ],
+}
+
+FIRST_NAMES = [
+    "Dedi", "Budi", "Siti", "Agus", "Rina", "Andi", "Dewi", "Eko", "Fitri", "Hendra",
+    "Indah", "Joko", "Lestari", "Made", "Nur", "Putri", "Rizky", "Sari", "Teguh", "Wahyu",
+]
+LAST_NAMES = [
+    "Saputra", "Wijaya", "Pratama", "Santoso", "Hidayat", "Kusuma", "Nugroho", "Siregar",
+    "Gunawan", "Setiawan", "Permana", "Lubis", "Halim", "Utami", "Firmansyah",
+]
+ROLES = [
+    "Software Engineer", "Senior Software Engineer", "Technical Leader", "System Analyst",
+    "Quality Assurance", "DevOps Engineer", "Data Engineer", "Project Manager",
+]
+LEVELS = ["Junior", "Middle", "Senior", "Lead"]
+TECHNOLOGIES = [
+    "java", "python", "spring", "spring boot", "node", "react", "go", "kotlin",
+    "postgresql", "oracle", "kafka", "docker", "kubernetes", "angular", "javascript",
+]
+DOMAINS = [
+    "core banking", "payment gateway", "mobile banking", "loan origination", "e-commerce",
+    "insurance claim", "hr system", "data warehouse", "government portal", "telco billing",
+]
+CLIENTS = ["Bank Mandiri", "BRI", "BNI", "Telkomsel", "Pertamina", "BCA", "Astra", "Kemenkeu"]
+PROJECT_ROLES = ["Developer", "Backend Developer", "Tech Lead", "Analyst", "Tester"]
+DEGREES = ["S1", "D3", "S2", "SMK"]
+SCHOOLS = ["Polban", "ITB", "UI", "UGM", "ITS", "Telkom University", "Binus", "Unpad"]
+MAJORS = ["Teknik Informatika", "Sistem Informasi", "Teknik Komputer", "Manajemen Informatika"]
+TASKS = ["Development", "Bug fixing", "Code review", "Meeting", "Deployment", "Testing"]
+
+# Bobot Zipf-like (urutan list = urutan popularitas)
+def _zipf_cum_weights(n, s=1.0):
+    return list(itertools.accumulate(1.0 / (i + 1) ** s for i in range(n)))
+
+
+ROLE_WEIGHTS = _zipf_cum_weights(len(ROLES), 0.8)
+TECH_WEIGHTS = _zipf_cum_weights(len(TECHNOLOGIES), 0.9)
+CLIENT_WEIGHTS = _zipf_cum_weights(len(CLIENTS), 0.7)
+TIMESHEET_START = dt.date(2024, 1, 1)
+TIMESHEET_SPAN_DAYS = 730
+# string tanggal disiapkan sekali (timesheet = mayoritas baris → jalur terpanas generator)
+TIMESHEET_DATES = [(TIMESHEET_START + dt.timedelta(days=d)).isoformat() for d in range(TIMESHEET_SPAN_DAYS)]
+
+
+def _weighted_sample(rng, population, cum_weights, k):
+    """k elemen unik, elemen populer lebih sering terpilih."""
+    picked = dict.fromkeys(rng.choices(population, cum_weights=cum_weights, k=k * 2))
+    return list(picked)[:k] or [population[0]]
+
+
+def generate_employee(rng: random.Random, emp_no: int, ts_days: int = 20):
+    """Generate satu employee → dict {table: [rows]} (urutan kolom = TABLE_COLUMNS)."""
+    emp_id = f"E{emp_no:07d}"
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    techs = _weighted_sample(rng, TECHNOLOGIES, TECH_WEIGHTS, rng.randint(1, 5))
+    role = rng.choices(ROLES, cum_weights=ROLE_WEIGHTS)[0]
+
+    roles = [(emp_id, name, role, rng.choice(LEVELS), ", ".join(techs))]
+
+    projects = []
+    for _ in range(rng.randint(0, 6)):
+        domain = rng.choice(DOMAINS)
+        client = rng.choices(CLIENTS, cum_weights=CLIENT_WEIGHTS)[0]
+        months = rng.randint(1, 36)
+        durasi = f"{months // 12} years" if months >= 12 and rng.random() < 0.3 else f"{months} months"
+        projects.append((
+            emp_id, name, f"{domain.title()} {client}",
+            f"Pengembangan {domain} menggunakan {', '.join(rng.sample(techs, 1))}",
+            client, rng.choice(PROJECT_ROLES), durasi,
+        ))
+
+    education = [(
+        emp_id, rng.choice(DEGREES), rng.choice(SCHOOLS), rng.choice(MAJORS),
+        str(rng.randint(2000, 2023)),
+    )]
+
+    timesheet = []
+    # client timesheet kebanyakan dari project employee itu sendiri
+    own_clients = [p[4] for p in projects] or CLIENTS
+    for _ in range(rng.randint(0, ts_days)):
+        client = rng.choice(own_clients) if rng.random() < 0.8 else rng.choice(CLIENTS)
+        timesheet.append((emp_id, name, client, rng.choice(TASKS), rng.choice(TIMESHEET_DATES)))
+
+    return {
+        "autobot_dataset_talent_profile_role_tech": roles,
+        "autobot_dataset_talent_profile_project_experiences": projects,
+        "autobot_dataset_talent_profile_education": education,
+        "autobot_dataset_talent_timesheet": timesheet,
+    }
+
+
+def _is_sqlite(conn) -> bool:
+    return isinstance(conn, sqlite3.Connection)
+
+
+def create_tables(conn):
+    if _is_sqlite(conn):
+        for table, ddl in TABLE_DDL.items():
+            conn.execute(ddl.replace("public.", ""))
+            # hydrate halaman / resolve nama memfilter per employee_id
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_employee_id ON {table} (employee_id)")
+        conn.commit()
+        return
+    with conn.cursor() as cur:
+        for ddl in TABLE_DDL.values():
+            cur.execute(ddl)
+    conn.commit()
+
+
+def truncate_tables(conn):
+    if _is_sqlite(conn):
+        for table in TABLE_DDL:
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+        return
+    with conn.cursor() as cur:
+        for table in TABLE_DDL:
+            cur.execute(f"TRUNCATE public.{table}")
+    conn.commit()
+
+
+def _copy_rows(cur, table, rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cols = ", ".join(TABLE_COLUMNS[table])
+    cur.copy_expert(f"COPY public.{table} ({cols}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def _insert_rows(cur, table, rows):
+    cols = TABLE_COLUMNS[table]
+    cur.executemany(f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})", rows)
+
+
+def seed_dataset(conn, employees: int, seed: int = 42, batch_size: int = 5000, timesheet_days: int = 20):
+    """Isi keempat tabel dengan `employees` employee sintetis via COPY / executemany (per batch)."""
+    rng = random.Random(seed)
+    create_tables(conn)
+    sqlite = _is_sqlite(conn)
+    load_rows = _insert_rows if sqlite else _copy_rows
+    counts = {t: 0 for t in TABLE_DDL}
+    t0 = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        for batch_start in range(0, employees, batch_size):
+            batch = {t: [] for t in TABLE_DDL}
+            for emp_no in range(batch_start, min(batch_start + batch_size, employees)):
+                for table, rows in generate_employee(rng, emp_no, timesheet_days).items():
+                    batch[table].extend(rows)
+            for table, rows in batch.items():
+                if rows:
+                    load_rows(cur, table, rows)
+                    counts[table] += len(rows)
+            conn.commit()
+            elapsed = time.perf_counter() - t0
+            loaded = min(batch_start + batch_size, employees)
+            logger.info(
+                f"[seed] {loaded}/{employees} employees loaded "
+                f"({sum(counts.values()) / elapsed:,.0f} rows/s, {elapsed:.0f}s)"
+            )
+        for table in TABLE_DDL:
+            cur.execute(f"ANALYZE {table}" if sqlite else f"ANALYZE public.{table}")
+    finally:
+        cur.close()
+    conn.commit()
+    return counts
@@ -1,12 +1,19 @@
 import os
+import asyncio
 import logging
 from dotenv import load_dotenv
-from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes
 from telegram.error import InvalidToken
-from src.intent_parser import call_ollama_intent
-from src.query_executor import run_all_queries
+from src.intent_parser import call_ollama_intent_async
+from src.query_executor import run_refined_async, run_all_queries_async, run_page_async
+from src.result_store import CursorError, CursorExpired
+from src.tracing import start_trace
+from src.profiling import SearchProfile
+from src.admission import admission, Rejected
+from src.circuit_breaker import CircuitOpen
 from src.formatter import format_bucketed_sentences
+from src.metrics import SEARCHES_SUPERSEDED_TOTAL
 from src.config import logger
 
 # Load environment variables from .env file explicitly
@@ -39,6 +46,36 @@ print(f"Using WEBHOOK_URL: {WEBHOOK_URL}")
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 bot_logger = logging.getLogger(__name__)
 
+# User id Telegram yang boleh memakai /profile (comma separated)
+TELEGRAM_ADMIN_IDS = {s.strip() for s in os.getenv("TELEGRAM_ADMIN_IDS", "").split(",") if s.strip()}
+
+# Pesan beruntun dalam jendela ini → hanya yang terakhir dicari
+TELEGRAM_DEBOUNCE_S = float(os.getenv("TELEGRAM_DEBOUNCE_S", "0.8"))
+
+# chat_id → (generation, task) search terakhir per chat.
+# Query baru meng-cancel task lama: sleep debounce, call LLM, dan statement
+# di Postgres (lewat run_cancellable) ikut dibatalkan.
+_latest_searches = {}
+
+
+def _supersede(chat_id) -> int:
+    generation, task = _latest_searches.get(chat_id, (0, None))
+    if task is not None and not task.done():
+        task.cancel()
+    _latest_searches[chat_id] = (generation + 1, asyncio.current_task())
+    return generation + 1
+
+
+def _is_latest(chat_id, generation) -> bool:
+    return _latest_searches.get(chat_id, (0, None))[0] == generation
+
+
+def _more_markup(cursor):
+    """Tombol "More" → callback_data "more:<cursor>" (lihat more_callback)."""
+    if not cursor:
+        return None
+    return InlineKeyboardMarkup([[InlineKeyboardButton("More ▶", callback_data=f"more:{cursor}")]])
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send a message when the command /start is issued."""
     user = update.effective_user
@@ -69,17 +106,38 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user_query = update.message.text
     user = update.effective_user
     session_id = f"tg_{user.id}"
+    chat_id = update.effective_chat.id
     
     bot_logger.info(f"[{session_id}] User {user.first_name} ({user.id}) query: {user_query}")
-    await update.message.reply_text("🔍 Searching for candidates... Please wait.")
-    
+
+    # Rate limit dicek dulu → pesan yang ditolak tidak membatalkan search yang sedang jalan
     try:
-        # Parse the intent
-        intent, prompt = call_ollama_intent(user_query)
-        bot_logger.info(f"[{session_id}] Parsed intent: {intent}")
-        
-        # Run the queries
-        employees, raw, sql_time = run_all_queries(intent, session_id)
+        admission.check_rate(session_id)
+    except Rejected as e:
+        await update.message.reply_text(f"⏳ {e.message}")
+        return
+
+    # Query baru dari chat yang sama → batalkan search sebelumnya
+    generation = _supersede(chat_id)
+    stage = "debounce"
+    ticket = None
+    try:
+        await asyncio.sleep(TELEGRAM_DEBOUNCE_S)
+        stage = "queued"
+        await update.message.reply_text("🔍 Searching for candidates... Please wait.")
+        ticket = await admission.acquire_async(session_id, rate_limited=False)
+        stage = "search"
+        with start_trace("telegram search", session_id=session_id):
+            # Parse the intent
+            intent, prompt = await call_ollama_intent_async(user_query)
+            bot_logger.info(f"[{session_id}] Parsed intent: {intent}")
+            
+            # Run the queries (async → chat lain tetap dilayani selama search berjalan)
+            # Pesan lanjutan ("now with core banking") → dipersempit dari hasil sebelumnya bila bisa
+            intent, employees, raw, sql_time = await run_refined_async(user_query, intent, session_id)
+        if not _is_latest(chat_id, generation):
+            return  # hanya query terbaru yang dibalas
+        omitted = raw.get("omitted", [])
         
         # Format the response
         if not employees:
@@ -97,16 +155,94 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         response += format_bucketed_sentences(primary_tuples)
         
         # Add timing info
-        response += f"\n\n⏱️ Search completed in {sql_time:.2f}s"
+        if raw.get("refinement") == "memory":
+            response += "\n\n♻️ Refined from your previous results"
+        else:
+            response += f"\n\n⏱️ Search completed in {sql_time:.2f}s"
+        if omitted:
+            response += f"\n⚠️ Partial result: {', '.join(omitted)} skipped (search took too long)"
+        if raw.get("stale"):
+            response += f"\n⚠️ Database unavailable: cached result from {raw['stale_age_s']:.0f}s ago"
         
-        await update.message.reply_text(response)
+        await update.message.reply_text(response, reply_markup=_more_markup(raw.get("next_cursor")))
         
+    except (Rejected, CircuitOpen) as e:
+        await update.message.reply_text(f"⏳ {e.message}")
+    except asyncio.CancelledError:
+        if _is_latest(chat_id, generation):
+            raise  # bukan karena query baru (mis. bot shutdown)
+        SEARCHES_SUPERSEDED_TOTAL.inc(stage=stage)
+        bot_logger.info(f"[{session_id}] search superseded by a newer query during {stage}")
     except Exception as e:
         bot_logger.error(f"[{session_id}] Error processing query: {str(e)}", exc_info=True)
         await update.message.reply_text(
             "Sorry, I encountered an error while processing your request. "
             "Please try again or contact support."
         )
+    finally:
+        if ticket is not None:
+            ticket.release()
+        if _is_latest(chat_id, generation):
+            del _latest_searches[chat_id]
+
+async def more_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Tombol "More": halaman berikutnya dari ranking yang tersimpan (tanpa search ulang)."""
+    query = update.callback_query
+    await query.answer()
+    cursor = query.data.split(":", 1)[1]
+    session_id = f"tg_{query.from_user.id}"
+    
+    ticket = None
+    try:
+        ticket = await admission.acquire_async(session_id)
+        employees, page, sql_time = await run_page_async(cursor, session_id)
+        # tombol di pesan lama dibuang → tidak bisa diklik dua kali
+        await query.edit_message_reply_markup(reply_markup=None)
+        if not employees:
+            await query.message.reply_text("No more candidates for this search.")
+            return
+        first = page["offset"] + 1
+        response = f"📄 Candidates {first}–{first + len(employees) - 1} of {page['total_ranked']}:\n\n"
+        response += format_bucketed_sentences([(e, e.get("score", 0)) for e in employees])
+        await query.message.reply_text(response, reply_markup=_more_markup(page["next_cursor"]))
+    except (Rejected, CircuitOpen) as e:
+        await query.message.reply_text(f"⏳ {e.message}")
+    except CursorExpired:
+        await query.edit_message_reply_markup(reply_markup=None)
+        await query.message.reply_text("This search has expired, please send your query again.")
+    except CursorError:
+        await query.message.reply_text("Sorry, I couldn't load more candidates for this search.")
+    except Exception as e:
+        bot_logger.error(f"[{session_id}] Error loading next page: {str(e)}", exc_info=True)
+        await query.message.reply_text("Sorry, I encountered an error while loading more candidates.")
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """/profile <query> (admin) → jalankan satu search di bawah cProfile + tracemalloc."""
+    user = update.effective_user
+    if str(user.id) not in TELEGRAM_ADMIN_IDS:
+        await update.message.reply_text("This command is only available to admins.")
+        return
+    user_query = " ".join(context.args or []).strip()
+    if not user_query:
+        await update.message.reply_text("Usage: /profile <query>")
+        return
+
+    session_id = f"tg_{user.id}_profile"
+    bot_logger.info(f"[{session_id}] profiling query: {user_query}")
+    try:
+        with SearchProfile(session_id, user_query) as prof:
+            intent, prompt = await call_ollama_intent_async(user_query)
+            employees, raw, sql_time = await run_all_queries_async(intent, session_id)
+            lim = intent.get("limit", {}) or {}
+            primary = employees[:int(lim.get("primary", 3))]
+            format_bucketed_sentences([(e, e.get("score", 0)) for e in primary])
+        await update.message.reply_text(f"Found {len(primary)} candidates.\n\n{prof.summary_text()}")
+    except Exception as e:
+        bot_logger.error(f"[{session_id}] Error profiling query: {str(e)}", exc_info=True)
+        await update.message.reply_text("Profiling failed, check the logs for details.")
 
 def main() -> None:
     """Start the bot."""
@@ -129,11 +265,14 @@ def main() -> None:
 
     try:
         # Create the Application and pass it your bot's token
-        application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+        # concurrent_updates: pesan baru diproses selagi search lama masih jalan (untuk supersede)
+        application = Application.builder().token(TELEGRAM_BOT_TOKEN).concurrent_updates(True).build()
 
         # Register handlers
         application.add_handler(CommandHandler("start", start))
         application.add_handler(CommandHandler("help", help_command))
+        application.add_handler(CommandHandler("profile", profile_command))
+        application.add_handler(CallbackQueryHandler(more_callback, pattern=r"^more:"))
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
 
         # Run the bot
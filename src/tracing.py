@@ -0,0 +1,209 @@
+import json
+import os
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+import urllib.request
+from src.config import logger, TRACING_ENABLED, TRACE_FILE, TRACE_COLLECTOR_URL
+from src.logger_helper import ensure_logs_dir
+
+# =============================================
+# Request tracing (nested spans)
+# - start_trace() membuka root span per request; span() di dalam pipeline
+#   otomatis jadi child lewat contextvar (ikut ke asyncio task & run_sync)
+# - Tanpa root span aktif → span() mengembalikan _NOOP (hampir tanpa overhead)
+# - Export format OTLP/JSON (OpenTelemetry) → TRACE_FILE dan/atau
+#   TRACE_COLLECTOR_URL (mis. http://localhost:4318/v1/traces, lihat trace_collector.py)
+# =============================================
+
+SERVICE_NAME = "talent-search"
+
+_current = contextvars.ContextVar("current_span", default=None)
+_file_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent", "attributes", "children",
+                 "start_ns", "end_ns", "_token")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes or {})
+        self.children = []
+        self.start_ns = 0
+        self.end_ns = 0
+        self._token = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current.reset(self._token)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_tree(self, origin_ns=None) -> dict:
+        """Span tree untuk response /search (trace=true)."""
+        origin_ns = self.start_ns if origin_ns is None else origin_ns
+        return {
+            "name": self.name,
+            "start_ms": round((self.start_ns - origin_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "children": [c.to_tree(origin_ns) for c in self.children],
+        }
+
+    def walk(self):
+        yield self
+        for c in self.children:
+            yield from c.walk()
+
+
+class _NoopSpan:
+    """Dipakai kalau tidak ada trace aktif."""
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, **attributes):
+    """Child span dari span aktif; tanpa trace aktif → no-op."""
+    parent = _current.get()
+    if parent is None:
+        return _NOOP
+    return Span(name, parent, attributes)
+
+
+def traced(name):
+    """Decorator: fungsi (sync / async) dibungkus span(name)."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _Trace:
+    """Root span; export saat selesai kalau TRACING_ENABLED."""
+
+    def __init__(self, name, force, attributes):
+        self.enabled = TRACING_ENABLED or force
+        self.root = Span(name, None, attributes) if self.enabled else None
+
+    def __enter__(self):
+        if self.root is None:
+            return _NOOP
+        return self.root.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.root is None:
+            return False
+        self.root.__exit__(exc_type, exc, tb)
+        if TRACING_ENABLED:
+            export(self.root)
+        return False
+
+
+def start_trace(name, force=False, **attributes):
+    """
+    Root span per request. force=True → trace tetap dibuat walau TRACING_ENABLED=0
+    (dipakai /search dengan "trace": true), tapi hanya di-export kalau tracing aktif.
+    """
+    return _Trace(name, force, attributes)
+
+
+# =============================================
+# OTLP/JSON export
+# =============================================
+
+def _otlp_value(v):
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def to_otlp(root: Span) -> dict:
+    spans = []
+    for s in root.walk():
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+        }
+        if s.parent is not None:
+            item["parentSpanId"] = s.parent.span_id
+        if "error" in s.attributes:
+            item["status"] = {"code": 2, "message": str(s.attributes["error"])}
+        spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+def _post_collector(body: bytes):
+    try:
+        req = urllib.request.Request(
+            TRACE_COLLECTOR_URL, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        urllib.request.urlopen(req, timeout=5).close()
+    except Exception as e:
+        logger.error("Trace export to collector failed: %s", e)
+
+
+def export(root: Span):
+    payload = json.dumps(to_otlp(root), ensure_ascii=False, default=str)
+    if TRACE_FILE:
+        with _file_lock:
+            ensure_logs_dir()
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(payload + "\n")
+    if TRACE_COLLECTOR_URL:
+        # jangan blok request/event loop menunggu collector
+        threading.Thread(target=_post_collector, args=(payload.encode("utf-8"),), daemon=True).start()
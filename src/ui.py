@@ -1,41 +1,221 @@
 import uuid
 import time
+import queue
+import threading
 import datetime as dt
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 
 from src.config import logger
-from src.intent_parser import call_ollama_intent
-from src.query_executor import run_all_queries
+from src.intent_parser import call_ollama_intent_async
+from src.query_executor import run_refined
+from src.async_runtime import run_sync
+from src.cancellation import CancelToken, SearchCancelled, run_cancellable
 from src.formatter import format_employee_summary, format_bucketed_sentences
 from src.sql_builder import build_clauses, ROLE_SQL, PROJECT_SQL, EDU_SQL, TIMESHEET_SQL
 from src.logger_helper import append_sql_log
-
-# ReportLab untuk export PDF
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from src.profiling import SearchProfile
+from src.export import EXPORT_MODES, iter_export_rows, write_csv
+from src.pdf_report import submit_pdf
 
 # =============================================
 # UI Application
 # =============================================
 
+class VirtualTable:
+    """
+    Treeview tervirtualisasi: data di list Python, item Treeview hanya sebanyak
+    baris yang terlihat. Scroll / resize cukup mengganti values item tsb →
+    biaya render tidak tergantung jumlah kandidat (ratusan / ribuan).
+    on_select(index) dipanggil dengan index ke list data.
+    """
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, parent, columns, height=12, on_select=None):
+        self.on_select = on_select
+        self.rows = []
+        self.offset = 0
+        self.selected = None
+        self.visible = height
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[c[0] for c in columns], show="headings",
+                                 height=height, selectmode="browse")
+        for name, title, width, anchor in columns:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, anchor=anchor)
+        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
+
+        self.vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.vsb.pack(side=tk.LEFT, fill="y")
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll(self.visible))
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # --- data ---
+    def set_rows(self, rows):
+        self.rows = list(rows)
+        self.offset = 0
+        self.selected = None
+        self._render()
+
+    def append(self, rows):
+        """Baris baru di akhir (render bertahap); window hanya di-render ulang kalau ikut terlihat."""
+        start = len(self.rows)
+        self.rows.extend(rows)
+        if start < self.offset + self.visible:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def __len__(self):
+        return len(self.rows)
+
+    # --- scrolling ---
+    def scroll(self, delta):
+        self._scroll_to(self.offset + delta)
+        return "break"
+
+    def _scroll_to(self, offset):
+        offset = max(0, min(int(offset), len(self.rows) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(float(args[0]) * len(self.rows))
+        elif action == "scroll":
+            step = int(args[0]) * (self.visible if args[1] == "pages" else 1)
+            self.scroll(step)
+
+    def _on_resize(self, event):
+        # baris header ≈ satu baris data
+        visible = max(1, event.height // self.ROW_HEIGHT - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._scroll_to(self.offset)
+            self._render()
+
+    # --- selection ---
+    def _on_tree_select(self, event):
+        sel = self.tree.selection()
+        if not sel:
+            return
+        index = self.offset + self.tree.index(sel[0])
+        if index == self.selected or index >= len(self.rows):
+            return  # selection_set dari _render sendiri
+        self.selected = index
+        if self.on_select:
+            self.on_select(index)
+
+    def _move_selection(self, delta):
+        if not self.rows:
+            return "break"
+        index = 0 if self.selected is None else max(0, min(len(self.rows) - 1, self.selected + delta))
+        if index < self.offset:
+            self._scroll_to(index)
+        elif index >= self.offset + self.visible:
+            self._scroll_to(index - self.visible + 1)
+        self.selected = index
+        self._render()
+        if self.on_select:
+            self.on_select(index)
+        return "break"
+
+    # --- render ---
+    def _render(self):
+        window = self.rows[self.offset:self.offset + self.visible]
+        items = self.tree.get_children()
+        for iid in items[len(window):]:
+            self.tree.delete(iid)
+        for _ in range(len(items), len(window)):
+            self.tree.insert("", tk.END)
+        items = self.tree.get_children()
+        for iid, values in zip(items, window):
+            self.tree.item(iid, values=values)
+
+        if self.selected is not None and self.offset <= self.selected < self.offset + len(window):
+            self.tree.selection_set(items[self.selected - self.offset])
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.visible:
+            self.vsb.set(0.0, 1.0)
+        else:
+            self.vsb.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+
+
+class SearchJob:
+    """Input satu search (dibaca dari widget di main thread) + CancelToken-nya."""
+
+    def __init__(self, query, sid, start="", end="", employee_summary=True, profile=False):
+        self.query = query
+        self.sid = sid
+        self.start = start
+        self.end = end
+        self.employee_summary = employee_summary
+        self.profile = profile
+        self.token = CancelToken()
+
+
+class ExportJob:
+    """Export CSV di worker thread; token dipakai tombol Cancel yang sama dengan search."""
+
+    def __init__(self, path, mode, intent, sid):
+        self.path = path
+        self.mode = mode
+        self.intent = intent
+        self.sid = sid
+        self.token = CancelToken()
+
+
 class App:
+    POLL_MS = 30
+    EVENTS_PER_TICK = 500  # batas event per tick → window tetap responsif
+    # Summary lengkap di chat hanya untuk N kandidat pertama; sisanya satu baris,
+    # summary lengkap dibuat saat baris dipilih di tab Results
+    INLINE_SUMMARY_MAX = 20
+
     def __init__(self, root):
         self.root = root
         root.title("Talent Search Chatbot v15 (Export PDF)")  # PRD v15
         root.geometry("1180x760")
 
         self.employee_summary_var = tk.BooleanVar(value=True)
+        self.profile_var = tk.BooleanVar(value=False)
         self.start_date_var = tk.StringVar(value="")
         self.end_date_var = tk.StringVar(value="")
+        self.csv_mode_var = tk.StringVar(value=EXPORT_MODES[0])
 
         self.last_raw = None
         self.last_employees = []
-        self.session_id = None
+        # satu session per jendela → pesan lanjutan bisa mempersempit search sebelumnya
+        self.session_id = str(uuid.uuid4())[:8]
         self.last_intent = None
+        self.last_query = ""
+        self._summary_cache = {}
+
+        self._job = None  # search yang sedang jalan (SearchJob)
+        self._events = queue.Queue()
+        self.status_var = tk.StringVar(value="Ready")
 
         self._build_ui()
+        self.root.after(self.POLL_MS, self._drain_events)
         self.entry.insert(0, "recommend me Technical Leader  java  python core banking, experience > 5 years")
 
     def _build_ui(self):
@@ -53,6 +233,7 @@ class App:
         ttk.Label(top, text="End").pack(side=tk.LEFT)
         ttk.Entry(top, width=12, textvariable=self.end_date_var).pack(side=tk.LEFT, padx=(4, 12))
         ttk.Checkbutton(top, text="Employee Summary", variable=self.employee_summary_var).pack(side=tk.LEFT)
+        ttk.Checkbutton(top, text="Profile next search", variable=self.profile_var).pack(side=tk.LEFT, padx=(12, 0))
 
         self.chat_box = scrolledtext.ScrolledText(chat, wrap=tk.WORD, width=120, height=28)
         self.chat_box.pack(padx=10, pady=6, fill="both", expand=True)
@@ -61,7 +242,16 @@ class App:
         bottom.pack(fill="x", padx=10, pady=8)
         self.entry = tk.Entry(bottom)
         self.entry.pack(side=tk.LEFT, fill="x", expand=True)
-        ttk.Button(bottom, text="Send", command=self.on_send).pack(side=tk.LEFT, padx=8)
+        self.send_btn = ttk.Button(bottom, text="Send", command=self.on_send)
+        self.send_btn.pack(side=tk.LEFT, padx=8)
+        self.cancel_btn = ttk.Button(bottom, text="Cancel", command=self.on_cancel, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT)
+
+        status = ttk.Frame(chat)
+        status.pack(fill="x", padx=10, pady=(0, 8))
+        self.progress = ttk.Progressbar(status, length=220)
+        self.progress.pack(side=tk.LEFT)
+        ttk.Label(status, textvariable=self.status_var).pack(side=tk.LEFT, padx=8)
 
         # SQL Logs tab
         logs = ttk.Frame(nb)
@@ -77,18 +267,12 @@ class App:
         upper = ttk.Frame(results)
         upper.pack(fill="both", expand=True, padx=10, pady=(10, 4))
 
-        self.tree = ttk.Treeview(upper, columns=("employee_id", "name", "score"), show="headings", height=12)
-        self.tree.heading("employee_id", text="Employee ID")
-        self.tree.heading("name", text="Name")
-        self.tree.heading("score", text="Score")
-        self.tree.column("employee_id", width=120, anchor=tk.W)
-        self.tree.column("name", width=420, anchor=tk.W)
-        self.tree.column("score", width=80, anchor=tk.E)
-        self.tree.pack(side=tk.LEFT, fill="both", expand=True)
-
-        vsb = ttk.Scrollbar(upper, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
-        vsb.pack(side=tk.LEFT, fill="y")
+        self.table = VirtualTable(upper, [
+            ("employee_id", "Employee ID", 120, tk.W),
+            ("name", "Name", 420, tk.W),
+            ("score", "Score", 80, tk.E),
+        ], height=12, on_select=self.on_row_select)
+        self.table.pack(side=tk.LEFT, fill="both", expand=True)
 
         right = ttk.Frame(upper)
         right.pack(side=tk.LEFT, fill="both", expand=True, padx=(10, 0))
@@ -101,20 +285,16 @@ class App:
         self.summary_box = scrolledtext.ScrolledText(right, wrap=tk.WORD, height=12)
         self.summary_box.pack(fill="both", expand=True)
 
-        self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
-
         # Buttons bar
         btnbar = ttk.Frame(results)
         btnbar.pack(fill="x", padx=10, pady=6)
         ttk.Button(btnbar, text="Export CSV", command=self.export_csv).pack(side=tk.RIGHT, padx=4)
+        ttk.Combobox(btnbar, textvariable=self.csv_mode_var, values=EXPORT_MODES, state="readonly", width=9).pack(side=tk.RIGHT)
+        ttk.Label(btnbar, text="CSV layout:").pack(side=tk.RIGHT, padx=(0, 4))
         ttk.Button(btnbar, text="Export PDF", command=self.export_pdf).pack(side=tk.RIGHT)
 
-    def on_tree_select(self, event):
-        sel = self.tree.selection()
-        if not sel:
-            return
-        idx = str(self.tree.item(sel[0], "values")[0])  # employee_id
-        emp = next((e for e in self.last_employees if str(e.get("employee_id")) == idx), None)
+    def on_row_select(self, index):
+        emp = self.last_employees[index] if index < len(self.last_employees) else None
 
         self.breakdown_box.delete("1.0", tk.END)
         self.summary_box.delete("1.0", tk.END)
@@ -129,45 +309,172 @@ class App:
         else:
             self.breakdown_box.insert(tk.END, "(no breakdown)")
 
-        # Summary preview
+        # Summary preview (diformat saat dipilih, di-cache per search)
         try:
-            self.summary_box.insert(tk.END, format_employee_summary(emp, self.last_intent))
+            key = emp.get("employee_id")
+            if key not in self._summary_cache:
+                self._summary_cache[key] = format_employee_summary(emp, self.last_intent)
+            self.summary_box.insert(tk.END, self._summary_cache[key])
         except Exception as e:
             self.summary_box.insert(tk.END, f"(cannot render summary: {e})")
 
+    # =============================================
+    # Search di worker thread
+    # - Tk hanya disentuh dari main thread: worker mengirim event ke self._events,
+    #   _drain_events (root.after) yang menulis ke chat_box / tree
+    # - Kandidat dikirim satu per satu begitu selesai diformat → tampil bertahap;
+    #   kandidat dalam satu tick digabung jadi satu insert ke chat_box / table
+    # - Cancel → CancelToken: call LLM dan statement di Postgres ikut dibatalkan
+    # =============================================
     def on_send(self):
         user_query = self.entry.get().strip()
-        if not user_query:
+        if not user_query or self._job is not None:
             return
         self.entry.delete(0, tk.END)
 
-        self.session_id = str(uuid.uuid4())[:8]
         sid = self.session_id
         logger.info(f"[{sid}] User query: {user_query}")
         self.chat_box.insert(tk.END, f"You: {user_query}\n")
 
+        job = SearchJob(
+            user_query, sid,
+            start=self.start_date_var.get().strip(),
+            end=self.end_date_var.get().strip(),
+            employee_summary=self.employee_summary_var.get(),
+            profile=self.profile_var.get(),
+        )
+        if job.profile:
+            # sekali jalan, lalu checkbox dimatikan lagi
+            self.profile_var.set(False)
+
+        self._job = job
+        self._populate_results_table([])
+        self._set_busy(True, "Parsing intent...")
+        threading.Thread(target=self._search_worker, args=(job,), daemon=True).start()
+
+    def on_cancel(self):
+        if self._job is not None:
+            self._job.token.cancel()
+            self.status_var.set("Cancelling...")
+
+    def _set_busy(self, busy, status=""):
+        self.status_var.set(status)
+        self.send_btn.configure(state=tk.DISABLED if busy else tk.NORMAL)
+        self.cancel_btn.configure(state=tk.NORMAL if busy else tk.DISABLED)
+        if busy:
+            self.progress.configure(mode="indeterminate", value=0)
+            self.progress.start(12)
+        else:
+            self.progress.stop()
+            self.progress.configure(mode="determinate", value=0)
+
+    def _post(self, job, kind, payload=None):
+        self._events.put((job, kind, payload))
+
+    def _drain_events(self):
+        texts, rows = [], []
+        try:
+            for _ in range(self.EVENTS_PER_TICK):
+                job, kind, payload = self._events.get_nowait()
+                if job is not self._job:
+                    continue
+                if kind == "candidate":
+                    emp, text = payload
+                    texts.append(text)
+                    rows.append(self._row_values(emp))
+                    continue
+                # urutan dijaga: kandidat yang terkumpul ditulis dulu
+                self._flush_candidates(texts, rows)
+                texts, rows = [], []
+                self._handle_event(job, kind, payload)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logger.exception("UI event handling failed: %s", e)
+        finally:
+            try:
+                self._flush_candidates(texts, rows)
+            finally:
+                self.root.after(self.POLL_MS, self._drain_events)
+
+    def _flush_candidates(self, texts, rows):
+        if not rows:
+            return
+        self.chat_box.insert(tk.END, "".join(texts))
+        self.chat_box.see(tk.END)
+        self.table.append(rows)
+        self.progress.configure(value=len(self.table))
+        self.status_var.set(f"Rendering {len(self.table)}/{len(self.last_employees)}...")
+
+    def _handle_event(self, job, kind, payload):
+        if kind == "status":
+            self.status_var.set(payload)
+        elif kind == "text":
+            self.chat_box.insert(tk.END, payload)
+            self.chat_box.see(tk.END)
+        elif kind == "results":
+            intent, employees, raw = payload
+            self.last_intent = intent
+            self.last_query = job.query
+            self.last_raw = raw
+            self.last_employees = employees
+            self._summary_cache = {}
+            self.progress.stop()
+            self.progress.configure(mode="determinate", maximum=max(1, len(employees)), value=0)
+        elif kind == "exported":
+            path, count = payload
+            messagebox.showinfo("Export", f"CSV exported successfully ({count} rows).\n{path}")
+        elif kind == "sql_log":
+            self.sql_log_box.insert(tk.END, payload)
+        elif kind in ("done", "cancelled", "error"):
+            if kind == "cancelled":
+                what = "export" if isinstance(job, ExportJob) else "search"
+                self.chat_box.insert(tk.END, f"({what} cancelled)\n\n")
+            elif kind == "error":
+                self.chat_box.insert(tk.END, f"Error: {payload}\n\n")
+            self.chat_box.see(tk.END)
+            self._job = None
+            self._set_busy(False, {"done": "Ready", "cancelled": "Cancelled", "error": "Failed"}[kind])
+
+    def _search_worker(self, job):
+        try:
+            if job.profile:
+                with SearchProfile(job.sid, job.query) as prof:
+                    self._run_search(job)
+                self._post(job, "text", prof.summary_text() + "\n\n")
+            else:
+                self._run_search(job)
+            self._post(job, "done")
+        except SearchCancelled:
+            logger.info(f"[{job.sid}] search cancelled")
+            self._post(job, "cancelled")
+        except Exception as e:
+            logger.exception("[%s] search failed: %s", job.sid, e)
+            self._post(job, "error", str(e))
+
+    def _run_search(self, job):
+        """Jalan di worker thread → hanya boleh _post(), tidak menyentuh widget Tk."""
+        user_query, sid = job.query, job.sid
+
         # ===== Parse Intent =====
         t0 = time.perf_counter()
-        intent, prompt = call_ollama_intent(user_query)
-        self.last_intent = intent
+        intent, prompt = run_sync(run_cancellable(call_ollama_intent_async(user_query), job.token))
+        job.token.raise_if_cancelled()
 
-        start = self.start_date_var.get().strip()
-        end = self.end_date_var.get().strip()
-        if start or end:
+        if job.start or job.end:
             intent.setdefault("timesheet", {})
-            if start:
-                intent["timesheet"]["start_date"] = start
-            if end:
-                intent["timesheet"]["end_date"] = end
+            if job.start:
+                intent["timesheet"]["start_date"] = job.start
+            if job.end:
+                intent["timesheet"]["end_date"] = job.end
         t1 = time.perf_counter()
 
         # ===== Run Queries =====
-        employees, raw, sql_time = run_all_queries(intent, sid)
+        # Pesan lanjutan / narrowing → dihitung dari hasil search sebelumnya (tanpa SQL)
+        self._post(job, "status", "Searching...")
+        intent, employees, raw, sql_time = run_refined(user_query, intent, sid, job.token)
         t2 = time.perf_counter()
 
-        self.last_raw = raw
-        self.last_employees = employees
-
         # ===== Primary/Backup =====
         lim = intent.get("limit", {}) or {}
         n_primary = int(lim.get("primary", 3))
@@ -175,9 +482,6 @@ class App:
         primary = employees[:n_primary]
         backup = employees[n_primary:n_primary + n_backup]
 
-        primary_tuples = [(e, e.get("score", 0)) for e in primary]
-        backup_tuples = [(e, e.get("score", 0)) for e in backup]
-
         parse_time = t1 - t0
         merge_time = t2 - t1
         total_time = t2 - t0
@@ -195,28 +499,37 @@ class App:
             nice = intent.get("skills", {}).get("nice_to_have", [])
             prompt_top = f"Prompt: role={intent.get('role','')}, Must Have={must}, Nice To Have={nice}"
 
-        self.chat_box.insert(tk.END, prompt_top + "\n")
-        self.chat_box.insert(
-            tk.END,
+        self._post(job, "results", (intent, employees, raw))
+        self._post(job, "text", (
+            prompt_top + "\n"
             f"Processing Time: {total_time:.2f}s (LLM {parse_time:.2f}s, SQL+Merge+Score {merge_time:.2f}s)\n\n"
-        )
-
-        if self.employee_summary_var.get():
-            self.chat_box.insert(tk.END, f"--- Recommended Talents ({len(primary)}) ---\n\n")
-            for emp in primary:
-                self.chat_box.insert(tk.END, format_employee_summary(emp, intent) + "\n")
-            self.chat_box.insert(tk.END, f"--- Backup Talents ({len(backup)}) ---\n\n")
-            for emp in backup:
-                self.chat_box.insert(tk.END, format_employee_summary(emp, intent) + "\n")
-        else:
-            self.chat_box.insert(tk.END, f"--- Recommended Talents ({len(primary)}) ---\n")
-            self.chat_box.insert(tk.END, format_bucketed_sentences(primary_tuples) + "\n\n")
-            self.chat_box.insert(tk.END, f"--- Backup Talents ({len(backup)}) ---\n")
-            self.chat_box.insert(tk.END, format_bucketed_sentences(backup_tuples) + "\n\n")
-
-        self._populate_results_table(employees)
+        ))
+        if raw.get("stale"):
+            self._post(job, "text", f"⚠️ Database unavailable: cached result from {raw['stale_age_s']:.0f}s ago\n\n")
+
+        # ===== Render bertahap: satu event per kandidat =====
+        inline_left = self.INLINE_SUMMARY_MAX if job.employee_summary else 0
+        for title, group in (("Recommended Talents", primary), ("Backup Talents", backup)):
+            full = min(len(group), inline_left)
+            inline_left -= full
+            self._post(job, "text", f"--- {title} ({len(group)}) ---\n" + ("\n" if full else ""))
+            for i, emp in enumerate(group):
+                job.token.raise_if_cancelled()
+                if i < full:
+                    text = format_employee_summary(emp, intent) + "\n"
+                else:
+                    text = format_bucketed_sentences([(emp, emp.get("score", 0))]) + "\n"
+                self._post(job, "candidate", (emp, text))
+            if full < len(group):
+                if job.employee_summary:
+                    self._post(job, "text", "(select a row in the Results tab for the full summary)\n")
+                self._post(job, "text", "\n")
 
         # ===== SQL Logs =====
+        if raw.get("refinement") in ("memory", "stale"):
+            note = "refined in memory" if raw["refinement"] == "memory" else "database unavailable, cached result"
+            self._post(job, "sql_log", f"[{dt.datetime.now().isoformat()}] {user_query}\n({note}, no SQL)\n\n")
+            return
         clauses = build_clauses(intent)
         role_clause, skill_clause, role_params, name_clause = clauses["role"]
         proj_clause, proj_params, name_clause2 = clauses["project"]
@@ -235,55 +548,62 @@ class App:
             f"{q_edu}\nparams={edu_params}\n"
             f"{q_ts}\nparams={ts_params}\n\n"
         )
-        self.sql_log_box.insert(tk.END, log_blob)
-        append_sql_log(f"User: {user_query}", [q_role, q_proj, q_edu, q_ts])
+        self._post(job, "sql_log", log_blob)
+        append_sql_log(
+            f"User: {user_query}", [q_role, q_proj, q_edu, q_ts],
+            params=[role_params, proj_params, edu_params, ts_params], session_id=sid,
+        )
+
+    @staticmethod
+    def _row_values(emp):
+        emp_id = emp.get("employee_id")
+        return (emp_id, emp.get("full_name", f"EMP-{emp_id}"), emp.get("score", 0))
 
     def _populate_results_table(self, employees):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for idx, emp in enumerate(employees):
-            emp_id = emp.get("employee_id")
-            name = emp.get("full_name", f"EMP-{emp_id}")
-            score = emp.get("score", 0)
-            self.tree.insert("", tk.END, text=str(idx), values=(emp_id, name, score))
+        self.table.set_rows(self._row_values(emp) for emp in employees)
 
         self.breakdown_box.delete("1.0", tk.END)
         self.summary_box.delete("1.0", tk.END)
 
     def export_csv(self):
-        if not self.last_raw:
+        """Intent terakhir dijalankan ulang di server-side cursor → CSV lengkap (tidak dibatasi limit)."""
+        if not self.last_intent:
             messagebox.showwarning("Export", "No results to export yet.")
             return
+        if self._job is not None:
+            return
+        mode = self.csv_mode_var.get()
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
             filetypes=[("CSV files", "*.csv")],
-            initialfile=f"results_{dt.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            initialfile=f"results_{mode}_{dt.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
         )
         if not file_path:
             return
+        self._job = ExportJob(file_path, mode, self.last_intent, self.session_id)
+        self._set_busy(True, "Exporting...")
+        threading.Thread(target=self._export_worker, args=(self._job,), daemon=True).start()
+
+    def _export_worker(self, job):
+        def progress(stage, count):
+            self._post(job, "status", f"Exporting {stage}: {count} rows...")
+
         try:
-            import csv
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                for name in ("roles", "projects", "education", "timesheet"):
-                    rows = self.last_raw.get(name, [])
-                    writer.writerow([name])
-                    if not rows:
-                        writer.writerow(["(empty)"])
-                        writer.writerow([])
-                        continue
-                    cols = list(rows[0].keys())
-                    writer.writerow(cols)
-                    for r in rows:
-                        writer.writerow([r.get(c) for c in cols])
-                    writer.writerow([])
-            logger.info(f"[{self.session_id}] CSV exported: {file_path}")
-            messagebox.showinfo("Export", "CSV exported successfully.")
+            with open(job.path, "w", newline="", encoding="utf-8") as f:
+                rows = iter_export_rows(job.intent, job.mode, job.sid, progress=progress, cancel_token=job.token)
+                count = write_csv(f, rows)
+            logger.info(f"[{job.sid}] CSV exported: {job.path} ({count} rows)")
+            self._post(job, "exported", (job.path, count))
+            self._post(job, "done")
+        except SearchCancelled:
+            logger.info(f"[{job.sid}] CSV export cancelled")
+            self._post(job, "cancelled")
         except Exception as e:
             logger.exception("CSV export failed: %s", e)
-            messagebox.showerror("Export failed", str(e))
+            self._post(job, "error", f"CSV export failed: {e}")
 
     def export_pdf(self):
+        """PDF dibuat di worker process (src/pdf_report.py); hasilnya dicek lewat root.after."""
         if not self.last_employees:
             messagebox.showwarning("Export", "No results to export yet.")
             return
@@ -295,43 +615,28 @@ class App:
         if not file_path:
             return
         try:
-            styles = getSampleStyleSheet()
-            doc = SimpleDocTemplate(file_path, pagesize=A4)
-            elems = []
-
-            elems.append(Paragraph("<b>Talent Search Report</b>", styles["Title"]))
-            elems.append(Paragraph(f"Generated: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles["Normal"]))
-            elems.append(Spacer(1, 12))
-
-            if self.last_intent:
-                elems.append(Paragraph(f"<b>User Query Summary</b>", styles["Heading2"]))
+            future = submit_pdf(file_path, self.last_query, self.last_intent, self.last_employees)
+        except Exception as e:
+            logger.exception("PDF export failed: %s", e)
+            messagebox.showerror("Export failed", str(e))
+            return
+        self.status_var.set(f"Generating PDF ({len(self.last_employees)} candidates)...")
+        self.root.after(self.POLL_MS * 10, self._poll_pdf, future, file_path)
 
-                if self.last_intent.get("name"):
-                    elems.append(Paragraph(f"Candidate Search for: {self.last_intent['name']}", styles["Normal"]))
-                else:
-                    role = self.last_intent.get("role", "")
-                    must = self.last_intent.get("skills", {}).get("must_have", [])
-                    nice = self.last_intent.get("skills", {}).get("nice_to_have", [])
-                    elems.append(Paragraph(f"Role: {role}", styles["Normal"]))
-                    elems.append(Paragraph(f"Must Have Skills: {', '.join(must)}", styles["Normal"]))
-                    elems.append(Paragraph(f"Nice to Have Skills: {', '.join(nice)}", styles["Normal"]))
-
-                elems.append(Spacer(1, 12))
-
-            elems.append(Paragraph("<b>Candidates</b>", styles["Heading2"]))
-            for i, emp in enumerate(self.last_employees, 1):
-                summary = format_employee_summary(emp, self.last_intent).splitlines()
-                elems.append(Paragraph(f"{i}. {summary[0]}", styles["Heading3"]))  # Name line
-                for line in summary[1:]:
-                    if not line.strip():
-                        elems.append(Spacer(1, 6))
-                    else:
-                        elems.append(Paragraph(line, styles["Normal"]))
-                elems.append(Spacer(1, 12))
-
-            doc.build(elems)
-            logger.info(f"[{self.session_id}] PDF exported: {file_path}")
-            messagebox.showinfo("Export", "PDF exported successfully.")
+    def _poll_pdf(self, future, file_path):
+        if not future.done():
+            self.root.after(self.POLL_MS * 10, self._poll_pdf, future, file_path)
+            return
+        try:
+            stats = future.result()
+            logger.info(f"[{self.session_id}] PDF exported: {file_path} ({stats})")
+            self.status_var.set("Ready")
+            messagebox.showinfo(
+                "Export",
+                f"PDF exported successfully: {stats['pages']} pages, "
+                f"{stats['size_bytes'] / 1024:.0f} KB in {stats['seconds']:.1f}s.\n{file_path}",
+            )
         except Exception as e:
             logger.exception("PDF export failed: %s", e)
+            self.status_var.set("PDF export failed")
             messagebox.showerror("Export failed", str(e))
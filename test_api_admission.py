@@ -0,0 +1,72 @@
+"""
+Admission control test for the API service.
+Start the service with small limits so the effect is visible, e.g.:
+    SEARCH_MAX_CONCURRENT=2 SEARCH_MAX_QUEUE=2 SEARCH_QUEUE_TIMEOUT_S=2 \
+    RATE_LIMIT_PER_MINUTE=6 RATE_LIMIT_BURST=3 uvicorn api_service:app --port 7777
+1. A burst from one session must be rate limited (429 + Retry-After).
+2. A burst from many sessions must be shed (503) instead of piling up on Postgres.
+"""
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://localhost:7777"
+QUERY = "15 sdm python"
+
+
+def _search(session_id):
+    t0 = time.perf_counter()
+    response = requests.post(
+        f"{BASE_URL}/search", json={"query": QUERY, "session_id": session_id}, timeout=120,
+    )
+    return response.status_code, response.headers.get("Retry-After"), time.perf_counter() - t0
+
+
+def _burst(session_ids):
+    with ThreadPoolExecutor(max_workers=len(session_ids)) as pool:
+        return list(pool.map(_search, session_ids))
+
+
+def _print_results(results):
+    for status, retry_after, latency in results:
+        extra = f" retry-after={retry_after}s" if retry_after else ""
+        print(f"  {status} {latency:6.2f}s{extra}")
+
+
+def test_rate_limit_single_session():
+    print("=== burst of 8 searches from one session ===")
+    try:
+        results = _burst(["admission_single"] * 8)
+        _print_results(results)
+        statuses = [r[0] for r in results]
+        print(f"200: {statuses.count(200)} | 429: {statuses.count(429)} | 503: {statuses.count(503)}")
+        assert 429 in statuses, "expected some searches to be rate limited"
+        assert all(r[1] for r in results if r[0] == 429), "429 responses must carry Retry-After"
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+def test_load_shedding_many_sessions():
+    print("=== burst of 12 searches from 12 sessions ===")
+    try:
+        results = _burst([f"admission_{i}" for i in range(12)])
+        _print_results(results)
+        statuses = [r[0] for r in results]
+        print(f"200: {statuses.count(200)} | 503: {statuses.count(503)}")
+        assert 503 in statuses, "expected load shedding with SEARCH_MAX_CONCURRENT/SEARCH_MAX_QUEUE set low"
+        shed = [r[2] for r in results if r[0] == 503]
+        print(f"Slowest rejection: {max(shed):.2f}s")
+
+        metrics = requests.get(f"{BASE_URL}/metrics", timeout=10).text
+        for line in metrics.splitlines():
+            if line.startswith(("talent_admission_rejected_total", "talent_admission_searches")):
+                print(f"  {line}")
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    test_rate_limit_single_session()
+    test_load_shedding_many_sessions()
@@ -0,0 +1,70 @@
+"""
+Throughput test for POST /search/batch vs sequential POST /search calls.
+Requires the FastAPI service running on localhost:7777.
+"""
+import time
+import requests
+
+BASE_URL = "http://localhost:7777"
+ROLE_REQUESTS = [
+    "5 sdm java Python",
+    "3 sdm java python",
+    "15 sdm python",
+    "find Technical Leader with core banking experience",
+    "recommend someone with spring boot skills",
+    "show me candidates with >5 years experience",
+    "5 sdm kotlin",
+    "3 sdm go",
+] * 3  # staffing requests often repeat the same role
+
+
+def test_batch_vs_sequential():
+    """Compare one batch request with the same queries sent one by one"""
+    print(f"=== {len(ROLE_REQUESTS)} queries: sequential /search vs /search/batch ===")
+    try:
+        t0 = time.perf_counter()
+        sequential = []
+        for i, q in enumerate(ROLE_REQUESTS):
+            # Session berbeda per query: satu session akan habis kena RATE_LIMIT_BURST
+            r = requests.post(f"{BASE_URL}/search", json={"query": q, "session_id": f"bench_seq_{i}"}, timeout=300)
+            assert r.status_code != 429, f"rate limited on query {i} ({q}): {r.text}"
+            assert r.status_code == 200, f"/search failed for {q}: {r.status_code} {r.text}"
+            sequential.append(r.json())
+        seq_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        r = requests.post(
+            f"{BASE_URL}/search/batch",
+            json={"queries": ROLE_REQUESTS, "session_id": "bench_batch"},
+            timeout=300,
+        )
+        batch_time = time.perf_counter() - t0
+        print(f"Status Code: {r.status_code}")
+        assert r.status_code == 200, f"/search/batch failed: {r.status_code} {r.text}"
+        batch = r.json()
+
+        print(f"Sequential: {seq_time:.2f}s ({len(ROLE_REQUESTS) / seq_time:.1f} queries/s)")
+        print(f"Batch:      {batch_time:.2f}s ({len(ROLE_REQUESTS) / batch_time:.1f} queries/s)")
+        print(f"Speedup:    {seq_time / batch_time:.1f}x")
+        print(
+            f"Unique intents: {batch['unique_intents']} | statements executed: "
+            f"{batch['statements_executed']} of {batch['statements_requested']}"
+        )
+
+        # Ranking harus sama dengan hasil /search satu per satu
+        for single, item in zip(sequential, batch["results"]):
+            ids_single = [c["id"] for c in single["candidates"]]
+            ids_batch = [c["id"] for c in item["candidates"]]
+            scores_single = [c["score"] for c in single["candidates"]]
+            scores_batch = [c["score"] for c in item["candidates"]]
+            assert scores_single == scores_batch, f"score mismatch for {item['query']}: {ids_single} vs {ids_batch}"
+
+        first = batch["results"][0]
+        print(f"Timing breakdown ({first['query']}): {first['timings']}")
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    test_batch_vs_sequential()
@@ -0,0 +1,66 @@
+"""
+Concurrency test for the async FastAPI service.
+Fires several /search requests at once and pings /health while they run.
+With the async pipeline the health checks must stay fast and the searches
+must overlap (wall time well below the sum of the individual latencies).
+"""
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://localhost:7777"
+QUERIES = [
+    "15 sdm python",
+    "5 sdm java Python",
+    "find Technical Leader with core banking experience",
+    "show me candidates with >5 years experience",
+    "recommend someone with spring boot skills",
+    "3 sdm java python",
+]
+
+
+def _search(query):
+    t0 = time.perf_counter()
+    response = requests.post(
+        f"{BASE_URL}/search",
+        json={"query": query, "session_id": f"concurrency_{abs(hash(query)) % 10000}"},
+        timeout=120,
+    )
+    return query, response.status_code, time.perf_counter() - t0
+
+
+def _health():
+    t0 = time.perf_counter()
+    requests.get(f"{BASE_URL}/health", timeout=30)
+    return time.perf_counter() - t0
+
+
+def test_concurrent_searches_do_not_block():
+    """Run the searches concurrently and measure /health latency meanwhile"""
+    print(f"=== {len(QUERIES)} concurrent searches + /health pings ===")
+    try:
+        with ThreadPoolExecutor(max_workers=len(QUERIES)) as pool:
+            t0 = time.perf_counter()
+            futures = [pool.submit(_search, q) for q in QUERIES]
+            health_latencies = []
+            while not all(f.done() for f in futures):
+                health_latencies.append(_health())
+                time.sleep(0.05)
+            results = [f.result() for f in futures]
+            wall = time.perf_counter() - t0
+
+        for query, status, latency in results:
+            print(f"  {status} {latency:6.2f}s  {query}")
+        total = sum(r[2] for r in results)
+        print(f"Wall time: {wall:.2f}s | sum of latencies: {total:.2f}s | overlap factor: {total / wall:.1f}x")
+        if health_latencies:
+            print(f"/health during searches: max {max(health_latencies) * 1000:.0f}ms over {len(health_latencies)} pings")
+            # event loop tidak boleh terblokir oleh search
+            assert max(health_latencies) < 1.0, "event loop was blocked while searches were running"
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    test_concurrent_searches_do_not_block()
@@ -0,0 +1,114 @@
+"""
+Streaming CSV export test for the API service.
+Start the service first (uvicorn api_service:app --port 7777 or python flask_service.py).
+1. A ranked export contains every ranked candidate of the search, best first.
+2. A sections export streams the raw rows of the four tables.
+3. Arrow / Parquet exports (needs pyarrow) hold the same ranking, with per-table details.
+4. Unknown search_id / mode are rejected.
+"""
+import io
+import csv
+import time
+import requests
+
+BASE_URL = "http://localhost:7777"
+QUERY = "3 sdm python"
+SESSION = "export_test"
+
+
+def _export(payload):
+    t0 = time.perf_counter()
+    response = requests.post(f"{BASE_URL}/export/csv", json={"session_id": SESSION, **payload}, stream=True, timeout=300)
+    first_chunk_at = None
+    chunks = []
+    for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+        if first_chunk_at is None:
+            first_chunk_at = time.perf_counter() - t0
+        chunks.append(chunk)
+    return response, "".join(chunks), first_chunk_at, time.perf_counter() - t0
+
+
+def test_ranked_export_matches_search():
+    print("=== ranked export ===")
+    try:
+        search = requests.post(f"{BASE_URL}/search", json={"query": QUERY, "session_id": SESSION}, timeout=120).json()
+        response, body, first, total = _export({"search_id": search.get("search_id"), "query": QUERY})
+        assert response.status_code == 200, response.text
+        rows = list(csv.reader(io.StringIO(body)))
+        header, data = rows[0], rows[1:]
+        print(f"{len(data)} candidates | first chunk {first:.2f}s | total {total:.2f}s")
+        print(f"columns: {', '.join(header)}")
+        assert len(data) == search["total_ranked"], "export must contain every ranked candidate"
+        scores = [float(r[header.index("score")]) for r in data]
+        assert scores == sorted(scores, reverse=True), "ranked export must be sorted by score"
+        for row in data[:3]:
+            print(f"  #{row[0]} {row[2]} score={row[3]}")
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+def test_sections_export():
+    print("=== sections export ===")
+    try:
+        response, body, first, total = _export({"query": QUERY, "mode": "sections"})
+        assert response.status_code == 200, response.text
+        rows = list(csv.reader(io.StringIO(body)))
+        sections = [r[0] for r in rows if len(r) == 1 and r[0] in ("roles", "projects", "education", "timesheet")]
+        print(f"{len(rows)} lines | sections {sections} | first chunk {first:.2f}s | total {total:.2f}s")
+        assert sections == ["roles", "projects", "education", "timesheet"]
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+def test_columnar_export():
+    print("=== columnar export ===")
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed, skipped")
+        return
+    try:
+        search = requests.post(f"{BASE_URL}/search", json={"query": QUERY, "session_id": SESSION}, timeout=120).json()
+        for fmt in ("arrow", "parquet"):
+            t0 = time.perf_counter()
+            response = requests.post(
+                f"{BASE_URL}/export/{fmt}", json={"search_id": search.get("search_id"), "query": QUERY}, timeout=300,
+            )
+            assert response.status_code == 200, response.text
+            elapsed = time.perf_counter() - t0
+            if fmt == "arrow":
+                table = pa.ipc.open_stream(response.content).read_all()
+            else:
+                table = pq.read_table(pa.BufferReader(response.content))
+            timesheet_rows = sum(len(t) for t in table.column("timesheet").to_pylist())
+            print(f"{fmt}: {table.num_rows} candidates, {timesheet_rows} timesheet rows, "
+                  f"{len(response.content)} bytes in {elapsed:.2f}s")
+            assert table.num_rows == search["total_ranked"]
+            assert table.column("rank").to_pylist()[:3] == [1, 2, 3]
+        print(f"schema: {', '.join(table.schema.names)}")
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+def test_export_errors():
+    print("=== export errors ===")
+    try:
+        expired = requests.post(f"{BASE_URL}/export/csv", json={"search_id": "nope"}, timeout=30)
+        bad_mode = requests.post(f"{BASE_URL}/export/csv", json={"query": QUERY, "mode": "xml"}, timeout=30)
+        print(f"unknown search_id → {expired.status_code} | bad mode → {bad_mode.status_code}")
+        assert expired.status_code == 410
+        assert bad_mode.status_code == 400
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    test_ranked_export_matches_search()
+    test_sections_export()
+    test_columnar_export()
+    test_export_errors()
@@ -0,0 +1,54 @@
+"""
+Pagination test for the API service (POST /search → POST /search/more).
+1. Pages must not overlap and must follow the ranking of the first search.
+2. Later pages only load their own candidates, so they should be much faster than the search.
+3. Unknown / malformed cursors → 410 / 400.
+"""
+import time
+import requests
+
+BASE_URL = "http://localhost:7777"
+QUERY = "3 sdm python"
+
+
+def _ids(candidates):
+    # FastAPI → CandidateSummary.id, Flask → employee dict
+    return [c.get("id") or c.get("employee_id") for c in candidates]
+
+
+def test_pagination():
+    print(f"=== {QUERY} → pages ===")
+    try:
+        t0 = time.perf_counter()
+        result = requests.post(f"{BASE_URL}/search", json={"query": QUERY, "session_id": "pagination"}, timeout=120).json()
+        print(f"page 1: {_ids(result['candidates'])} ({time.perf_counter() - t0:.3f}s)")
+        print(f"total ranked: {result['total_ranked']} | next_cursor: {result['next_cursor']}")
+
+        seen = _ids(result["candidates"])
+        cursor = result["next_cursor"]
+        for page in range(2, 5):
+            if not cursor:
+                break
+            t0 = time.perf_counter()
+            response = requests.post(
+                f"{BASE_URL}/search/more", json={"cursor": cursor, "session_id": "pagination"}, timeout=60,
+            )
+            assert response.status_code == 200, response.text
+            data = response.json()
+            ids = _ids(data["candidates"])
+            print(f"page {page}: {ids} ({time.perf_counter() - t0:.3f}s)")
+            assert not set(ids) & set(seen), "pages must not overlap"
+            seen.extend(ids)
+            cursor = data["next_cursor"]
+
+        expired = requests.post(f"{BASE_URL}/search/more", json={"cursor": "unknown:3"}, timeout=10)
+        malformed = requests.post(f"{BASE_URL}/search/more", json={"cursor": "garbage"}, timeout=10)
+        print(f"expired cursor → {expired.status_code} | malformed cursor → {malformed.status_code}")
+        assert expired.status_code == 410 and malformed.status_code == 400
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    test_pagination()
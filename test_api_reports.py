@@ -0,0 +1,50 @@
+"""
+PDF report job test for the API service.
+Start the service first (uvicorn api_service:app --port 7777 or python flask_service.py).
+1. Submitting returns a job id right away; the PDF is built in a worker process.
+2. Polling reports generation time, page count and size once the job is done.
+3. The download is a PDF of the reported size; unknown jobs return 404.
+"""
+import time
+import requests
+
+BASE_URL = "http://localhost:7777"
+QUERY = "200 sdm python"
+
+
+def test_pdf_report_job():
+    print("=== PDF report job ===")
+    try:
+        t0 = time.perf_counter()
+        submit = requests.post(f"{BASE_URL}/reports/pdf", json={"query": QUERY, "session_id": "report_test"}, timeout=30)
+        print(f"submit → {submit.status_code} in {time.perf_counter() - t0:.2f}s: {submit.json()}")
+        assert submit.status_code == 202, submit.text
+        job_id = submit.json()["job_id"]
+
+        early = requests.get(f"{BASE_URL}/reports/{job_id}/download", timeout=30)
+        print(f"download before done → {early.status_code}")
+
+        status = {}
+        for _ in range(120):
+            status = requests.get(f"{BASE_URL}/reports/{job_id}", timeout=30).json()
+            if status["status"] != "pending":
+                break
+            time.sleep(0.5)
+        print(f"status: {status}")
+        assert status["status"] == "done", status
+
+        pdf = requests.get(f"{BASE_URL}/reports/{job_id}/download", timeout=60)
+        print(f"download → {pdf.status_code}, {len(pdf.content)} bytes, {pdf.headers.get('content-type')}")
+        assert pdf.content.startswith(b"%PDF")
+        assert len(pdf.content) == status["size_bytes"]
+
+        missing = requests.get(f"{BASE_URL}/reports/nope", timeout=30)
+        print(f"unknown job → {missing.status_code}")
+        assert missing.status_code == 404
+    except requests.exceptions.ConnectionError as e:
+        print(f"API service is not running: {e}")
+    print()
+
+
+if __name__ == "__main__":
+    test_pdf_report_job()
@@ -0,0 +1,163 @@
+"""
+Circuit breaker test (no Postgres or model needed: a small SQLite file and the Ollama stand-in).
+1. State machine: N failures open the circuit, after the reset time one probe is let through,
+   a successful probe closes it, a failed probe opens it again.
+2. LLM circuit: Ollama failing → circuit opens → intents come from the heuristic parser without
+   calling Ollama; once Ollama recovers the half-open probe closes the circuit.
+3. Database circuit: database gone → circuit opens → the last complete result of the same intent
+   is returned flagged stale, an intent without a stored result raises CircuitOpen (503).
+"""
+import os
+import time
+import shutil
+import socket
+import tempfile
+from contextlib import contextmanager
+import pytest
+from src import storage, intent_parser
+from src.circuit_breaker import CircuitBreaker, CircuitOpen, llm_breaker, db_breaker, circuit_states
+from src.intent_parser import call_ollama_intent, heuristic_intent
+from src.llm_cache import llm_cache
+from src.llm_standin import serve_ollama_standin
+from src.query_executor import run_all_queries
+from src.storage import SQLiteBackend, connect_sqlite
+from src.synthetic_data import create_tables, seed_dataset
+
+with socket.socket() as _s:
+    _s.bind(("127.0.0.1", 0))
+    PORT = _s.getsockname()[1]
+DB_DIR = tempfile.mkdtemp(prefix="circuit_")
+DB_PATH = os.path.join(DB_DIR, "talent.db")
+
+
+@contextmanager
+def circuit_settings():
+    """LLM aktif ke stand-in di PORT, SQLite di DB_PATH, threshold / reset kecil; breaker mulai closed."""
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(intent_parser, "LLM_INTENT_ENABLED", True)
+            mp.setattr(intent_parser, "OLLAMA_HOST", f"http://127.0.0.1:{PORT}")
+            mp.setattr(intent_parser, "OLLAMA_TIMEOUT", 2)
+            mp.setattr(llm_cache, "mode", "off")
+            mp.setattr(storage, "_backend", SQLiteBackend(DB_PATH))
+            for breaker, threshold in ((llm_breaker, 3), (db_breaker, 2)):
+                mp.setattr(breaker, "failure_threshold", threshold)
+                mp.setattr(breaker, "reset_s", 1)
+                mp.setattr(breaker, "_state", "closed")
+                mp.setattr(breaker, "_failures", 0)
+                mp.setattr(breaker, "_probe_started", None)
+            yield
+    finally:
+        shutil.rmtree(DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def settings():
+    with circuit_settings():
+        yield
+
+
+def test_state_machine():
+    print("=== State machine ===")
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_s=0.2)
+    assert breaker.allow()
+    breaker.failure()
+    assert breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.25)
+    assert breaker.allow(), "first request after reset_s is the probe"
+    assert breaker.state == "half_open"
+    assert not breaker.allow(), "only one probe at a time"
+    breaker.failure()
+    assert breaker.state == "open", "failed probe reopens the circuit"
+
+    time.sleep(0.25)
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed" and breaker.allow()
+    print(f"closed → open → half_open → open → half_open → closed: {breaker.snapshot()}")
+    print()
+
+
+def test_llm_circuit():
+    print("=== LLM circuit ===")
+    server = serve_ollama_standin(PORT, latency_ms=20, jitter_ms=0, seed=1, error_rate=1.0)
+    try:
+        query = "5 sdm java spring"
+        expected, _ = heuristic_intent(query)
+        for _ in range(3):
+            call_ollama_intent(query)
+        assert llm_breaker.state == "open", llm_breaker.snapshot()
+        calls = sum(server.stats.values())
+
+        t0 = time.perf_counter()
+        intent, _ = call_ollama_intent(query)
+        elapsed = time.perf_counter() - t0
+        print(f"open: heuristic intent in {elapsed * 1000:.1f} ms, Ollama calls {calls} → {sum(server.stats.values())}")
+        assert intent == expected
+        assert sum(server.stats.values()) == calls, "open circuit must not call Ollama"
+
+        server.config["error_rate"] = 0.0
+        time.sleep(1.1)
+        call_ollama_intent(query)
+        assert sum(server.stats.values()) == calls + 1, "half-open probe calls Ollama"
+        assert llm_breaker.state == "closed", llm_breaker.snapshot()
+        print(f"after recovery: {circuit_states()['llm']}")
+    finally:
+        server.shutdown()
+    print()
+
+
+def test_database_circuit():
+    print("=== Database circuit ===")
+    conn = connect_sqlite(DB_PATH)
+    create_tables(conn)
+    seed_dataset(conn, 300, timesheet_days=5)
+    conn.close()
+
+    intent, _ = heuristic_intent("3 sdm python")
+    fresh, raw, _ = run_all_queries(intent, "circuit_test", query="3 sdm python")
+    assert fresh and not raw.get("stale")
+
+    moved = DB_PATH + ".away"
+    os.rename(DB_PATH, moved)  # database "down"
+    try:
+        for _ in range(2):
+            try:
+                run_all_queries(intent, "circuit_test")
+                raise AssertionError("search should fail while the database is gone")
+            except FileNotFoundError:
+                pass
+        assert db_breaker.state == "open", db_breaker.snapshot()
+
+        t0 = time.perf_counter()
+        stale, raw, sql_time = run_all_queries(intent, "circuit_test")
+        print(f"open: {len(stale)} stale candidates ({raw['stale_age_s']}s old) in "
+              f"{(time.perf_counter() - t0) * 1000:.1f} ms")
+        assert raw["stale"] and sql_time == 0.0
+        assert [e["employee_id"] for e in stale] == [e["employee_id"] for e in fresh]
+
+        other, _ = heuristic_intent("10 sdm react node")
+        try:
+            run_all_queries(other, "circuit_test")
+            raise AssertionError("intent without a stored result should raise CircuitOpen")
+        except CircuitOpen as e:
+            print(f"no stored result → {e.status_code}: {e.message}")
+    finally:
+        os.rename(moved, DB_PATH)
+
+    time.sleep(1.1)
+    _, raw, _ = run_all_queries(intent, "circuit_test")
+    assert not raw.get("stale") and db_breaker.state == "closed", db_breaker.snapshot()
+    print(f"after recovery: {circuit_states()['database']}")
+    os.remove(DB_PATH)
+    print()
+
+
+if __name__ == "__main__":
+    with circuit_settings():
+        test_state_machine()
+        test_llm_circuit()
+        test_database_circuit()
@@ -0,0 +1,116 @@
+"""
+Latency budget test (no Postgres or model needed: a small SQLite file).
+1. Without a budget every table is fetched and nothing is omitted.
+2. A nearly spent budget skips the optional tables (education, timesheet) but still ranks candidates
+   from roles + projects; the skipped tables are listed in raw["omitted"] and do not count against
+   the database circuit breaker.
+3. A table the intent filters on stays mandatory.
+4. A per-statement timeout cuts a long optional statement short; the next statement uses the normal timeout.
+5. Summary formatting and the LLM timeout follow the remaining budget.
+"""
+import os
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+import pytest
+from src import storage
+from src.async_runtime import run_sync
+from src.circuit_breaker import db_breaker
+from src.deadline import Deadline, llm_timeout
+from src.formatter import format_candidate
+from src.intent_parser import heuristic_intent
+from src.query_executor import run_all_queries
+from src.storage import SQLiteBackend, connect_sqlite, StatementTimeout
+from src.synthetic_data import create_tables, seed_dataset
+
+SLOW_SQL = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) "
+    "SELECT COUNT(*) AS n FROM c"
+)
+
+
+@contextmanager
+def seeded_sqlite_backend():
+    """SQLite sementara (300 employee) sebagai backend aktif; backend lama & file dibuang sesudahnya."""
+    directory = tempfile.mkdtemp(prefix="budget_")
+    path = os.path.join(directory, "talent.db")
+    conn = connect_sqlite(path)
+    create_tables(conn)
+    seed_dataset(conn, 300, timesheet_days=5)
+    conn.close()
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(storage, "_backend", SQLiteBackend(path))
+            yield path
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sqlite_backend():
+    with seeded_sqlite_backend() as path:
+        yield path
+
+
+def test_budget_skips_optional_tables():
+    intent, _ = heuristic_intent("3 sdm python")
+    employees, raw, _ = run_all_queries(intent, "budget_test", query="3 sdm python")
+    assert not raw["omitted"], f"no budget → nothing omitted, got {raw['omitted']}"
+    assert raw["timesheet"], "no budget → timesheet rows are fetched"
+
+    deadline = Deadline(0.2)  # < BUDGET_OPTIONAL_RESERVE_S → optional tables do not fit
+    employees, raw, _ = run_all_queries(intent, "budget_test", query="3 sdm python", deadline=deadline)
+    assert raw["omitted"] == ["education", "timesheet"], f"spent budget: omitted={raw['omitted']}"
+    assert not raw["education"] and not raw["timesheet"], "skipped tables must not return rows"
+    assert raw["roles"], "roles are mandatory"
+    assert employees, "roles + projects still produce a ranking"
+    assert db_breaker.state == "closed", f"budget skips are not database failures: {db_breaker.snapshot()}"
+
+    edu_intent = {**intent, "education": {"level": "S1"}}
+    _, raw, _ = run_all_queries(edu_intent, "budget_test", deadline=Deadline(0.2))
+    assert raw["omitted"] == ["timesheet"], f"education is filtered by the intent → mandatory, got {raw['omitted']}"
+
+
+def test_statement_timeout_override():
+    async def _run():
+        async with storage.get_backend().connect() as db:
+            t0 = time.perf_counter()
+            try:
+                await db.fetch(SLOW_SQL, [], 100)
+                raise AssertionError("slow statement should hit the 100 ms timeout")
+            except StatementTimeout:
+                cut = time.perf_counter() - t0
+            rows = await db.fetch("SELECT COUNT(*) AS n FROM autobot_dataset_talent_profile_role_tech", [])
+            return cut, rows[0]["n"]
+
+    cut, n = run_sync(_run())
+    assert cut < 1.0, f"100 ms statement timeout cut after {cut * 1000:.0f} ms"
+    assert n > 0, "next statement runs with the normal timeout"
+
+
+def test_formatting_and_llm_follow_budget():
+    intent, _ = heuristic_intent("3 sdm python")
+    employees, _, _ = run_all_queries(intent, "budget_test")
+    emp = employees[0]
+
+    roomy = Deadline(5.0)
+    full = format_candidate(emp, intent, roomy)
+    spent = Deadline(0.1)
+    short = format_candidate(emp, intent, spent)
+    assert not roomy.skipped, f"roomy budget skipped {roomy.skipped}"
+    assert spent.skipped == ["summary"], f"spent budget skipped {spent.skipped}"
+    assert len(short) < len(full) and "\n" not in short, f"over budget summary should be one line: {short!r}"
+
+    assert llm_timeout(None, 50000) == 50000
+    assert llm_timeout(Deadline(1.0), 50000) is None, "less than BUDGET_SQL_RESERVE_S left → heuristic"
+    timeout = llm_timeout(Deadline(10.0), 50000)
+    assert 7.5 < timeout < 8.01, f"LLM timeout with 10s budget: {timeout:.2f}s"
+
+
+if __name__ == "__main__":
+    with seeded_sqlite_backend():
+        test_budget_skips_optional_tables()
+        test_statement_timeout_override()
+        test_formatting_and_llm_follow_budget()
+    print("latency budget: all checks passed")
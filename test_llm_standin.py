@@ -0,0 +1,124 @@
+"""
+LLM intent path against the local Ollama stand-in (no model or database needed).
+1. Normal answers are parsed as LLM intents.
+2. Injected failures (HTTP 500, non-JSON content, hang past OLLAMA_TIMEOUT) fall back to the heuristic parser.
+3. LLM_CACHE_MODE=record stores responses; replay answers from the recordings without calling Ollama,
+   and a prompt that was never recorded falls back to the heuristic parser.
+"""
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+import pytest
+from src import intent_parser
+from src.circuit_breaker import llm_breaker
+from src.intent_parser import call_ollama_intent
+from src.llm_cache import llm_cache, LLM_CACHE_TOTAL
+from src.llm_standin import serve_ollama_standin
+from src.metrics import INTENT_PARSE_SECONDS
+
+QUERY = "5 sdm java spring"
+
+
+@contextmanager
+def llm_standin():
+    """Stand-in di port bebas + intent parser diarahkan ke sana; cache rekaman di folder sementara."""
+    server = serve_ollama_standin(0, latency_ms=50, jitter_ms=0, seed=1, hang_s=5)
+    cache_dir = tempfile.mkdtemp(prefix="llm_cache_")
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(intent_parser, "LLM_INTENT_ENABLED", True)
+            mp.setattr(intent_parser, "OLLAMA_HOST", f"http://127.0.0.1:{server.server_address[1]}")
+            mp.setattr(intent_parser, "OLLAMA_TIMEOUT", 2)
+            mp.setattr(llm_cache, "directory", cache_dir)
+            # setiap kegagalan harus sampai ke fallback, bukan ke circuit yang open
+            mp.setattr(llm_breaker, "failure_threshold", 100)
+            yield server
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def _reset_llm():
+    llm_breaker.success()  # closed, failure count 0
+    llm_cache.mode = "off"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with llm_standin() as standin:
+        yield standin
+
+
+@pytest.fixture(autouse=True)
+def closed_llm_circuit(server):
+    _reset_llm()
+    yield
+
+
+def _parse(query=QUERY):
+    before = INTENT_PARSE_SECONDS.snapshot(method="llm")[1], INTENT_PARSE_SECONDS.snapshot(method="llm_failed")[1]
+    t0 = time.perf_counter()
+    intent, _ = call_ollama_intent(query)
+    elapsed = time.perf_counter() - t0
+    llm = INTENT_PARSE_SECONDS.snapshot(method="llm")[1] - before[0]
+    failed = INTENT_PARSE_SECONDS.snapshot(method="llm_failed")[1] - before[1]
+    return intent, "llm" if llm else "llm_failed" if failed else "other", elapsed
+
+
+def test_llm_path():
+    print("=== Normal stand-in answer ===")
+    intent, method, elapsed = _parse()
+    print(f"{method} in {elapsed:.2f}s -> {intent}")
+    assert method == "llm", method
+    assert intent["limit"]["primary"] == 5
+    print()
+
+
+def test_injected_failures_fall_back(server):
+    print("=== Injected failures ===")
+    for failure in ("error_rate", "bad_json_rate", "hang_rate"):
+        server.config[failure] = 1.0
+        try:
+            intent, method, elapsed = _parse()
+        finally:
+            server.config[failure] = 0.0
+        print(f"{failure:<14} {method} in {elapsed:.2f}s -> primary={intent['limit']['primary']}")
+        assert method == "llm_failed", f"{failure}: {method}"
+        assert intent["limit"]["primary"] == 5, "heuristic fallback should still parse the query"
+        if failure == "hang_rate":
+            assert elapsed < 4, "hang should be cut off by OLLAMA_TIMEOUT"
+    print(f"stand-in stats: {dict(server.stats)}")
+    print()
+
+
+def test_record_and_replay(server):
+    print("=== Record / replay ===")
+    llm_cache.mode = "record"
+    _, method, recorded_time = _parse()
+    assert method == "llm", method
+    answered = sum(server.stats.values())
+
+    llm_cache.mode = "replay"
+    hits = LLM_CACHE_TOTAL.value(result="hit")
+    intent, method, replay_time = _parse()
+    print(f"record {recorded_time * 1000:.1f} ms, replay {replay_time * 1000:.1f} ms -> {intent}")
+    assert method == "llm", method
+    assert LLM_CACHE_TOTAL.value(result="hit") == hits + 1
+    assert sum(server.stats.values()) == answered, "replay must not call Ollama"
+
+    _, method, _ = _parse("10 sdm react node")
+    print(f"unrecorded prompt in replay mode -> {method}")
+    assert method == "llm_failed", method
+    llm_cache.mode = "off"
+    print()
+
+
+if __name__ == "__main__":
+    with llm_standin() as standin:
+        _reset_llm()
+        test_llm_path()
+        _reset_llm()
+        test_injected_failures_fall_back(standin)
+        _reset_llm()
+        test_record_and_replay(standin)
@@ -0,0 +1,68 @@
+"""
+Corpus loader test for loadtest.py (offline, no API or database needed).
+1. .jsonl takes the "query" field, falling back to "text"; blank lines and comments are skipped.
+2. Application logs (.log) yield only the logged search queries.
+3. Plain text files yield one query per line.
+4. A .jsonl line without "query"/"text", or with invalid JSON, raises ValueError naming the line.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from src.loadtest import load_corpus
+
+
+@contextmanager
+def corpus_file(name, content):
+    """File corpus sementara; direktori dibuang sesudahnya."""
+    directory = tempfile.mkdtemp(prefix="corpus_")
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_jsonl_corpus():
+    content = '{"query": "5 sdm java"}\n\n# comment\n{"text": "3 sdm python", "session": "x"}\n'
+    with corpus_file("corpus.jsonl", content) as path:
+        assert load_corpus(path) == ["5 sdm java", "3 sdm python"]
+
+
+def test_log_corpus():
+    content = (
+        "2026-10-19 09:00:01,000 [INFO] [s1] API search query: 5 sdm java\n"
+        "2026-10-19 09:00:01,200 [INFO] [s1] SQL done in 0.12s\n"
+        "2026-10-19 09:00:02,000 [INFO] [s2] API stream search query: find Technical Leader\n"
+    )
+    with corpus_file("app.log", content) as path:
+        assert load_corpus(path) == ["5 sdm java", "find Technical Leader"]
+
+
+def test_text_corpus():
+    with corpus_file("queries.txt", "5 sdm java\n\n# skipped\n  3 sdm go  \n") as path:
+        assert load_corpus(path) == ["5 sdm java", "3 sdm go"]
+
+
+def test_jsonl_without_query_field():
+    for content, expected in (
+        ('{"query": "5 sdm java"}\n{"q": "3 sdm go"}\n', ':2: expected an object with a "query" or "text" field'),
+        ('["3 sdm go"]\n', ':1: expected an object with a "query" or "text" field'),
+        ('{"query": "5 sdm java"\n', ":1: invalid JSON"),
+    ):
+        with corpus_file("corpus.jsonl", content) as path:
+            try:
+                load_corpus(path)
+                raise AssertionError(f"no error for {content!r}")
+            except ValueError as e:
+                assert expected in str(e), f"error for {content!r} should contain {expected!r}, got {e}"
+
+
+if __name__ == "__main__":
+    test_jsonl_corpus()
+    test_log_corpus()
+    test_text_corpus()
+    test_jsonl_without_query_field()
+    print("corpus loader: all checks passed")
@@ -0,0 +1,76 @@
+"""
+Conversation refinement test (no Postgres, Telegram or API needed: a seeded SQLite file).
+Each follow-up is run through run_refined and compared with a fresh database
+search for the same effective intent: the ranking must be identical, and
+narrowing follow-ups must be answered from memory.
+"""
+import os
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+import pytest
+from src import storage, intent_parser
+from src.intent_parser import call_ollama_intent
+from src.query_executor import run_refined, run_all_queries
+from src.conversation import conversations
+from src.storage import SQLiteBackend, connect_sqlite
+from src.synthetic_data import create_tables, seed_dataset
+
+
+@contextmanager
+def seeded_sqlite_backend(employees=2000):
+    """SQLite sementara dari src/synthetic_data.py sebagai backend aktif; intent dari heuristic parser."""
+    directory = tempfile.mkdtemp(prefix="refine_")
+    path = os.path.join(directory, "talent.db")
+    conn = connect_sqlite(path)
+    create_tables(conn)
+    seed_dataset(conn, employees, timesheet_days=5)
+    conn.close()
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(storage, "_backend", SQLiteBackend(path))
+            mp.setattr(intent_parser, "LLM_INTENT_ENABLED", False)
+            yield path
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sqlite_backend():
+    with seeded_sqlite_backend() as path:
+        yield path
+
+
+CONVERSATION = [
+    ("3 sdm python", "database"),
+    ("with exp > 5", "memory"),
+    ("now with Technical Leader", "memory"),
+    ("and Java", "database"),
+    ("with exp < 10", "memory"),
+]
+
+
+def _ranking(employees):
+    return [(e["employee_id"], e.get("score")) for e in employees]
+
+
+def test_refinement():
+    session_id = "test_refine"
+    conversations.reset(session_id)
+    for query, expected in CONVERSATION:
+        intent, _ = call_ollama_intent(query)
+        t0 = time.perf_counter()
+        intent, employees, raw, _ = run_refined(query, intent, session_id)
+        elapsed = time.perf_counter() - t0
+
+        fresh, fresh_raw, _ = run_all_queries(intent, "test_refine_fresh")
+        same = _ranking(employees) == _ranking(fresh) and raw["total_ranked"] == fresh_raw["total_ranked"]
+        print(f"{query!r:32} → {raw['refinement']:8} {elapsed:.3f}s total={raw['total_ranked']} same_as_db={same}")
+        assert same, f"ranking differs from a fresh search for {intent}"
+        assert raw["refinement"] == expected, f"expected {expected} for {query!r}"
+
+
+if __name__ == "__main__":
+    with seeded_sqlite_backend():
+        test_refinement()
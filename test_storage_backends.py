@@ -0,0 +1,131 @@
+"""
+Storage backend parity test.
+1. Offline: a temporary SQLite file seeded by src/synthetic_data.py ranks every query the
+   same as rank_employees over the same generated rows filtered in memory.
+2. Needs the Postgres database from .env (skipped when it is down); its tables are copied
+   into a temporary SQLite file. Every query returns the same ranking on Postgres and
+   SQLite (same scores, same candidates per score; order among equal scores is not
+   defined by either database), and the returned candidates have the same names and
+   total experience.
+"""
+import os
+import time
+import random
+import tempfile
+import datetime as dt
+import psycopg2
+import pytest
+from src.database import get_conn
+from src.storage import PostgresBackend, SQLiteBackend, copy_to_sqlite, connect_sqlite
+from src.intent_parser import call_ollama_intent
+from src.query_executor import run_all_queries, rank_employees
+from src.conversation import filter_rows
+from src.synthetic_data import create_tables, seed_dataset, generate_employee
+from src.result_store import results
+
+QUERIES = [
+    "3 sdm python",
+    "5 sdm Java spring",
+    "10 sdm react node",
+    "Technical Leader core banking",
+    "20 sdm java exp > 3",
+    "Dedi",
+]
+
+
+def _groups(ranked):
+    by_score = {}
+    for emp_id, score in ranked:
+        by_score.setdefault(score, set()).add(emp_id)
+    return by_score
+
+
+def _ranking(query, intent, backend):
+    t0 = time.perf_counter()
+    employees, raw, _ = run_all_queries(intent, f"parity_{backend.name}", query=query, backend=backend)
+    stored = results.get(raw["search_id"])
+    ranked = stored.page(0, stored.total)
+    return [score for _, score in ranked], _groups(ranked), employees, time.perf_counter() - t0
+
+
+def _generated_rows(employees, seed, timesheet_days):
+    """Baris yang sama dengan seed_dataset, dalam bentuk hasil query sql_builder (alias kolom)."""
+    rng = random.Random(seed)
+    rows = {"roles": [], "projects": [], "education": [], "timesheet": []}
+    for emp_no in range(employees):
+        tables = generate_employee(rng, emp_no, timesheet_days)
+        for emp_id, full_name, role, _, tech in tables["autobot_dataset_talent_profile_role_tech"]:
+            rows["roles"].append({"employee_id": emp_id, "full_name": full_name, "role": role,
+                                  "ready_technology": tech})
+        for emp_id, nama, project, desc, _, _, durasi in tables["autobot_dataset_talent_profile_project_experiences"]:
+            rows["projects"].append({"employee_id": emp_id, "nama_lengkap": nama, "nama_project": project,
+                                     "project_description": desc, "durasi_role": durasi})
+        for emp_id, degree, school, major, _ in tables["autobot_dataset_talent_profile_education"]:
+            rows["education"].append({"employee_id": emp_id, "degree": degree, "school": school, "major": major})
+        for emp_id, name, client, _, date in tables["autobot_dataset_talent_timesheet"]:
+            day = dt.date.fromisoformat(date)
+            rows["timesheet"].append({"employee_id": emp_id, "employee_name": name, "project_name": client,
+                                      "start_date": day, "end_date": day})
+    return rows
+
+
+def test_sqlite_matches_in_memory_ranking():
+    print("=== SQLite vs in-memory rankings (synthetic dataset) ===")
+    employees, seed, timesheet_days = 500, 7, 6
+    path = os.path.join(tempfile.mkdtemp(), "talent.db")
+    conn = connect_sqlite(path)
+    create_tables(conn)
+    seed_dataset(conn, employees, seed=seed, timesheet_days=timesheet_days)
+    conn.close()
+    all_rows = _generated_rows(employees, seed, timesheet_days)
+    names = {r["employee_id"]: r["full_name"] for r in all_rows["roles"]}
+
+    sqlite = SQLiteBackend(path)
+    for query in QUERIES:
+        intent, _ = call_ollama_intent(query)
+        # filter_rows meniru clause SQL role / skills / projects / name saja
+        assert not intent.get("education") and not intent.get("timesheet"), f"{query}: not filterable in memory"
+        lite_scores, lite_groups, _, _ = _ranking(query, intent, sqlite)
+        ranked = rank_employees(filter_rows(all_rows, intent, fulltext=False), intent, "parity_memory", names)
+        memory = [(e["employee_id"], e.get("score", 0)) for e in ranked]
+        print(f"{query!r:34} {len(lite_scores):>5} vs {len(memory):>5} candidates")
+        assert lite_scores == [score for _, score in memory], f"{query}: score sequence differs"
+        assert lite_groups == _groups(memory), f"{query}: candidates differ"
+    os.remove(path)
+    print()
+
+
+def test_backends_rank_identically():
+    print("=== Postgres vs SQLite rankings ===")
+    path = os.path.join(tempfile.mkdtemp(), "talent.db")
+    try:
+        with get_conn() as conn:
+            counts = copy_to_sqlite(conn, path)
+    except psycopg2.OperationalError as e:
+        print(f"Postgres is not available: {e}")
+        pytest.skip(f"Postgres is not available: {e}")
+    print(f"copied {sum(counts.values())} rows to {path}")
+
+    postgres, sqlite = PostgresBackend(fulltext=False), SQLiteBackend(path)
+    for query in QUERIES:
+        intent, _ = call_ollama_intent(query)
+        pg_scores, pg_groups, pg_top, pg_time = _ranking(query, intent, postgres)
+        lite_scores, lite_groups, lite_top, lite_time = _ranking(query, intent, sqlite)
+        print(f"{query!r:34} {len(pg_scores):>5} vs {len(lite_scores):>5} candidates | "
+              f"postgres {pg_time:.2f}s sqlite {lite_time:.2f}s")
+        assert pg_scores == lite_scores, f"{query}: score sequence differs"
+        assert pg_groups == lite_groups, f"{query}: candidates differ"
+        top_pg = {e["employee_id"]: (e["full_name"], e["total_experience_months"]) for e in pg_top}
+        top_lite = {e["employee_id"]: (e["full_name"], e["total_experience_months"]) for e in lite_top}
+        shared = top_pg.keys() & top_lite.keys()
+        assert all(top_pg[k] == top_lite[k] for k in shared), f"{query}: candidate details differ"
+    os.remove(path)
+    print()
+
+
+if __name__ == "__main__":
+    test_sqlite_matches_in_memory_ranking()
+    try:
+        test_backends_rank_identically()
+    except pytest.skip.Exception:
+        pass
@@ -0,0 +1,75 @@
+"""
+Minimal OTLP/HTTP (JSON) collector stand-in for local debugging.
+
+Run:
+    python trace_collector.py --port 4318
+then start the API / bot with:
+    TRACING_ENABLED=1 TRACE_COLLECTOR_URL=http://localhost:4318/v1/traces
+
+Every received trace is appended to logs/collected_traces.jsonl and printed
+as an indented span tree. A real OpenTelemetry Collector accepts the same payload.
+"""
+import os
+import json
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OUTPUT = "logs/collected_traces.jsonl"
+
+
+def print_tree(spans):
+    by_parent = {}
+    for s in spans:
+        by_parent.setdefault(s.get("parentSpanId"), []).append(s)
+
+    def walk(parent_id, depth):
+        for s in sorted(by_parent.get(parent_id, []), key=lambda x: int(x["startTimeUnixNano"])):
+            ms = (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+            print(f"{'  ' * depth}{s['name']:<{40 - 2 * depth}} {ms:9.2f} ms")
+            walk(s["spanId"], depth + 1)
+
+    walk(None, 0)
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/v1/traces":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        os.makedirs("logs", exist_ok=True)
+        with open(OUTPUT, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+        for rs in payload.get("resourceSpans", []):
+            for ss in rs.get("scopeSpans", []):
+                print_tree(ss.get("spans", []))
+        print()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OTLP/JSON trace collector")
+    parser.add_argument("--port", type=int, default=4318)
+    args = parser.parse_args()
+    print(f"Collecting traces on http://localhost:{args.port}/v1/traces → {OUTPUT}")
+    ThreadingHTTPServer(("0.0.0.0", args.port), CollectorHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    main()